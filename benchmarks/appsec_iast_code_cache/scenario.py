@@ -0,0 +1,75 @@
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+
+import bm
+
+from ddtrace.appsec._iast._ast.code_cache import get_patched_code
+from ddtrace.settings.asm import config as asm_config
+
+
+MODULE_SOURCE = """
+import os
+
+
+def join_path(root, name):
+    return os.path.join(root, "%s_{n}.txt" % name.lower())
+
+
+class Greeter{n}:
+    def __init__(self, name):
+        self.name = name
+
+    def greet(self, greeting="Hello"):
+        message = greeting + ", " + self.name + "!"
+        return message.upper() + " " + str({n})
+
+    def describe(self, items):
+        parts = [str(item) for item in items[1:]]
+        return " ".join(parts) + "{{}}".format(self.name)
+"""
+
+
+def make_modules(root, nmodules):
+    """Create first-party modules that the IAST AST patching instruments."""
+    modules = []
+    for n in range(nmodules):
+        path = os.path.join(root, "bm_iast_module%d.py" % n)
+        with open(path, "w") as f:
+            f.write(MODULE_SOURCE.format(n=n))
+        spec = importlib.util.spec_from_file_location("bm_iast_module%d" % n, path)
+        modules.append(importlib.util.module_from_spec(spec))
+    return modules
+
+
+class IastCodeCacheScenario(bm.Scenario):
+    nmodules = bm.var(type=int)
+    cache = bm.var_bool()
+    warm = bm.var_bool()
+
+    def run(self):
+        root = tempfile.mkdtemp()
+        cache_dir = os.path.join(root, "cache")
+        modules = make_modules(root, self.nmodules)
+
+        sys.dont_write_bytecode = False
+        asm_config._iast_code_cache_enabled = self.cache
+        asm_config._iast_code_cache_dir = cache_dir
+
+        if self.warm:
+            for module in modules:
+                get_patched_code(module)
+
+        def _(loops):
+            for _ in range(loops):
+                if not self.warm:
+                    # Startup of a process that finds no cache entry
+                    shutil.rmtree(cache_dir, ignore_errors=True)
+                for module in modules:
+                    get_patched_code(module)
+
+        yield _
+
+        shutil.rmtree(root)
@@ -0,0 +1,40 @@
+import bm
+
+from ddtrace.internal import core
+
+
+CUSTOM_EVENT_NAME = "CoreAPIScenario.event"
+
+try:
+    fire = core.fire
+except AttributeError:
+    # core.fire is not defined in this version of dd-trace-py
+    fire = core.dispatch
+
+
+class CoreAPIScenario(bm.Scenario):
+    listeners = bm.var(type=int)
+    set_item_count = bm.var(type=int)
+    get_item_exists = bm.var_bool()
+
+    def run(self):
+        # Simulate the per-request traffic of a web framework integration: a few nested
+        # execution contexts, each dispatching a couple of events.
+        core.reset_listeners()
+        for _ in range(self.listeners):
+            core.on(CUSTOM_EVENT_NAME, lambda *args: True)
+
+        if self.get_item_exists:
+            core.set_item("key", "value")
+
+        def _(loops):
+            for _ in range(loops):
+                with core.context_with_data("request"):
+                    for i in range(self.set_item_count):
+                        core.set_item("key", i)
+                    with core.context_with_data("request.handler"):
+                        core.dispatch(CUSTOM_EVENT_NAME, [5, 6, 7, 8])
+                        fire(CUSTOM_EVENT_NAME, [5, 6, 7, 8])
+                        core.get_item("key")
+
+        yield _
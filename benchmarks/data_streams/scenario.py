@@ -0,0 +1,24 @@
+import bm
+
+from ddtrace.internal.datastreams.processor import DataStreamsProcessor
+
+
+class DataStreamsScenario(bm.Scenario):
+    num_topics = bm.var(type=int)
+    num_checkpoints = bm.var(type=int)
+    produce = bm.var_bool()
+
+    def run(self):
+        processor = DataStreamsProcessor("http://localhost:8126")
+        # Do not send anything to the agent
+        processor.stop()
+        direction = "direction:out" if self.produce else "direction:in"
+        tags = [["type:kafka", "topic:topic-%d" % i, direction] for i in range(self.num_topics)]
+
+        def _(loops):
+            for _ in range(loops):
+                for i in range(self.num_checkpoints):
+                    ctx = processor.new_pathway()
+                    ctx.set_checkpoint(tags[i % self.num_topics], payload_size=1024)
+
+        yield _
@@ -1,10 +1,55 @@
+import collections
+import json
 import os
+import re
 import subprocess
 import sys
 
 import bm
 
 
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def report_importtime(stderr, top=25):
+    """Report the modules imported during startup that cost the most, from the output of ``python -X importtime``.
+
+    The report is written to stderr as a table, followed by a JSON line with the cost of every module, the self time
+    per ddtrace subsystem and the cumulative time of the ddtrace-run bootstrap, in microseconds.
+    """
+    modules = []
+    subsystems = collections.Counter()
+    bootstrap_us = 0
+    for line in stderr.decode("utf-8", errors="replace").splitlines():
+        m = IMPORTTIME_RE.match(line)
+        if m is None:
+            continue
+        self_us, cumulative_us, module = int(m.group(1)), int(m.group(2)), m.group(4)
+        modules.append((self_us, cumulative_us, module))
+        if module.startswith("ddtrace."):
+            subsystems[".".join(module.split(".")[:3])] += self_us
+        elif module == "sitecustomize":
+            bootstrap_us = max(bootstrap_us, cumulative_us)
+
+    out = ["Import time per ddtrace subsystem (self, us):"]
+    out.extend("  {:>10} {}".format(us, name) for name, us in subsystems.most_common(top))
+    out.append("Most expensive modules (self, cumulative, us):")
+    out.extend("  {:>10} {:>10} {}".format(*_) for _ in sorted(modules, reverse=True)[:top])
+    out.append("ddtrace-run bootstrap (cumulative, us): {:>10}".format(bootstrap_us))
+    out.append(
+        "importtime: "
+        + json.dumps(
+            {
+                "bootstrap_us": bootstrap_us,
+                "subsystems_us": dict(subsystems),
+                "modules_us": {module: [self_us, cumulative_us] for self_us, cumulative_us, module in modules},
+            },
+            sort_keys=True,
+        )
+    )
+    sys.stderr.write("\n".join(out) + "\n")
+
+
 class DDtraceRun(bm.Scenario):
     ddtrace_run = bm.var_bool()
     http = bm.var_bool()
@@ -13,6 +58,7 @@ class DDtraceRun(bm.Scenario):
     profiling = bm.var_bool()
     appsec = bm.var_bool()
     tracing = bm.var_bool()
+    importtime = bm.var_bool()
 
     def run(self):
         # setup subprocess environment variables
@@ -52,10 +98,21 @@ httpretty.register_uri(httpretty.POST, '%s/%s' % (tracer.agent_trace_url, 'profi
             code += "import ddtrace.profiling.auto\n"
 
         # stage code for execution in a subprocess
-        subp_cmd += [sys.executable, "-c", code]
+        python_cmd = [sys.executable]
+        if self.importtime:
+            # Report the cost of each imported module to catch import time regressions
+            python_cmd.append("-Ximporttime")
+        subp_cmd += python_cmd + ["-c", code]
+
+        result = {}
 
         def _(loops):
             for _ in range(loops):
-                subprocess.check_output(subp_cmd, env=env)
+                result["stderr"] = subprocess.run(
+                    subp_cmd, env=env, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+                ).stderr
 
         yield _
+
+        if self.importtime and "stderr" in result:
+            report_importtime(result["stderr"])
@@ -1,3 +1,5 @@
+import zlib
+
 import bm
 import utils
 
@@ -10,15 +12,24 @@ class Encoder(bm.Scenario):
     nmetrics = bm.var(type=int)
     dd_origin = bm.var_bool()
     encoding = bm.var(type=str)
+    # HTTP content encoding used to compress the payloads as done by the
+    # trace writer: "gzip", "deflate" or "none"
+    compression = bm.var(type=str)
+    compression_level = bm.var(type=int)
 
     def run(self):
         encoder = utils.init_encoder(self.encoding)
         traces = utils.gen_traces(self)
+        wbits = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}.get(self.compression)
 
         def _(loops):
             for _ in range(loops):
                 for trace in traces:
                     encoder.put(trace)
-                    encoder.encode()
+                    payload = encoder.encode()
+                    if wbits is not None:
+                        compressor = zlib.compressobj(self.compression_level, zlib.DEFLATED, wbits)
+                        compressor.compress(payload)
+                        compressor.flush()
 
         yield _
@@ -1,3 +1,5 @@
+import functools
+
 import bm
 import bm.flask_utils as flask_utils
 from utils import _post_response
@@ -11,9 +13,11 @@ class FlaskSimple(bm.Scenario):
     iast_enabled = bm.var_bool()
     post_request = bm.var_bool()
     telemetry_metrics_enabled = bm.var_bool()
+    large_json_body = bm.var_bool()
 
     def run(self):
-        with flask_utils.server(self, custom_post_response=_post_response) as get_response:
+        post_response = functools.partial(_post_response, large_json_body=self.large_json_body)
+        with flask_utils.server(self, custom_post_response=post_response) as get_response:
 
             def _(loops):
                 for _ in range(loops):
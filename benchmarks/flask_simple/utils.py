@@ -1,9 +1,31 @@
+import functools
+
 import bm.flask_utils as flask_utils
 import bm.utils as utils
 import requests
 
 
-def _post_response():
+# A JSON API payload large enough for the WAF to truncate it: longer lists and strings, and deeper nesting, than the
+# WAF limits allow.
+LARGE_JSON_BODY = {
+    "items": [
+        {
+            "id": i,
+            "name": "item-%d" % i,
+            "description": "x" * (4200 if i % 50 == 0 else 64),
+            "price": i * 1.5,
+            "available": bool(i % 2),
+            "tags": ["tag-%d" % j for j in range(20)],
+            "attributes": {"attr_%d" % j: "value-%d" % j for j in range(20)},
+            "nested": {"level": {"deeper": {"value": i, "list": [[j, str(j)] for j in range(10)]}}},
+        }
+        for i in range(300)
+    ],
+    "deep": functools.reduce(lambda value, _: {"child": value}, range(30), {"leaf": "value"}),
+}
+
+
+def _post_response(large_json_body=False):
     HEADERS = {
         "SERVER_PORT": "8000",
         "REMOTE_ADDR": "127.0.0.1",
@@ -16,5 +38,8 @@ def _post_response():
         "HTTP_ACCEPT_LANGUAGE": "en-US,en;q=0.9",
         "User-Agent": "dd-test-scanner-log",
     }
-    r = requests.post(flask_utils.SERVER_URL + "post-view", data=utils.EXAMPLE_POST_DATA, headers=HEADERS)
+    if large_json_body:
+        r = requests.post(flask_utils.SERVER_URL + "post-view", json=LARGE_JSON_BODY, headers=HEADERS)
+    else:
+        r = requests.post(flask_utils.SERVER_URL + "post-view", data=utils.EXAMPLE_POST_DATA, headers=HEADERS)
     r.raise_for_status()
@@ -10,6 +10,7 @@ class HTTPPropagationExtract(bm.Scenario):
     headers = bm.var(type=str)
     extra_headers = bm.var(type=int)
     wsgi_style = bm.var(type=bool)
+    asgi_style = bm.var_bool()
 
     def generate_headers(self):
         headers = json.loads(self.headers)
@@ -22,6 +23,10 @@ class HTTPPropagationExtract(bm.Scenario):
                 header = utils.get_wsgi_header(header)
             headers[header] = str(i)
 
+        if self.asgi_style:
+            # ASGI scope headers are a list of byte string pairs
+            return [(header.encode(), value.encode()) for header, value in headers.items()]
+
         return headers
 
     def run(self):
@@ -4,12 +4,14 @@ import bm
 
 from ddtrace.context import Context
 from ddtrace.propagation import http
+from ddtrace.span import Span
 
 
 class HTTPPropagationInject(bm.Scenario):
     sampling_priority = bm.var(type=str)
     dd_origin = bm.var(type=str)
     meta = bm.var(type=str)
+    fan_out = bm.var_bool()
 
     def run(self):
         sampling_priority = None
@@ -29,9 +31,21 @@ class HTTPPropagationInject(bm.Scenario):
             meta=meta,
         )
 
-        def _(loops):
-            for _ in range(loops):
-                # Just pass in a new/empty dict, we don't care about the result
-                http.HTTPPropagator.inject(ctx, {})
+        if self.fan_out:
+            # Inject the headers of many child spans of the same trace, like
+            # a request that makes many downstream calls
+            children = [ctx._with_span(Span("child", trace_id=ctx.trace_id, parent_id=ctx.span_id)) for _ in range(100)]
+
+            def _(loops):
+                for _ in range(loops):
+                    for child in children:
+                        http.HTTPPropagator.inject(child, {})
+
+        else:
+
+            def _(loops):
+                for _ in range(loops):
+                    # Just pass in a new/empty dict, we don't care about the result
+                    http.HTTPPropagator.inject(ctx, {})
 
         yield _
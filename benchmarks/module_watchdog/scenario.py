@@ -0,0 +1,75 @@
+import importlib
+import os
+from pathlib import Path
+import shutil
+import sys
+import tempfile
+
+import bm
+
+from ddtrace.internal.module import ModuleWatchdog
+
+
+PACKAGE = "bm_module_watchdog_tree"
+
+
+def make_package_tree(root, nmodules, modules_per_package):
+    """Create a synthetic package tree with the given number of leaf modules."""
+    names = []
+    package_dir = os.path.join(root, PACKAGE)
+    os.makedirs(package_dir)
+    open(os.path.join(package_dir, "__init__.py"), "w").close()
+    for p in range(nmodules // modules_per_package):
+        subpackage_dir = os.path.join(package_dir, "sub%d" % p)
+        os.makedirs(subpackage_dir)
+        open(os.path.join(subpackage_dir, "__init__.py"), "w").close()
+        for m in range(modules_per_package):
+            with open(os.path.join(subpackage_dir, "mod%d.py" % m), "w") as f:
+                f.write("VALUE = %d\n" % m)
+            names.append("%s.sub%d.mod%d" % (PACKAGE, p, m))
+    return names
+
+
+def unload_package_tree():
+    for name in [_ for _ in sys.modules if _ == PACKAGE or _.startswith(PACKAGE + ".")]:
+        del sys.modules[name]
+
+
+class ModuleWatchdogScenario(bm.Scenario):
+    nmodules = bm.var(type=int)
+    watchdog = bm.var_bool()
+    origin_hook = bm.var_bool()
+    pre_exec_hooks = bm.var(type=int)
+
+    def run(self):
+        root = tempfile.mkdtemp()
+        names = make_package_tree(root, self.nmodules, 50)
+        sys.path.insert(0, root)
+
+        if self.watchdog:
+            if not ModuleWatchdog.is_installed():
+                ModuleWatchdog.install()
+
+            if self.origin_hook:
+                # Registering a hook by origin requires the origin of every imported module
+                ModuleWatchdog.register_origin_hook(Path(__file__).resolve(), lambda module: None)
+
+            # Simulate products that rewrite some modules before they are executed, like IAST
+            for i in range(self.pre_exec_hooks):
+                ModuleWatchdog.register_pre_exec_module_hook("not.a.module%d" % i, lambda loader, module: None)
+
+        elif ModuleWatchdog.is_installed():
+            ModuleWatchdog.uninstall()
+
+        def _(loops):
+            for _ in range(loops):
+                unload_package_tree()
+                importlib.invalidate_caches()
+                for name in names:
+                    importlib.import_module(name)
+
+        yield _
+
+        unload_package_tree()
+        sys.path.remove(root)
+        shutil.rmtree(root)
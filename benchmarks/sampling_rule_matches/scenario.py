@@ -8,6 +8,26 @@ from ddtrace import Span
 from ddtrace.sampling_rule import SamplingRule
 
 
+try:
+    from ddtrace.internal.sampling import SamplingRulesMatcher
+
+    def match_rules(rules):
+        return SamplingRulesMatcher(rules).match
+
+
+except ImportError:
+    # DEV: versions without the compiled matcher evaluate the rules in order
+
+    def match_rules(rules):
+        def match(span):
+            for rule in rules:
+                if rule.matches(span):
+                    return rule
+            return None
+
+        return match
+
+
 def rands(size=6, chars=string.ascii_uppercase + string.digits):
     return "".join(random.choice(chars) for _ in range(size))
 
@@ -29,6 +49,7 @@ class SamplingRules(bm.Scenario):
     num_operations = bm.var(type=int)
     num_resources = bm.var(type=int)
     num_tags = bm.var(type=int)
+    num_rules = bm.var(type=int)
 
     def run(self):
         # Generate random service and operation names for the counts we requested
@@ -38,24 +59,33 @@ class SamplingRules(bm.Scenario):
         tag_names = [rands() for _ in range(self.num_tags)]
 
         # Generate all possible permutations of service and operation names
-        spans = [
-            Span(service=service, name=name, resource=resource, tags={tag: tag})
-            for service, name, resource, tag in itertools.product(services, operation_names, resource_names, tag_names)
-        ]
+        spans = []
+        for service, name, resource, tag in itertools.product(services, operation_names, resource_names, tag_names):
+            span = Span(service=service, name=name, resource=resource)
+            span.set_tag(tag, tag)
+            spans.append(span)
 
-        # Create a single rule to use for all matches
+        # Create rules that never match, followed by a rule to use for all matches
         # Pick a random service/operation name
-        rule = SamplingRule(
-            service=random.choice(services),
-            name=random.choice(operation_names),
-            resource=random.choice(resource_names),
-            tags=random.choice(tag_names),
-            sample_rate=1.0,
+        rules = [
+            SamplingRule(service=rands(), name=rands(), resource=rands(), sample_rate=1.0)
+            for _ in range(self.num_rules - 1)
+        ]
+        tag = random.choice(tag_names)
+        rules.append(
+            SamplingRule(
+                service=random.choice(services),
+                name=random.choice(operation_names),
+                resource=random.choice(resource_names),
+                tags={tag: tag},
+                sample_rate=1.0,
+            )
         )
+        match = match_rules(rules)
 
         def _(loops):
             for _ in range(loops):
                 for span in iter_n(spans, n=self.num_iterations):
-                    rule.matches(span)
+                    match(span)
 
         yield _
@@ -6,7 +6,6 @@ from typing import Dict
 from typing import Generator
 from typing import List
 from typing import Optional
-from typing import Set
 from typing import Tuple
 from urllib import parse
 
@@ -38,6 +37,21 @@ _WAF_RESULTS = "waf_results"
 GLOBAL_CALLBACKS: Dict[str, Any] = {}
 
 
+class WAF_Stats:
+    """WAF runs of a request"""
+
+    __slots__ = ["calls", "skipped_calls", "duration", "duration_ext"]
+
+    def __init__(self) -> None:
+        # runs of the WAF
+        self.calls: int = 0
+        # WAF calls that did not run the WAF because all the data was already sent
+        self.skipped_calls: int = 0
+        # time spent in the WAF, and in the WAF bindings, in microseconds
+        self.duration: float = 0.0
+        self.duration_ext: float = 0.0
+
+
 class ASM_Environment:
     """
     an object of this class contains all asm data (waf and telemetry)
@@ -52,7 +66,9 @@ class ASM_Environment:
         self.waf_addresses: Dict[str, Any] = {}
         self.callbacks: Dict[str, Any] = {}
         self.telemetry: Dict[str, Any] = {}
-        self.addresses_sent: Set[str] = set()
+        # values sent to the WAF context, by WAF_DATA_NAMES key
+        self.addresses_sent: Dict[str, Any] = {}
+        self.waf_stats: WAF_Stats = WAF_Stats()
 
 
 def _get_asm_context() -> ASM_Environment:
@@ -283,14 +299,35 @@ def block_request() -> None:
         log.debug("Block request called but block callable not set by framework")
 
 
-def get_data_sent() -> Set[str]:
+def get_data_sent() -> Dict[str, Any]:
     env = _get_asm_context()
     if not env.active:
         log.debug("getting addresses sent with no active asm context")
-        return set()
+        return {}
     return env.addresses_sent
 
 
+def record_waf_run(result: Any) -> None:
+    """Record a WAF run of the request, or a skipped run if result is None"""
+    env = _get_asm_context()
+    if not env.active:
+        return
+    stats = env.waf_stats
+    if result is None:
+        stats.skipped_calls += 1
+    else:
+        stats.calls += 1
+        stats.duration += result.runtime
+        stats.duration_ext += result.total_runtime
+
+
+def get_waf_stats() -> Optional[WAF_Stats]:
+    env = _get_asm_context()
+    if not env.active:
+        return None
+    return env.waf_stats
+
+
 def asm_request_context_set(
     remote_ip: Optional[str] = None,
     headers: Any = None,
@@ -0,0 +1,5 @@
+from typing import Any
+
+DDWAF_OBJECT_SIZE: int
+
+def build(address: int, struct: Any, max_objects: int, max_depth: int, max_string_length: int) -> int: ...
@@ -0,0 +1,217 @@
+"""Build the ddwaf_object tree of a Python structure in a single pass.
+
+The memory is allocated with the C allocator so that the objects can be released by ``ddwaf_object_free``, or by the
+WAF context when they are given to it.
+"""
+from cpython.bytes cimport PyBytes_AS_STRING
+from cpython.bytes cimport PyBytes_GET_SIZE
+from cpython.unicode cimport PyUnicode_AsEncodedString
+from libc.stdint cimport int64_t
+from libc.stdint cimport uint64_t
+from libc.stdlib cimport calloc
+from libc.stdlib cimport free
+from libc.stdlib cimport malloc
+from libc.string cimport memcpy
+from libc.string cimport memset
+
+
+cdef extern from "stdbool.h":
+    ctypedef bint c_bool "bool"
+
+
+cdef extern from "string.h":
+    size_t strnlen(const char *s, size_t maxlen)
+
+
+# Must match the definition of ddwaf_object in ddwaf_types.py
+cdef union ddwaf_value:
+    const char *stringValue
+    uint64_t uintValue
+    int64_t intValue
+    ddwaf_object *array
+    c_bool boolean
+    double f64
+
+
+cdef struct ddwaf_object:
+    const char *parameterName
+    uint64_t parameterNameLength
+    ddwaf_value value
+    uint64_t nbEntries
+    int type
+
+
+cdef enum:
+    DDWAF_OBJ_SIGNED = 1 << 0
+    DDWAF_OBJ_STRING = 1 << 2
+    DDWAF_OBJ_ARRAY = 1 << 3
+    DDWAF_OBJ_MAP = 1 << 4
+    DDWAF_OBJ_BOOL = 1 << 5
+    DDWAF_OBJ_FLOAT = 1 << 6
+    DDWAF_OBJ_NULL = 1 << 7
+
+# Same values as ddwaf_types
+cdef enum:
+    TRUNC_STRING_LENGTH = 1
+    TRUNC_CONTAINER_DEPTH = 4
+    TRUNC_CONTAINER_SIZE = 2
+
+
+DDWAF_OBJECT_SIZE = sizeof(ddwaf_object)
+
+
+# The strings are typed as object rather than str and bytes: Cython only accepts the exact types for these, and the
+# subclasses (markupsafe.Markup, str enums, ...) must be converted too.
+cdef inline bytes _encode(object string):
+    return PyUnicode_AsEncodedString(string, "UTF-8", "ignore")
+
+
+cdef char *_copy_string(object string, int64_t max_string_length, uint64_t *length, int *truncation) except NULL:
+    cdef Py_ssize_t size = PyBytes_GET_SIZE(string)
+    cdef int64_t limit = max_string_length - 1
+    cdef char *copy
+
+    # difference of 1 to take null char at the end on the C side into account
+    if size > limit:
+        truncation[0] |= TRUNC_STRING_LENGTH
+        # Same as string[:limit]
+        size = limit if limit >= 0 else max(size + limit, 0)
+
+    # The WAF reads strings up to the first null byte
+    size = strnlen(PyBytes_AS_STRING(string), size)
+    copy = <char *>malloc(size + 1)
+    if copy is NULL:
+        raise MemoryError()
+    memcpy(copy, PyBytes_AS_STRING(string), size)
+    copy[size] = 0
+    length[0] = size
+    return copy
+
+
+cdef int _set_string(ddwaf_object *obj, object string, int64_t max_string_length, int *truncation) except -1:
+    obj.value.stringValue = _copy_string(string, max_string_length, &obj.nbEntries, truncation)
+    obj.type = DDWAF_OBJ_STRING
+    return 0
+
+
+cdef int64_t _as_signed(object value):
+    try:
+        return value
+    except OverflowError:
+        # Wrap around like ctypes does
+        return ((value + (1 << 63)) % (1 << 64)) - (1 << 63)
+
+
+cdef int _build(
+    ddwaf_object *obj,
+    object struct,
+    int64_t max_objects,
+    int64_t max_depth,
+    int64_t max_string_length,
+    int *truncation,
+) except -1:
+    cdef ddwaf_object *entries = NULL
+    cdef ddwaf_object *entry
+    cdef Py_ssize_t capacity
+    cdef int64_t counter_object
+    cdef uint64_t key_length
+
+    memset(obj, 0, sizeof(ddwaf_object))
+
+    if isinstance(struct, bool):
+        obj.value.boolean = struct
+        obj.type = DDWAF_OBJ_BOOL
+    elif isinstance(struct, int):
+        obj.value.intValue = _as_signed(struct)
+        obj.type = DDWAF_OBJ_SIGNED
+    elif isinstance(struct, str):
+        _set_string(obj, _encode(struct), max_string_length, truncation)
+    elif isinstance(struct, bytes):
+        _set_string(obj, struct, max_string_length, truncation)
+    elif isinstance(struct, float):
+        obj.value.f64 = struct
+        obj.type = DDWAF_OBJ_FLOAT
+    elif isinstance(struct, (list, dict)):
+        obj.type = DDWAF_OBJ_ARRAY if isinstance(struct, list) else DDWAF_OBJ_MAP
+        if max_depth <= 0:
+            truncation[0] |= TRUNC_CONTAINER_DEPTH
+            max_objects = 0
+
+        # Allocate the items at once instead of growing the container item by item
+        capacity = min(len(struct), max_objects) if max_objects > 0 else 0
+        if capacity > 0:
+            entries = <ddwaf_object *>calloc(capacity, sizeof(ddwaf_object))
+            if entries is NULL:
+                raise MemoryError()
+            obj.value.array = entries
+
+        counter_object = 0
+        if obj.type == DDWAF_OBJ_ARRAY:
+            for elt in struct:
+                if counter_object >= max_objects:
+                    truncation[0] |= TRUNC_CONTAINER_SIZE
+                    break
+                if obj.nbEntries >= capacity:
+                    # The list grew while it was being converted
+                    break
+                # Count the item before building it so that it is released with the array if the build fails
+                entry = entries + obj.nbEntries
+                obj.nbEntries += 1
+                _build(entry, elt, max_objects, max_depth - 1, max_string_length, truncation)
+                counter_object += 1
+        else:
+            # order is unspecified and could lead to problems if max_objects is reached
+            for key, val in struct.items():
+                # discards non string keys
+                if isinstance(key, str):
+                    key = _encode(key)
+                elif not isinstance(key, bytes):
+                    counter_object += 1
+                    continue
+                if counter_object >= max_objects:
+                    truncation[0] |= TRUNC_CONTAINER_SIZE
+                    break
+                if obj.nbEntries >= capacity:
+                    break
+                entry = entries + obj.nbEntries
+                obj.nbEntries += 1
+                _build(entry, val, max_objects, max_depth - 1, max_string_length, truncation)
+                entry.parameterName = _copy_string(key, max_string_length, &key_length, truncation)
+                entry.parameterNameLength = key_length
+                counter_object += 1
+    elif struct is not None:
+        _set_string(obj, _encode(str(struct)), max_string_length, truncation)
+    else:
+        obj.type = DDWAF_OBJ_NULL
+
+    return 0
+
+
+cdef void _free(ddwaf_object *obj):
+    # Release a tree that was partially built, like ddwaf_object_free would
+    cdef uint64_t i
+
+    if obj.type == DDWAF_OBJ_STRING:
+        free(<void *>obj.value.stringValue)
+    elif obj.type == DDWAF_OBJ_ARRAY or obj.type == DDWAF_OBJ_MAP:
+        if obj.value.array is not NULL:
+            for i in range(obj.nbEntries):
+                free(<void *>obj.value.array[i].parameterName)
+                _free(obj.value.array + i)
+            free(obj.value.array)
+    memset(obj, 0, sizeof(ddwaf_object))
+
+
+def build(size_t address, object struct, int64_t max_objects, int64_t max_depth, int64_t max_string_length):
+    """Build the ddwaf_object of a Python structure at the given address.
+
+    Returns the truncation flags of the limits that were reached. If the structure cannot be converted, the objects
+    already built are released before the exception is raised.
+    """
+    cdef int truncation = 0
+    try:
+        _build(<ddwaf_object *>address, struct, max_objects, max_depth, max_string_length, &truncation)
+    except BaseException:
+        _free(<ddwaf_object *>address)
+        raise
+    return truncation
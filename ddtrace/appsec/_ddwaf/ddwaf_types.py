@@ -11,6 +11,8 @@ from typing import Union
 
 from ddtrace.internal.logger import get_logger
 
+from ._ddwaf_object import build as build_ddwaf_object
+
 
 DDWafRulesType = Union[None, int, str, List[Any], Dict[str, Any]]
 
@@ -126,65 +128,10 @@ class ddwaf_object(ctypes.Structure):
         max_depth: int = DDWAF_MAX_CONTAINER_DEPTH,
         max_string_length: int = DDWAF_MAX_STRING_LENGTH,
     ) -> None:
-        def truncate_string(string: bytes) -> bytes:
-            if len(string) > max_string_length - 1:
-                observator.truncation |= _TRUNC_STRING_LENGTH
-                # difference of 1 to take null char at the end on the C side into account
-                return string[: max_string_length - 1]
-            return string
-
-        if isinstance(struct, bool):
-            ddwaf_object_bool(self, struct)
-        elif isinstance(struct, int):
-            ddwaf_object_signed(self, struct)
-        elif isinstance(struct, str):
-            ddwaf_object_string(self, truncate_string(struct.encode("UTF-8", errors="ignore")))
-        elif isinstance(struct, bytes):
-            ddwaf_object_string(self, truncate_string(struct))
-        elif isinstance(struct, float):
-            ddwaf_object_float(self, struct)
-        elif isinstance(struct, list):
-            if max_depth <= 0:
-                observator.truncation |= _TRUNC_CONTAINER_DEPTH
-                max_objects = 0
-            array = ddwaf_object_array(self)
-            for counter_object, elt in enumerate(struct):
-                if counter_object >= max_objects:
-                    observator.truncation |= _TRUNC_CONTAINER_SIZE
-                    break
-                obj = ddwaf_object(
-                    elt,
-                    observator=observator,
-                    max_objects=max_objects,
-                    max_depth=max_depth - 1,
-                    max_string_length=max_string_length,
-                )
-                ddwaf_object_array_add(array, obj)
-        elif isinstance(struct, dict):
-            if max_depth <= 0:
-                observator.truncation |= _TRUNC_CONTAINER_DEPTH
-                max_objects = 0
-            map_o = ddwaf_object_map(self)
-            # order is unspecified and could lead to problems if max_objects is reached
-            for counter_object, (key, val) in enumerate(struct.items()):
-                if not isinstance(key, (bytes, str)):  # discards non string keys
-                    continue
-                if counter_object >= max_objects:
-                    observator.truncation |= _TRUNC_CONTAINER_SIZE
-                    break
-                res_key = truncate_string(key.encode("UTF-8", errors="ignore") if isinstance(key, str) else key)
-                obj = ddwaf_object(
-                    val,
-                    observator=observator,
-                    max_objects=max_objects,
-                    max_depth=max_depth - 1,
-                    max_string_length=max_string_length,
-                )
-                ddwaf_object_map_add(map_o, res_key, obj)
-        elif struct is not None:
-            ddwaf_object_string(self, truncate_string(str(struct).encode("UTF-8", errors="ignore")))
-        else:
-            ddwaf_object_null(self)
+        # The object tree is built natively, in a single pass, with memory that ddwaf_object_free can release.
+        truncation = build_ddwaf_object(ctypes.addressof(self), struct, max_objects, max_depth, max_string_length)
+        if truncation:
+            observator.truncation |= truncation
 
     @classmethod
     def create_without_limits(cls, struct: DDWafRulesType) -> "ddwaf_object":
@@ -84,11 +84,12 @@ def _should_iast_patch(module_name):  # type: (str) -> bool
     return diff > 0 or (diff == 0 and not _in_python_stdlib_or_third_party(module_name))
 
 
-def visit_ast(
+def _visit_ast(
     source_text,  # type: str
     module_path,  # type: str
     module_name="",  # type: str
-):  # type: (...) -> Optional[str]
+):  # type: (...) -> Tuple[Optional[ast.AST], int]
+    """Patch the AST of the source, and count the propagation points instrumented."""
     parsed_ast = ast.parse(source_text, module_path)
 
     visitor = AstVisitor(
@@ -98,10 +99,18 @@ def visit_ast(
     modified_ast = visitor.visit(parsed_ast)
 
     if not visitor.ast_modified:
-        return None
+        return None, 0
 
     ast.fix_missing_locations(modified_ast)
-    return modified_ast
+    return modified_ast, visitor.instrumented_propagation
+
+
+def visit_ast(
+    source_text,  # type: str
+    module_path,  # type: str
+    module_name="",  # type: str
+):  # type: (...) -> Optional[ast.AST]
+    return _visit_ast(source_text, module_path, module_name)[0]
 
 
 _FLASK_INSTANCE_REGEXP = re.compile(r"(\S*)\s*=.*Flask\(.*")
@@ -123,9 +132,9 @@ def _remove_flask_run(text):  # type (str) -> str
     return new_text
 
 
-def astpatch_module(module, remove_flask_run=False):
-    # type: (ModuleType, bool) -> Tuple[str, str]
-    module_name = module.__name__
+def get_module_source(module):
+    # type: (ModuleType) -> Tuple[str, str]
+    """Get the path and the source of a module that can be AST patched, or empty strings."""
     module_path = str(origin(module))
     try:
         if os.stat(module_path).st_size == 0:
@@ -158,6 +167,16 @@ def astpatch_module(module, remove_flask_run=False):
         log.debug("empty file: %s", module_path)
         return "", ""
 
+    return module_path, source_text
+
+
+def astpatch_module(module, remove_flask_run=False):
+    # type: (ModuleType, bool) -> Tuple[str, str]
+    module_name = module.__name__
+    module_path, source_text = get_module_source(module)
+    if not source_text:
+        return "", ""
+
     if remove_flask_run:
         source_text = _remove_flask_run(source_text)
 
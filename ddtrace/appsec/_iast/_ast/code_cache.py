@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""On-disk cache of the code objects of the AST patched modules.
+
+Patching a module parses, visits and compiles its source again. The resulting code object is stored next to the
+regular bytecode cache (``__pycache__/<module>.<tag>.opt-iast.pyc``), or in ``DD_IAST_CODE_CACHE_DIR``, so that the
+next processes can skip the patching. An entry is only used when its key matches: the key covers the source of the
+module, its path and name, the Python bytecode version, the ddtrace version and the aspects applied by the visitor.
+"""
+import hashlib
+import importlib.util
+import marshal
+import os
+import stat
+import struct
+import sys
+import tempfile
+from types import CodeType
+from types import ModuleType
+from typing import Any
+from typing import Optional
+from typing import Tuple
+
+from ddtrace.internal.logger import get_logger
+from ddtrace.settings.asm import config as asm_config
+from ddtrace.version import get_version
+
+from .._metrics import _set_metric_iast_instrumented_propagation
+from .ast_patching import _visit_ast
+from .ast_patching import get_module_source
+from .visitor import AstVisitor
+
+
+log = get_logger(__name__)
+
+_MAGIC = b"DDIA"
+# magic, key digest, number of instrumented propagation points
+_HEADER = struct.Struct("<4s32sI")
+_SOURCE_EXTENSIONS = {".py", ".pyw"}
+
+_aspects_fingerprint = None  # type: Optional[bytes]
+
+
+def _stable_repr(obj):
+    # type: (Any) -> str
+    # repr of sets and dicts depends on the hash seed of the process
+    if isinstance(obj, dict):
+        return "{%s}" % ",".join(sorted("%s:%s" % (_stable_repr(k), _stable_repr(v)) for k, v in obj.items()))
+    if isinstance(obj, (set, frozenset)):
+        return "{%s}" % ",".join(sorted(_stable_repr(v) for v in obj))
+    if isinstance(obj, (list, tuple)):
+        return "[%s]" % ",".join(_stable_repr(v) for v in obj)
+    if isinstance(obj, type):
+        return "%s.%s" % (obj.__module__, obj.__qualname__)
+    return repr(obj)
+
+
+def _get_aspects_fingerprint():
+    # type: () -> bytes
+    global _aspects_fingerprint
+    if _aspects_fingerprint is None:
+        visitor = AstVisitor()
+        _aspects_fingerprint = hashlib.sha256(
+            _stable_repr([visitor._aspects_spec, visitor._sinkpoints_spec]).encode()
+        ).digest()
+    return _aspects_fingerprint
+
+
+def _cache_key(module_path, module_name, source_text):
+    # type: (str, str, str) -> bytes
+    h = hashlib.sha256()
+    for part in (
+        importlib.util.MAGIC_NUMBER,
+        get_version().encode(),
+        _get_aspects_fingerprint(),
+        module_path.encode("utf-8", "surrogatepass"),
+        module_name.encode("utf-8", "surrogatepass"),
+    ):
+        h.update(struct.pack("<I", len(part)))
+        h.update(part)
+    h.update(source_text.encode("utf-8", "surrogatepass"))
+    return h.digest()
+
+
+def _cache_path(module_path):
+    # type: (str) -> Optional[str]
+    if os.path.splitext(module_path)[1].lower() not in _SOURCE_EXTENSIONS:
+        return None
+
+    cache_dir = asm_config._iast_code_cache_dir
+    if cache_dir:
+        # Flat directory shared by all the modules: the path digest tells the modules with the same name apart
+        name = os.path.splitext(os.path.basename(module_path))[0]
+        path_digest = hashlib.sha256(os.path.abspath(module_path).encode("utf-8", "surrogatepass")).hexdigest()[:16]
+        return os.path.join(cache_dir, "%s.%s.%s.iast.pyc" % (name, path_digest, sys.implementation.cache_tag))
+
+    try:
+        return importlib.util.cache_from_source(module_path, optimization="iast")
+    except NotImplementedError:
+        # sys.implementation.cache_tag is None
+        return None
+
+
+def _load(cache_path, key):
+    # type: (str, bytes) -> Optional[Tuple[Optional[CodeType], int]]
+    """Load an entry of the cache, or None if there is no valid entry for the key."""
+    try:
+        with open(cache_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    if len(data) < _HEADER.size:
+        return None
+    magic, entry_key, instrumented_propagation = _HEADER.unpack_from(data)
+    if magic != _MAGIC or entry_key != key:
+        return None
+
+    try:
+        code = marshal.loads(data[_HEADER.size :])  # nosec
+    except (EOFError, ValueError, TypeError):
+        log.debug("invalid IAST code cache entry: %s", cache_path, exc_info=True)
+        return None
+    if code is not None and not isinstance(code, CodeType):
+        return None
+
+    return code, instrumented_propagation
+
+
+def _cache_mode(module_path):
+    # type: (str) -> int
+    # Same permissions as the regular bytecode cache: those of the source, writable by the owner
+    try:
+        mode = os.stat(module_path).st_mode
+    except OSError:
+        mode = 0o644
+    return (stat.S_IMODE(mode) | 0o200) & 0o666
+
+
+def _store(module_path, cache_path, key, code, instrumented_propagation):
+    # type: (str, str, bytes, Optional[CodeType], int) -> None
+    """Store an entry of the cache.
+
+    The entry is written to a temporary file that replaces the previous entry at once, so that processes that import
+    the module concurrently never read a partial entry. The temporary file is only readable by its owner, so it is
+    given the permissions of the source of the module first.
+    """
+    if sys.dont_write_bytecode:
+        return
+
+    data = _HEADER.pack(_MAGIC, key, instrumented_propagation) + marshal.dumps(code)
+    cache_dir = os.path.dirname(cache_path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(cache_path) + ".", dir=cache_dir)
+    except OSError:
+        log.debug("cannot create the IAST code cache entry: %s", cache_path, exc_info=True)
+        return
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, _cache_mode(module_path))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        log.debug("cannot write the IAST code cache entry: %s", cache_path, exc_info=True)
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def _patch(module_path, module_name, source_text):
+    # type: (str, str, str) -> Tuple[Optional[CodeType], int]
+    patched_ast, instrumented_propagation = _visit_ast(source_text, module_path, module_name=module_name)
+    if patched_ast is None:
+        log.debug("file not ast patched: %s", module_path)
+        return None, 0
+
+    return compile(patched_ast, module_path, "exec"), instrumented_propagation
+
+
+def get_patched_code(module):
+    # type: (ModuleType) -> Optional[CodeType]
+    """Get the code object of the AST patched module, or None if the module is not patched."""
+    module_name = module.__name__
+    module_path, source_text = get_module_source(module)
+    if not source_text:
+        return None
+
+    cache_path = _cache_path(module_path) if asm_config._iast_code_cache_enabled else None
+    if cache_path is None:
+        return _patch(module_path, module_name, source_text)[0]
+
+    key = _cache_key(module_path, module_name, source_text)
+    entry = _load(cache_path, key)
+    if entry is not None:
+        code, instrumented_propagation = entry
+        # Report the instrumentation as if the module had been patched
+        for _ in range(instrumented_propagation):
+            _set_metric_iast_instrumented_propagation()
+        return code
+
+    code, instrumented_propagation = _patch(module_path, module_name, source_text)
+    _store(module_path, cache_path, key, code, instrumented_propagation)
+    return code
@@ -128,6 +128,8 @@ class AstVisitor(ast.NodeTransformer):
         }
         self._sinkpoints_functions = self._sinkpoints_spec["functions"]
         self.ast_modified = False
+        # Number of propagation points instrumented in the module
+        self.instrumented_propagation = 0
         self.filename = filename
         self.module_name = module_name
 
@@ -169,6 +171,10 @@ class AstVisitor(ast.NodeTransformer):
         elif "lib/python" in self.filename:
             self.codetype = CODE_TYPE_STDLIB
 
+    def _set_metric_instrumented_propagation(self):  # type: () -> None
+        self.instrumented_propagation += 1
+        _set_metric_iast_instrumented_propagation()
+
     @staticmethod
     def _merge_taint_sinks(*args_functions: Set[str]) -> Set[str]:
         merged_set = set()
@@ -492,7 +498,7 @@ class AstVisitor(ast.NodeTransformer):
                     self.ast_modified = call_modified = True
 
         if call_modified:
-            _set_metric_iast_instrumented_propagation()
+            self._set_metric_instrumented_propagation()
 
         return call_node
 
@@ -506,7 +512,7 @@ class AstVisitor(ast.NodeTransformer):
         aspect = self._aspect_operators.get(operator.__class__)
         if aspect:
             self.ast_modified = True
-            _set_metric_iast_instrumented_propagation()
+            self._set_metric_instrumented_propagation()
 
             return ast.Call(self._attr_node(call_node, aspect), [call_node.left, call_node.right], [])
 
@@ -540,7 +546,7 @@ class AstVisitor(ast.NodeTransformer):
         )
 
         self.ast_modified = True
-        _set_metric_iast_instrumented_propagation()
+        self._set_metric_instrumented_propagation()
         return call_node
 
     def visit_JoinedStr(self, joinedstr_node):  # type: (ast.JoinedStr) -> Any
@@ -570,7 +576,7 @@ class AstVisitor(ast.NodeTransformer):
         )
 
         self.ast_modified = True
-        _set_metric_iast_instrumented_propagation()
+        self._set_metric_instrumented_propagation()
         return call_node
 
     def visit_AugAssign(self, augassign_node):  # type: (ast.AugAssign) -> Any
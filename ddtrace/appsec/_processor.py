@@ -111,6 +111,17 @@ def _set_headers(span: Span, headers: Any, kind: str) -> None:
             span.set_tag(_normalize_tag_name(kind, key), value)
 
 
+_NOT_SENT = object()
+
+
+def _already_sent(previous: Any, value: Any) -> bool:
+    """Whether the value of an address was already sent to the WAF context of the request."""
+    if previous is value:
+        return True
+    # Containers can be large: they are only compared by identity
+    return previous is not _NOT_SENT and isinstance(value, (str, bytes, int, float)) and previous == value
+
+
 def _get_rate_limiter() -> RateLimiter:
     return RateLimiter(int(os.getenv("DD_APPSEC_TRACE_RATE_LIMIT", DEFAULT.TRACE_RATE_LIMIT)))
 
@@ -125,6 +136,8 @@ class AppSecSpanProcessor(SpanProcessor):
         default_factory=get_appsec_obfuscation_parameter_value_regexp
     )
     _addresses_to_keep: Set[str] = dataclasses.field(default_factory=set)
+    # (WAF_DATA_NAMES key, WAF address) of the addresses in _addresses_to_keep
+    _data_names_to_keep: List[Tuple[str, str]] = dataclasses.field(default_factory=list)
     _rate_limiter: RateLimiter = dataclasses.field(default_factory=_get_rate_limiter)
 
     @property
@@ -196,6 +209,10 @@ class AppSecSpanProcessor(SpanProcessor):
             self._update_actions(new_rules)
             result = self._ddwaf.update_rules(new_rules)
             _set_waf_updates_metric(self._ddwaf.info)
+            if result:
+                # The new rules can require new addresses
+                for address in self._ddwaf.required_data:
+                    self._mark_needed(address)
         except TypeError:
             error_msg = "Error updating ASM rules. TypeError exception "
             log.debug(error_msg, exc_info=True)
@@ -255,8 +272,11 @@ class AppSecSpanProcessor(SpanProcessor):
         """
         Call the `WAF` with the given parameters. If `custom_data_names` is specified as
         a list of `(WAF_NAME, WAF_STR)` tuples specifying what values of the `WAF_DATA_NAMES`
-        constant class will be checked. Else, it will check all the possible values
-        from `WAF_DATA_NAMES`.
+        constant class will be checked. Else, it will check all the values of
+        `WAF_DATA_NAMES` required by the rules.
+
+        Only the values that were not already sent to the WAF context of the request
+        are evaluated, and the WAF is not run when there is no new value.
 
         If `custom_data_values` is specified, it must be a dictionary where the key is the
         `WAF_DATA_NAMES` key and the value the custom value. If not used, the values will
@@ -272,27 +292,32 @@ class AppSecSpanProcessor(SpanProcessor):
                 return None
 
         data = {}
-        iter_data = [(key, WAF_DATA_NAMES[key]) for key in custom_data] if custom_data is not None else WAF_DATA_NAMES
+        iter_data = (
+            [(key, WAF_DATA_NAMES[key]) for key in custom_data] if custom_data is not None else self._data_names_to_keep
+        )
+        # Addresses already sent to the WAF context of the request, with the value that was sent
         data_already_sent = _asm_request_context.get_data_sent()
-        if data_already_sent is None:
-            data_already_sent = set()
+        waf_addresses = _asm_request_context.get_waf_addresses({})
 
-        # type ignore because mypy seems to not detect that both results of the if
-        # above can iter if not None
         force_keys = custom_data.get("PROCESSOR_SETTINGS", {}).get("extract-schema", False) if custom_data else False
-        for key, waf_name in iter_data:  # type: ignore[attr-defined]
-            if key in data_already_sent:
+        for key, waf_name in iter_data:
+            if not (force_keys or self._is_needed(waf_name)):
+                continue
+            value = None
+            if custom_data is not None and custom_data.get(key) is not None:
+                value = custom_data.get(key)
+            elif key in SPAN_DATA_NAMES:
+                value = waf_addresses.get(SPAN_DATA_NAMES[key])
+            if value is None or _already_sent(data_already_sent.get(key, _NOT_SENT), value):
                 continue
-            if self._is_needed(waf_name) or force_keys:
-                value = None
-                if custom_data is not None and custom_data.get(key) is not None:
-                    value = custom_data.get(key)
-                elif key in SPAN_DATA_NAMES:
-                    value = _asm_request_context.get_value("waf_addresses", SPAN_DATA_NAMES[key])
-                if value is not None:
-                    data[waf_name] = _transform_headers(value) if key.endswith("HEADERS_NO_COOKIES") else value
-                    data_already_sent.add(key)
-                    log.debug("[action] WAF got value %s", SPAN_DATA_NAMES.get(key, key))
+            data[waf_name] = _transform_headers(value) if key.endswith("HEADERS_NO_COOKIES") else value
+            data_already_sent[key] = value
+            log.debug("[action] WAF got value %s", SPAN_DATA_NAMES.get(key, key))
+
+        if not data:
+            # The WAF context has already evaluated all the data of the request
+            _asm_request_context.record_waf_run(None)
+            return None
 
         waf_results = self._ddwaf.run(ctx, data, asm_config._waf_timeout)
         if waf_results and waf_results.data:
@@ -317,6 +342,7 @@ class AppSecSpanProcessor(SpanProcessor):
         else:
             blocked = {}
         _asm_request_context.set_waf_results(waf_results, self._ddwaf.info, bool(blocked))
+        _asm_request_context.record_waf_run(waf_results)
         if blocked:
             core.set_item(WAF_CONTEXT_NAMES.BLOCKED, blocked, span=span)
             core.set_item(WAF_CONTEXT_NAMES.BLOCKED, blocked)
@@ -393,7 +419,9 @@ class AppSecSpanProcessor(SpanProcessor):
         return waf_results.derivatives
 
     def _mark_needed(self, address: str) -> None:
-        self._addresses_to_keep.add(address)
+        if address not in self._addresses_to_keep:
+            self._addresses_to_keep.add(address)
+            self._data_names_to_keep = [(key, name) for key, name in WAF_DATA_NAMES if name in self._addresses_to_keep]
 
     def _is_needed(self, address: str) -> bool:
         return address in self._addresses_to_keep
@@ -1,7 +1,6 @@
 import os
 import uuid
 
-from ddtrace.appsec import _asm_request_context
 from ddtrace.appsec._constants import API_SECURITY
 from ddtrace.constants import APPSEC_ENV
 from ddtrace.internal.logger import get_logger
@@ -20,6 +19,7 @@ def parse_response_body(raw_body):
 
     import xmltodict
 
+    from ddtrace.appsec import _asm_request_context
     from ddtrace.appsec._constants import SPAN_DATA_NAMES
     from ddtrace.contrib.trace_utils import _get_header_value_case_insensitive
 
@@ -11,17 +11,20 @@ import warnings  # noqa
 
 from ddtrace import config  # noqa
 from ddtrace._logger import _configure_log_injection
-from ddtrace.debugging._config import di_config  # noqa
-from ddtrace.debugging._config import ed_config  # noqa
 from ddtrace.internal.compat import PY2  # noqa
 from ddtrace.internal.logger import get_logger  # noqa
 from ddtrace.internal.module import ModuleWatchdog  # noqa
 from ddtrace.internal.module import find_loader  # noqa
-from ddtrace.internal.runtime.runtime_metrics import RuntimeWorker  # noqa
-from ddtrace.internal.tracemethods import _install_trace_methods  # noqa
 from ddtrace.internal.utils.formats import asbool  # noqa
 from ddtrace.internal.utils.formats import parse_tags_str  # noqa
 from ddtrace.settings.asm import config as asm_config  # noqa
+from ddtrace.settings.dynamic_instrumentation import config as di_config  # noqa
+from ddtrace.settings.exception_debugging import config as ed_config  # noqa
+
+
+# DEV: di_config and ed_config come from the settings rather than ddtrace.debugging._config: importing anything from
+# the ddtrace.debugging package loads the debugger and all its dependencies. Features are only imported below when
+# they are enabled, to keep the startup of short-lived processes cheap.
 
 # Debug mode from the tracer will do the same here, so only need to do this otherwise.
 if config.logs_injection:
@@ -141,6 +144,8 @@ try:
         DynamicInstrumentation.enable()
 
     if config._runtime_metrics_enabled:
+        from ddtrace.internal.runtime.runtime_metrics import RuntimeWorker
+
         RuntimeWorker.enable()
 
     if asbool(os.getenv("DD_IAST_ENABLED", False)):
@@ -165,6 +170,8 @@ try:
         patch_all(**modules_to_bool)
 
         if config.trace_methods:
+            from ddtrace.internal.tracemethods import _install_trace_methods
+
             _install_trace_methods(config.trace_methods)
     else:
         cleanup_loaded_modules()
@@ -18,6 +18,8 @@ from .internal.utils.http import w3c_get_dd_list_member as _w3c_get_dd_list_memb
 
 
 if TYPE_CHECKING:  # pragma: no cover
+    from typing import Callable
+    from typing import Dict
     from typing import Tuple
 
     from .span import Span
@@ -48,6 +50,7 @@ class Context(object):
         "_lock",
         "_meta",
         "_metrics",
+        "_propagation_cache",
     ]
 
     def __init__(
@@ -62,6 +65,10 @@ class Context(object):
     ):
         self._meta = meta if meta is not None else {}  # type: _MetaDictType
         self._metrics = metrics if metrics is not None else {}  # type: _MetricDictType
+        # Propagation header values computed from the trace state, shared by
+        # the contexts of the trace. Each value is stored along with the state
+        # it was computed from, so that it is recomputed when the state changes.
+        self._propagation_cache = {}  # type: Dict[str, Tuple[Any, Any]]
 
         self.trace_id = trace_id  # type: Optional[int]
         self.span_id = span_id  # type: Optional[int]
@@ -94,13 +101,30 @@ class Context(object):
         self.trace_id, self.span_id, self._meta, self._metrics = state
         # We cannot serialize and lock, so we must recreate it unless we already have one
         self._lock = threading.RLock()
+        self._propagation_cache = {}
 
     def _with_span(self, span):
         # type: (Span) -> Context
         """Return a shallow copy of the context with the given span."""
-        return self.__class__(
+        context = self.__class__(
             trace_id=span.trace_id, span_id=span.span_id, meta=self._meta, metrics=self._metrics, lock=self._lock
         )
+        context._propagation_cache = self._propagation_cache
+        return context
+
+    def _get_propagation_value(self, name, state, compute):
+        # type: (str, Any, Callable[[Context], Any]) -> Any
+        """Return the propagation value computed from the given trace state.
+
+        The value is only computed again when the state changes.
+        """
+        cached = self._propagation_cache.get(name)
+        if cached is not None and cached[0] == state:
+            return cached[1]
+
+        value = compute(self)
+        self._propagation_cache[name] = (state, value)
+        return value
 
     def _update_tags(self, span):
         # type: (Span) -> None
@@ -151,6 +175,12 @@ class Context(object):
 
     @property
     def _tracestate(self):
+        # type: () -> str
+        return self._get_propagation_value(
+            W3C_TRACESTATE_KEY, (self.sampling_priority, frozenset(self._meta.items())), Context._build_tracestate
+        )
+
+    def _build_tracestate(self):
         # type: () -> str
         dd_list_member = _w3c_get_dd_list_member(self)
 
@@ -99,6 +99,8 @@ def patch():
     for consumer in (TracedConsumer, TracedDeserializingConsumer):
         trace_utils.wrap(consumer, "poll", traced_poll)
         trace_utils.wrap(consumer, "commit", traced_commit)
+    # DeserializingConsumer does not support consuming messages in batches
+    trace_utils.wrap(TracedConsumer, "consume", traced_consume)
     Pin().onto(confluent_kafka.Producer)
     Pin().onto(confluent_kafka.Consumer)
     Pin().onto(confluent_kafka.SerializingProducer)
@@ -117,6 +119,8 @@ def unpatch():
             trace_utils.unwrap(consumer, "poll")
         if trace_utils.iswrapped(consumer.commit):
             trace_utils.unwrap(consumer, "commit")
+    if trace_utils.iswrapped(TracedConsumer.consume):
+        trace_utils.unwrap(TracedConsumer, "consume")
 
     confluent_kafka.Producer = _Producer
     confluent_kafka.Consumer = _Consumer
@@ -196,6 +200,40 @@ def traced_poll(func, instance, args, kwargs):
         return message
 
 
+def traced_consume(func, instance, args, kwargs):
+    pin = Pin.get_from(instance)
+    if not pin or not pin.enabled():
+        return func(*args, **kwargs)
+
+    # A single span covers the whole batch of messages, so that the cost of tracing
+    # does not grow with the number of consumed messages.
+    with pin.tracer.trace(
+        schematize_messaging_operation(kafkax.CONSUME, provider="kafka", direction=SpanDirection.PROCESSING),
+        service=trace_utils.ext_service(pin, config.kafka),
+        span_type=SpanTypes.WORKER,
+    ) as span:
+        messages = func(*args, **kwargs)
+        span.set_tag_str(MESSAGING_SYSTEM, kafkax.SERVICE)
+        span.set_tag_str(COMPONENT, config.kafka.integration_name)
+        span.set_tag_str(SPAN_KIND, SpanKind.CONSUMER)
+        span.set_tag_str(kafkax.RECEIVED_MESSAGE, str(bool(messages)))
+        span.set_tag_str(kafkax.GROUP_ID, instance._group_id)
+        span.set_metric(kafkax.BATCH_SIZE, len(messages) if messages else 0)
+        if messages:
+            core.dispatch("kafka.consume.batch.start", [instance, messages])
+
+            topics = {message.topic() for message in messages}
+            if len(topics) == 1:
+                topic = topics.pop()
+                if topic is not None:
+                    span.set_tag_str(kafkax.TOPIC, topic)
+        span.set_tag(SPAN_MEASURED_KEY)
+        rate = config.kafka.get_analytics_sample_rate()
+        if rate is not None:
+            span.set_tag(ANALYTICS_SAMPLE_RATE_KEY, rate)
+        return messages
+
+
 def traced_commit(func, instance, args, kwargs):
     pin = Pin.get_from(instance)
     if not pin or not pin.enabled():
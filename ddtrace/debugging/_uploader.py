@@ -4,11 +4,10 @@ from urllib.parse import quote
 from ddtrace.debugging._config import di_config
 from ddtrace.debugging._encoding import BufferedEncoder
 from ddtrace.debugging._metrics import metrics
-from ddtrace.internal import compat
+from ddtrace.internal.agent import connection_pool
 from ddtrace.internal.logger import get_logger
 from ddtrace.internal.periodic import AwakeablePeriodicService
 from ddtrace.internal.runtime import container
-from ddtrace.internal.utils.http import connector
 from ddtrace.internal.utils.retry import fibonacci_backoff_with_jitter
 
 
@@ -43,7 +42,6 @@ class LogsIntakeUploaderV1(AwakeablePeriodicService):
 
         if di_config._tags_in_qs and di_config.tags:
             self.ENDPOINT += f"?ddtags={quote(di_config.tags)}"
-        self._connect = connector(di_config._intake_url, timeout=di_config.upload_timeout)
 
         # Make it retryable
         self._write_with_backoff = fibonacci_backoff_with_jitter(
@@ -60,20 +58,20 @@ class LogsIntakeUploaderV1(AwakeablePeriodicService):
 
     def _write(self, payload: bytes) -> None:
         try:
-            with self._connect() as conn:
-                conn.request(
-                    "POST",
-                    self.ENDPOINT,
-                    payload,
-                    headers=self._headers,
-                )
-                resp = compat.get_connection_response(conn)
-                if not (200 <= resp.status < 300):
-                    log.error("Failed to upload payload: [%d] %r", resp.status, resp.read())
-                    meter.increment("upload.error", tags={"status": str(resp.status)})
-                else:
-                    meter.increment("upload.success")
-                    meter.distribution("upload.size", len(payload))
+            resp, body = connection_pool.request(
+                di_config._intake_url,
+                "POST",
+                self.ENDPOINT,
+                payload,
+                self._headers,
+                timeout=di_config.upload_timeout,
+            )
+            if not (200 <= resp.status < 300):
+                log.error("Failed to upload payload: [%d] %r", resp.status, body)
+                meter.increment("upload.error", tags={"status": str(resp.status)})
+            else:
+                meter.increment("upload.success")
+                meter.distribution("upload.size", len(payload))
         except Exception:
             log.error("Failed to write payload", exc_info=True)
             meter.increment("error")
@@ -7,6 +7,7 @@ MESSAGE_OFFSET = "kafka.message_offset"
 GROUP_ID = "kafka.group_id"
 TOMBSTONE = "kafka.tombstone"
 RECEIVED_MESSAGE = "kafka.received_message"
+BATCH_SIZE = "kafka.batch_size"
 
 HOST_LIST = "messaging.kafka.bootstrap.servers"
 
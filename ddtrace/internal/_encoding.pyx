@@ -97,6 +97,17 @@ cdef inline int array_prefix_size(stdint.uint32_t l):
     return MSGPACK_ARRAY_LENGTH_PREFIX_SIZE
 
 
+cdef inline int update_array_len(msgpack_packer *pk, stdint.uint32_t count):
+    """Write the array size prefix in front of the packed items and return its offset."""
+    cdef int offset = MSGPACK_ARRAY_LENGTH_PREFIX_SIZE - array_prefix_size(count)
+    cdef int old_pos = pk.length
+
+    pk.length = offset
+    msgpack_pack_array(pk, count)
+    pk.length = old_pos
+    return offset
+
+
 cdef inline int pack_bytes(msgpack_packer *pk, char *bs, Py_ssize_t l):
     cdef int ret
 
@@ -412,26 +423,44 @@ cdef class ListBufferedEncoder(BufferedEncoder):
 
 
 cdef class MsgpackEncoderBase(BufferedEncoder):
+    """Msgpack trace encoder.
+
+    The encoder is double-buffered: producers pack traces into the active
+    buffer while the writer drains the sealed one. Sealing swaps the two
+    buffers under the lock without copying any data, so encoding a payload
+    never blocks the threads that are putting traces.
+    """
     content_type = "application/msgpack"
 
     cdef msgpack_packer pk
     cdef stdint.uint32_t _count
+    cdef msgpack_packer _sealed_pk
+    cdef stdint.uint32_t _sealed_count
+    cdef object _flush_lock
 
     def __cinit__(self, size_t max_size, size_t max_item_size):
         cdef int buf_size = 1024*1024
         self.pk.buf = <char*> PyMem_Malloc(buf_size)
         if self.pk.buf == NULL:
             raise MemoryError("Unable to allocate internal buffer.")
+        self._sealed_pk.buf = <char*> PyMem_Malloc(buf_size)
+        if self._sealed_pk.buf == NULL:
+            raise MemoryError("Unable to allocate internal buffer.")
 
         self.max_size = max_size
         self.pk.buf_size = buf_size
+        self._sealed_pk.buf_size = buf_size
         self.max_item_size = max_item_size if max_item_size < max_size else max_size
         self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
         self._reset_buffer()
+        self._reset_sealed_buffer()
 
     def __dealloc__(self):
         PyMem_Free(self.pk.buf)
         self.pk.buf = NULL
+        PyMem_Free(self._sealed_pk.buf)
+        self._sealed_pk.buf = NULL
 
     def __len__(self):  # TODO: Use a better name?
         return self._count
@@ -446,23 +475,42 @@ cdef class MsgpackEncoderBase(BufferedEncoder):
         self._count = 0
         self.pk.length = MSGPACK_ARRAY_LENGTH_PREFIX_SIZE  # Leave room for array length prefix
 
+    cdef _reset_sealed_buffer(self):
+        self._sealed_count = 0
+        self._sealed_pk.length = MSGPACK_ARRAY_LENGTH_PREFIX_SIZE  # Leave room for array length prefix
+
+    cdef _seal_buffer(self):
+        """Swap the active and the sealed buffers.
+
+        Must be called with the lock held. Only the packer structures are
+        swapped, the buffer contents are not copied.
+        """
+        cdef msgpack_packer pk = self.pk
+        self.pk = self._sealed_pk
+        self._sealed_pk = pk
+        self._sealed_count = self._count
+        self._reset_buffer()
+
     cpdef encode(self):
-        with self._lock:
-            if not self._count:
-                return None
+        with self._flush_lock:
+            with self._lock:
+                if not self._count:
+                    return None
+                self._seal_buffer()
 
-            return self.flush()
+            return self._flush_sealed()
+
+    cpdef flush(self):
+        with self._flush_lock:
+            with self._lock:
+                self._seal_buffer()
+
+            return self._flush_sealed()
 
     cdef inline int _update_array_len(self):
         """Update traces array size prefix"""
-        cdef int offset = MSGPACK_ARRAY_LENGTH_PREFIX_SIZE - array_prefix_size(self._count)
-        cdef int old_pos = self.pk.length
-
         with self._lock:
-            self.pk.length = offset
-            msgpack_pack_array(&self.pk, self._count)
-            self.pk.length = old_pos
-            return offset
+            return update_array_len(&self.pk, self._count)
 
     cdef get_bytes(self):
         """Return internal buffer contents as bytes object"""
@@ -474,6 +522,20 @@ cdef class MsgpackEncoderBase(BufferedEncoder):
         """Return internal buffer."""
         return self.pk.buf + self._update_array_len()
 
+    cdef get_sealed_bytes(self):
+        """Return the sealed buffer contents as bytes object"""
+        cdef int offset = update_array_len(&self._sealed_pk, self._sealed_count)
+        return PyBytes_FromStringAndSize(self._sealed_pk.buf + offset, self._sealed_pk.length - offset)
+
+    cdef char * get_sealed_buffer(self):
+        """Return the sealed buffer."""
+        return self._sealed_pk.buf + update_array_len(&self._sealed_pk, self._sealed_count)
+
+    @property
+    def sealed_size(self):
+        """Return the size in bytes of the sealed buffer."""
+        return self._sealed_pk.length + array_prefix_size(self._sealed_count) - MSGPACK_ARRAY_LENGTH_PREFIX_SIZE
+
     cdef void * get_dd_origin_ref(self, str dd_origin):
         raise NotImplementedError()
 
@@ -542,7 +604,11 @@ cdef class MsgpackEncoderBase(BufferedEncoder):
 
     # ---- Abstract methods ----
 
-    cpdef flush(self):
+    cdef _flush_sealed(self):
+        """Return the payload for the sealed buffer and reset it.
+
+        Called with the flush lock held, but not the producer lock.
+        """
         raise NotImplementedError()
 
     cdef int pack_span(self, object span, void *dd_origin) except? -1:
@@ -550,12 +616,11 @@ cdef class MsgpackEncoderBase(BufferedEncoder):
 
 
 cdef class MsgpackEncoderV03(MsgpackEncoderBase):
-    cpdef flush(self):
-        with self._lock:
-            try:
-                return self.get_bytes()
-            finally:
-                self._reset_buffer()
+    cdef _flush_sealed(self):
+        try:
+            return self.get_sealed_bytes()
+        finally:
+            self._reset_sealed_buffer()
 
     cdef void * get_dd_origin_ref(self, str dd_origin):
         return string_to_buff(dd_origin)
@@ -781,24 +846,36 @@ cdef class MsgpackEncoderV03(MsgpackEncoderBase):
 cdef class MsgpackEncoderV05(MsgpackEncoderBase):
     cdef MsgpackStringTable _st
     cdef dict _encoded_spans
+    cdef MsgpackStringTable _sealed_st
+    cdef dict _sealed_encoded_spans
+    cdef bint _verify_payloads
 
     def __cinit__(self, size_t max_size, size_t max_item_size):
+        from ddtrace import config
+
         self._st = MsgpackStringTable(max_size)
         self._encoded_spans = {}
+        self._sealed_st = MsgpackStringTable(max_size)
+        self._sealed_encoded_spans = {}
+        self._verify_payloads = config._trace_writer_log_err_payload
 
-    cpdef flush(self):
-        with self._lock:
-            try:
-                self._st.append_raw(
-                    PyLong_FromLong(<long> self.get_buffer()),
-                    <Py_ssize_t> super(MsgpackEncoderV05, self).size,
-                )
-                v05bytes = self._st.flush()
-                self._verify_encoding(v05bytes)
-                return v05bytes
-            finally:
-                self._reset_buffer()
-                self._encoded_spans = {}
+    cdef _seal_buffer(self):
+        MsgpackEncoderBase._seal_buffer(self)
+        self._st, self._sealed_st = self._sealed_st, self._st
+        self._encoded_spans, self._sealed_encoded_spans = self._sealed_encoded_spans, self._encoded_spans
+
+    cdef _flush_sealed(self):
+        try:
+            self._sealed_st.append_raw(
+                PyLong_FromLong(<long> self.get_sealed_buffer()),
+                <Py_ssize_t> self.sealed_size,
+            )
+            v05bytes = self._sealed_st.flush()
+            self._verify_encoding(v05bytes)
+            return v05bytes
+        finally:
+            self._reset_sealed_buffer()
+            self._sealed_encoded_spans = {}
 
     @property
     def stable(self):
@@ -815,8 +892,11 @@ cdef class MsgpackEncoderV05(MsgpackEncoderBase):
             try:
                 self._st.savepoint()
                 super(MsgpackEncoderV05, self).put(trace)
-                for span in trace:
-                    self._encoded_spans[span.span_id] = span
+                # Only keep references to the encoded spans when the payloads
+                # are verified, so that they can be freed as soon as encoded.
+                if self._verify_payloads:
+                    for span in trace:
+                        self._encoded_spans[span.span_id] = span
             except Exception:
                 self._st.rollback()
                 raise
@@ -923,13 +1003,11 @@ cdef class MsgpackEncoderV05(MsgpackEncoderBase):
         return 0
 
     cpdef _verify_encoding(self, encoded_bytes):
-        import msgpack
-
-        from ddtrace import config
-
-        if not config._trace_writer_log_err_payload:
+        if not self._verify_payloads:
             return
 
+        import msgpack
+
         unpacked = msgpack.unpackb(encoded_bytes, raw=True, strict_map_key=False)
         if not unpacked or not unpacked[0]:
             return unpacked
@@ -937,7 +1015,7 @@ cdef class MsgpackEncoderV05(MsgpackEncoderBase):
         table, packed_traces = unpacked
         for trace in packed_traces:
             for span in trace:
-                og_span = self._encoded_spans.get(span[4])  # correlate encoded span to a span in span_dict
+                og_span = self._sealed_encoded_spans.get(span[4])  # correlate encoded span to a span in span_dict
                 # structure of v0.5 encoded spans
                 # 		 0: Service   (uint32)
                 # 		 1: Name      (uint32)
@@ -988,7 +1066,7 @@ cdef class MsgpackEncoderV05(MsgpackEncoderBase):
                         eve,
                         "_debug_message",
                         f"Malformed String table values\ntable:{table}\ntraces:{packed_traces}"
-                        f"\nencoded_bytes:{encoded_bytes}\nspans:{self._encoded_spans}"
+                        f"\nencoded_bytes:{encoded_bytes}\nspans:{self._sealed_encoded_spans}"
                     )
                     raise eve
 
@@ -0,0 +1,15 @@
+from typing import List
+from typing import Tuple
+
+from ddtrace.span import Span
+
+SpanAggrKey = Tuple[str, str, str, str, int, bool]
+SpanAggrStats = Tuple[SpanAggrKey, int, int, int, int, bytes, bytes]
+
+class SpanStatsAggregator(object):
+    bucket_size_ns: int
+    bin_limit: int
+    def __init__(self, bucket_size_ns: int, relative_accuracy: float = ..., bin_limit: int = ...) -> None: ...
+    def __len__(self) -> int: ...
+    def add(self, span: Span, is_top_level: bool) -> None: ...
+    def flush(self) -> List[Tuple[int, List[SpanAggrStats]]]: ...
@@ -0,0 +1,289 @@
+"""
+Native aggregation of client-side span statistics.
+
+Spans are aggregated per time bucket and per span key. The statistics of each
+key, including the duration distributions, are stored in C structures. The
+distributions are collapsing lowest dense DDSketches that use the same
+logarithmic mapping as ``ddsketch.LogCollapsingLowestDenseDDSketch`` and are
+only turned into protobuf payloads when the statistics are flushed.
+"""
+from cpython.mem cimport PyMem_Free
+from cpython.mem cimport PyMem_Malloc
+from cpython.mem cimport PyMem_Realloc
+from libc.math cimport ceil
+from libc.math cimport log
+from libc.stdint cimport int64_t
+from libc.stdint cimport uint64_t
+from libc.string cimport memset
+
+from ddsketch.mapping import LogarithmicMapping
+from ddsketch.pb.ddsketch_pb2 import DDSketch as DDSketchPb
+from ddsketch.pb.ddsketch_pb2 import Store as StorePb
+from ddsketch.pb.proto import KeyMappingProto
+
+
+DEF SKETCH_CHUNK_SIZE = 128
+# The number of distinct http.status_code values whose parsing is cached
+DEF MAX_STATUS_CODES = 1024
+
+
+cdef struct sketch_t:
+    uint64_t *bins
+    int64_t offset
+    int64_t length
+    int64_t min_key
+    int64_t max_key
+    uint64_t count
+    uint64_t zero_count
+    bint collapsed
+
+
+cdef struct span_stats_t:
+    uint64_t hits
+    uint64_t top_level_hits
+    uint64_t errors
+    uint64_t duration
+    sketch_t ok_distribution
+    sketch_t err_distribution
+
+
+cdef inline void sketch_free(sketch_t *sketch):
+    PyMem_Free(sketch.bins)
+    memset(sketch, 0, sizeof(sketch_t))
+
+
+cdef int sketch_extend(sketch_t *sketch, int64_t key, int64_t bin_limit) except -1:
+    """Extend the range of the bins to include the key, collapsing the lowest bins if needed."""
+    cdef int64_t new_min_key, new_max_key, new_length, new_offset, k
+    cdef uint64_t *bins
+
+    if sketch.bins == NULL:
+        new_min_key = new_max_key = key
+    else:
+        new_min_key = min(key, sketch.min_key)
+        new_max_key = max(key, sketch.max_key)
+
+    if new_max_key - new_min_key + 1 > bin_limit:
+        new_min_key = new_max_key - bin_limit + 1
+        sketch.collapsed = True
+
+    new_length = min(
+        SKETCH_CHUNK_SIZE * ((new_max_key - new_min_key + SKETCH_CHUNK_SIZE) // SKETCH_CHUNK_SIZE), bin_limit
+    )
+    # Keep some room on both sides of the range
+    new_offset = new_min_key - (new_length - (new_max_key - new_min_key + 1)) // 2
+
+    bins = <uint64_t *>PyMem_Malloc(new_length * sizeof(uint64_t))
+    if bins == NULL:
+        raise MemoryError()
+    memset(bins, 0, new_length * sizeof(uint64_t))
+
+    if sketch.bins != NULL:
+        for k in range(sketch.min_key, sketch.max_key + 1):
+            bins[max(k, new_min_key) - new_offset] += sketch.bins[k - sketch.offset]
+
+    PyMem_Free(sketch.bins)
+    sketch.bins = bins
+    sketch.length = new_length
+    sketch.offset = new_offset
+    sketch.min_key = new_min_key
+    sketch.max_key = new_max_key
+    return 0
+
+
+cdef class SpanStatsAggregator(object):
+    """Aggregate span statistics per time bucket and per span key.
+
+    The key of a span is the tuple ``(name, service, resource, type,
+    http_status_code, synthetics)``. Keys are interned so that all the buckets
+    share the same key objects.
+    """
+
+    cdef readonly int64_t bucket_size_ns
+    cdef readonly int64_t bin_limit
+    cdef double _multiplier
+    cdef double _min_possible
+    cdef object _mapping_pb
+    cdef span_stats_t *_stats
+    cdef Py_ssize_t _size
+    cdef Py_ssize_t _capacity
+    cdef dict _buckets
+    cdef dict _keys
+    cdef dict _status_codes
+
+    def __cinit__(self, int64_t bucket_size_ns, double relative_accuracy=0.00775, int64_t bin_limit=2048):
+        mapping = LogarithmicMapping(relative_accuracy)
+        self.bucket_size_ns = bucket_size_ns
+        self.bin_limit = bin_limit
+        # DEV: The mapping of values to keys must be the same as the one of
+        # the ddsketch library for the payloads to be decoded correctly.
+        self._multiplier = mapping._multiplier
+        self._min_possible = mapping.min_possible
+        self._mapping_pb = KeyMappingProto.to_proto(mapping)
+        self._stats = NULL
+        self._size = 0
+        self._capacity = 0
+        self._buckets = {}
+        self._keys = {}
+        self._status_codes = {}
+
+    def __dealloc__(self):
+        self._reset()
+
+    def __len__(self):
+        return self._size
+
+    cdef void _reset(self):
+        cdef Py_ssize_t i
+
+        for i in range(self._size):
+            sketch_free(&self._stats[i].ok_distribution)
+            sketch_free(&self._stats[i].err_distribution)
+        PyMem_Free(self._stats)
+        self._stats = NULL
+        self._size = self._capacity = 0
+        self._buckets = {}
+        self._keys = {}
+
+    cdef Py_ssize_t _new_stats(self) except -1:
+        cdef Py_ssize_t capacity
+        cdef span_stats_t *stats
+
+        if self._size == self._capacity:
+            capacity = max(64, self._capacity * 2)
+            stats = <span_stats_t *>PyMem_Realloc(self._stats, capacity * sizeof(span_stats_t))
+            if stats == NULL:
+                raise MemoryError()
+            self._stats = stats
+            self._capacity = capacity
+
+        memset(&self._stats[self._size], 0, sizeof(span_stats_t))
+        self._size += 1
+        return self._size - 1
+
+    cdef int _sketch_add(self, sketch_t *sketch, double value) except -1:
+        cdef int64_t key
+
+        if value <= self._min_possible:
+            sketch.zero_count += 1
+            sketch.count += 1
+            return 0
+
+        key = <int64_t>ceil(log(value) / log(2.0) * self._multiplier)
+        if key < sketch.min_key and sketch.collapsed:
+            key = sketch.min_key
+        elif sketch.bins == NULL or key < sketch.offset or key >= sketch.offset + sketch.length:
+            sketch_extend(sketch, key, self.bin_limit)
+            if key < sketch.min_key:
+                key = sketch.min_key
+        else:
+            if key < sketch.min_key:
+                sketch.min_key = key
+            elif key > sketch.max_key:
+                sketch.max_key = key
+
+        sketch.bins[key - sketch.offset] += 1
+        sketch.count += 1
+        return 0
+
+    cdef object _status_code(self, object value):
+        cdef object status_code
+
+        if not value:
+            return 0
+
+        status_code = self._status_codes.get(value)
+        if status_code is None:
+            status_code = int(value)
+            if len(self._status_codes) < MAX_STATUS_CODES:
+                self._status_codes[value] = status_code
+        return status_code
+
+    cpdef add(self, object span, bint is_top_level):
+        """Add the statistics of the finished span."""
+        cdef int64_t duration_ns = span.duration_ns
+        cdef int64_t end_ns = span.start_ns + duration_ns
+        cdef int64_t bucket_time_ns = end_ns - (end_ns % self.bucket_size_ns)
+        cdef span_stats_t *stats
+        cdef Py_ssize_t index
+
+        key = (
+            span.name,
+            span.service or "",
+            span.resource or "",
+            span.span_type or "",
+            self._status_code(span._meta.get("http.status_code")),
+            span.context.dd_origin == "synthetics",
+        )
+
+        bucket = self._buckets.get(bucket_time_ns)
+        if bucket is None:
+            bucket = self._buckets[bucket_time_ns] = {}
+
+        index_obj = bucket.get(key)
+        if index_obj is None:
+            key = self._keys.setdefault(key, key)
+            index = self._new_stats()
+            bucket[key] = index
+        else:
+            index = index_obj
+
+        stats = &self._stats[index]
+        stats.hits += 1
+        stats.duration += duration_ns
+        if is_top_level:
+            stats.top_level_hits += 1
+        if span.error:
+            stats.errors += 1
+            self._sketch_add(&stats.err_distribution, duration_ns)
+        else:
+            self._sketch_add(&stats.ok_distribution, duration_ns)
+
+    cdef bytes _sketch_to_proto(self, sketch_t *sketch):
+        cdef int64_t k
+
+        if sketch.bins != NULL:
+            store = StorePb(
+                contiguousBinCounts=[sketch.bins[k - sketch.offset] for k in range(sketch.min_key, sketch.max_key + 1)],
+                contiguousBinIndexOffset=sketch.min_key,
+            )
+        else:
+            store = StorePb()
+        return DDSketchPb(
+            mapping=self._mapping_pb,
+            positiveValues=store,
+            negativeValues=StorePb(),
+            zeroCount=sketch.zero_count,
+        ).SerializeToString()
+
+    def flush(self):
+        """Return the aggregated statistics and reset the aggregator.
+
+        The statistics are returned as a list of ``(bucket_time_ns, stats)``
+        tuples, where ``stats`` is a list of ``(key, hits, top_level_hits,
+        errors, duration, ok_summary, error_summary)`` tuples and the
+        summaries are serialized DDSketch protobuf messages.
+        """
+        cdef span_stats_t *stats
+        cdef Py_ssize_t index
+
+        buckets = []
+        for bucket_time_ns, bucket in self._buckets.items():
+            bucket_stats = []
+            for key, index in bucket.items():
+                stats = &self._stats[index]
+                bucket_stats.append(
+                    (
+                        key,
+                        stats.hits,
+                        stats.top_level_hits,
+                        stats.errors,
+                        stats.duration,
+                        self._sketch_to_proto(&stats.ok_distribution),
+                        self._sketch_to_proto(&stats.err_distribution),
+                    )
+                )
+            buckets.append((bucket_time_ns, bucket_stats))
+
+        self._reset()
+        return buckets
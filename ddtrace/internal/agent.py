@@ -4,6 +4,7 @@ import socket
 from typing import TypeVar
 from typing import Union
 
+from ddtrace.internal import forksafe
 from ddtrace.internal.compat import ensure_str
 from ddtrace.internal.logger import get_logger
 from ddtrace.settings import _config as ddconfig
@@ -11,6 +12,7 @@ from ddtrace.settings import _config as ddconfig
 from .http import HTTPConnection
 from .http import HTTPSConnection
 from .uds import UDSHTTPConnection
+from .utils.http import ConnectionPool
 from .utils.http import get_connection
 
 
@@ -26,6 +28,11 @@ T = TypeVar("T")
 
 log = get_logger(__name__)
 
+# Keep-alive connections to the agent (and intakes), shared by all the
+# background services of the process.
+connection_pool = ConnectionPool(ddconfig._agent_connection_pool_size)
+forksafe.register(connection_pool._after_fork)
+
 
 # This method returns if a hostname is an IPv6 address
 def is_ipv6_hostname(hostname):
@@ -100,9 +100,10 @@ like this::
 
 The names of these events follow the pattern ``context.[started|ended].<context_name>``.
 """
-from collections import defaultdict
 from contextlib import contextmanager
 import logging
+import sys
+import threading
 from typing import TYPE_CHECKING
 from typing import Any
 from typing import Optional
@@ -129,12 +130,20 @@ log = logging.getLogger(__name__)
 
 
 _CURRENT_CONTEXT = None
-_EVENT_HUB = None
 ROOT_CONTEXT_ID = "__root"
 
 
 class EventHub:
+    """Dispatch events to the listeners registered for them.
+
+    The listeners of an event are stored in a tuple that is replaced, never
+    mutated, when a listener is added. Dispatching an event therefore needs
+    neither a lock nor a copy of the listeners, and an event without listeners
+    costs a single dictionary lookup.
+    """
+
     def __init__(self):
+        self._lock = threading.Lock()
         self.reset()
 
     def has_listeners(self, event_id):
@@ -143,28 +152,37 @@ class EventHub:
 
     def on(self, event_id, callback):
         # type: (str, Callable) -> None
-        if callback not in self._listeners[event_id]:
-            self._listeners[event_id].insert(0, callback)
+        with self._lock:
+            listeners = self._listeners.get(event_id, ())
+            if callback not in listeners:
+                self._listeners[event_id] = (callback,) + listeners
 
     def reset(self):
-        if hasattr(self, "_listeners"):
-            del self._listeners
-        self._listeners = defaultdict(list)
+        self._listeners = {}  # type: Dict[str, Tuple[Callable, ...]]
+
+    @staticmethod
+    def _listener_args(args, other_args):
+        # type: (Any, Tuple[Any, ...]) -> List[Any]
+        if not isinstance(args, list):
+            return [args] + list(other_args)
+        if other_args:
+            raise TypeError(
+                "When the first argument expected by the event handler is a list, all arguments "
+                "must be passed in a list. For example, use dispatch('foo', [[l1, l2], arg2]) "
+                "instead of dispatch('foo', [l1, l2], arg2)."
+            )
+        return args
 
     def dispatch(self, event_id, args, *other_args):
         # type: (...) -> Tuple[List[Optional[Any]], List[Optional[Exception]]]
-        if not isinstance(args, list):
-            args = [args] + list(other_args)
-        else:
-            if other_args:
-                raise TypeError(
-                    "When the first argument expected by the event handler is a list, all arguments "
-                    "must be passed in a list. For example, use dispatch('foo', [[l1, l2], arg2]) "
-                    "instead of dispatch('foo', [l1, l2], arg2)."
-                )
+        listeners = self._listeners.get(event_id)
+        if not listeners:
+            return [], []
+
+        args = self._listener_args(args, other_args)
         results = []
         exceptions = []
-        for listener in self._listeners.get(event_id, []):
+        for listener in listeners:
             result = None
             exception = None
             try:
@@ -177,28 +195,69 @@ class EventHub:
             exceptions.append(exception)
         return results, exceptions
 
+    def fire(self, event_id, args, *other_args):
+        # type: (...) -> None
+        """Dispatch an event without collecting the results of the listeners."""
+        listeners = self._listeners.get(event_id)
+        if not listeners:
+            return
 
-_EVENT_HUB = contextvars.ContextVar("EventHub_var", default=EventHub())
+        args = self._listener_args(args, other_args)
+        for listener in listeners:
+            try:
+                listener(*args)
+            except Exception:
+                if config._raise:
+                    raise
+                log.debug("listener %r of event %s failed", listener, event_id, exc_info=True)
+
+
+_EVENT_HUB = EventHub()
 
 
 def has_listeners(event_id):
     # type: (str) -> bool
-    return _EVENT_HUB.get().has_listeners(event_id)  # type: ignore
+    return _EVENT_HUB.has_listeners(event_id)
 
 
 def on(event_id, callback):
     # type: (str, Callable) -> None
-    return _EVENT_HUB.get().on(event_id, callback)  # type: ignore
+    return _EVENT_HUB.on(event_id, callback)
 
 
 def reset_listeners():
     # type: () -> None
-    _EVENT_HUB.get().reset()  # type: ignore
+    _EVENT_HUB.reset()
 
 
 def dispatch(event_id, args, *other_args):
     # type: (...) -> Tuple[List[Optional[Any]], List[Optional[Exception]]]
-    return _EVENT_HUB.get().dispatch(event_id, args, *other_args)  # type: ignore
+    return _EVENT_HUB.dispatch(event_id, args, *other_args)
+
+
+def fire(event_id, args, *other_args):
+    # type: (...) -> None
+    """Dispatch an event to its listeners, ignoring their results.
+
+    This is cheaper than ``dispatch`` and should be preferred when the results
+    are not needed.
+    """
+    _EVENT_HUB.fire(event_id, args, *other_args)
+
+
+# The started and ended event ids of each context identifier
+_CONTEXT_EVENT_IDS = {}  # type: Dict[str, Tuple[str, str]]
+
+
+def _context_event_ids(identifier):
+    # type: (str) -> Tuple[str, str]
+    event_ids = _CONTEXT_EVENT_IDS.get(identifier)
+    if event_ids is None:
+        event_ids = _CONTEXT_EVENT_IDS[identifier] = (
+            sys.intern("context.started.%s" % identifier),
+            sys.intern("context.ended.%s" % identifier),
+        )
+    return event_ids
 
 
 class ExecutionContext:
@@ -214,7 +273,7 @@ class ExecutionContext:
         self._data.update(kwargs)
         if self._span is None and _CURRENT_CONTEXT is not None:
             self._token = _CURRENT_CONTEXT.set(self)
-        dispatch("context.started.%s" % self.identifier, [self])
+        fire(_context_event_ids(identifier)[0], [self])
 
     def __repr__(self):
         return self.__class__.__name__ + " '" + self.identifier + "' @ " + str(id(self))
@@ -228,7 +287,7 @@ class ExecutionContext:
         return self._parents[0] if self._parents else None
 
     def end(self):
-        dispatch_result = dispatch("context.ended.%s" % self.identifier, [self])
+        dispatch_result = dispatch(_context_event_ids(self.identifier)[1], [self])
         if self._span is None:
             try:
                 _CURRENT_CONTEXT.reset(self._token)
@@ -0,0 +1,2 @@
+def fnv1_64(data: bytes) -> int: ...
+def fnv1_64_pair(first: int, second: int) -> int: ...
@@ -0,0 +1,40 @@
+"""
+Native implementation of the 64 bit Fowler/Noll/Vo FNV-1 hash algorithm.
+See http://isthe.com/chongo/tech/comp/fnv/
+
+The results are identical to those of :func:`ddtrace.internal.datastreams.fnv.fnv1_64`.
+"""
+from libc.stdint cimport uint64_t
+
+
+DEF FNV_64_PRIME = 0x100000001B3
+DEF FNV1_64_INIT = 0xCBF29CE484222325
+
+
+cdef inline uint64_t _fnv1_64_update(uint64_t hval, const unsigned char *data, Py_ssize_t size) nogil:
+    cdef Py_ssize_t i
+    for i in range(size):
+        hval = (hval * <uint64_t>FNV_64_PRIME) ^ data[i]
+    return hval
+
+
+cdef inline uint64_t _fnv1_64_update_u64(uint64_t hval, uint64_t value) nogil:
+    # Hash the little-endian representation of the value, as struct.pack("<Q", value) would
+    cdef int i
+    for i in range(8):
+        hval = (hval * <uint64_t>FNV_64_PRIME) ^ ((value >> (8 * i)) & 0xFF)
+    return hval
+
+
+cpdef uint64_t fnv1_64(bytes data):
+    """Returns the 64 bit FNV-1 hash value for the given data."""
+    return _fnv1_64_update(<uint64_t>FNV1_64_INIT, <const unsigned char *>data, len(data))
+
+
+cpdef uint64_t fnv1_64_pair(uint64_t first, uint64_t second):
+    """Returns the 64 bit FNV-1 hash value of two 64 bit integers packed in little-endian order.
+
+    This is equivalent to ``fnv1_64(struct.pack("<QQ", first, second))`` without building
+    the intermediate bytes object.
+    """
+    return _fnv1_64_update_u64(_fnv1_64_update_u64(<uint64_t>FNV1_64_INIT, first), second)
@@ -79,13 +79,7 @@ def dsm_kafka_message_produce(instance, args, kwargs, is_serializing):
         kwargs[on_delivery_kwarg] = wrapped_callback
 
 
-def dsm_kafka_message_consume(instance, message):
-    from . import data_streams_processor as processor
-
-    headers = {header[0]: header[1] for header in (message.headers() or [])}
-    topic = core.get_item("kafka_topic")
-    group = instance._group_id
-
+def _calculate_message_size(message, headers):
     payload_size = 0
     if hasattr(message, "len"):
         # message.len() is only supported for some versions of confluent_kafka
@@ -95,6 +89,17 @@ def dsm_kafka_message_consume(instance, message):
 
     payload_size += _calculate_byte_size(message.key())
     payload_size += _calculate_byte_size(headers)
+    return payload_size
+
+
+def dsm_kafka_message_consume(instance, message):
+    from . import data_streams_processor as processor
+
+    headers = {header[0]: header[1] for header in (message.headers() or [])}
+    topic = core.get_item("kafka_topic")
+    group = instance._group_id
+
+    payload_size = _calculate_message_size(message, headers)
 
     ctx = processor().decode_pathway(headers.get(PROPAGATION_KEY, None))
     ctx.set_checkpoint(["direction:in", "group:" + group, "topic:" + topic, "type:kafka"], payload_size=payload_size)
@@ -108,6 +113,45 @@ def dsm_kafka_message_consume(instance, message):
         )
 
 
+def dsm_kafka_messages_consume(instance, messages):
+    """Record the checkpoints and offsets of a batch of consumed messages with a single lock acquisition each."""
+    from . import data_streams_processor as processor
+
+    dsm_processor = processor()
+    group = instance._group_id
+    now_sec = time.time()
+
+    checkpoints = []
+    offsets = {}
+    for message in messages:
+        if message.error() is not None:
+            # Errors and events such as the end of a partition are not consumed messages
+            continue
+        headers = {header[0]: header[1] for header in (message.headers() or [])}
+        topic = message.topic()
+        payload_size = _calculate_message_size(message, headers)
+
+        ctx = dsm_processor.decode_pathway(headers.get(PROPAGATION_KEY, None))
+        _, checkpoint = ctx._checkpoint(
+            ["direction:in", "group:" + group, "topic:" + topic, "type:kafka"],
+            now_sec=now_sec,
+            payload_size=payload_size,
+        )
+        checkpoints.append(checkpoint)
+
+        if instance._auto_commit:
+            # Only the latest offset of each partition is kept, as for individually consumed messages
+            reported_offset = message.offset() if isinstance(message.offset(), INT_TYPES) else -1
+            key = (topic, message.partition())
+            offsets[key] = max(reported_offset, offsets.get(key, -1))
+
+    dsm_processor.on_checkpoints_creation(checkpoints)
+    if offsets:
+        dsm_processor.track_kafka_commits(
+            group, [(topic, partition, offset) for (topic, partition), offset in offsets.items()], now_sec
+        )
+
+
 def dsm_kafka_message_commit(instance, args, kwargs):
     from . import data_streams_processor as processor
 
@@ -134,4 +178,5 @@ def dsm_kafka_message_commit(instance, args, kwargs):
 if config._data_streams_enabled:
     core.on("kafka.produce.start", dsm_kafka_message_produce)
     core.on("kafka.consume.start", dsm_kafka_message_consume)
+    core.on("kafka.consume.batch.start", dsm_kafka_messages_consume)
     core.on("kafka.commit.start", dsm_kafka_message_commit)
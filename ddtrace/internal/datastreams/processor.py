@@ -1,6 +1,7 @@
 # coding: utf-8
 import base64
 from collections import defaultdict
+from functools import lru_cache
 from functools import partial
 import gzip
 import os
@@ -10,9 +11,12 @@ import time
 import typing
 from typing import DefaultDict
 from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import NamedTuple
 from typing import Optional
+from typing import Sequence
+from typing import Tuple
 from typing import Union
 
 from ddsketch import LogCollapsingLowestDenseDDSketch
@@ -26,16 +30,16 @@ from ddtrace.internal.constants import DEFAULT_SERVICE_NAME
 from ddtrace.internal.utils.retry import fibonacci_backoff_with_jitter
 
 from .._encoding import packb
-from ..agent import get_connection
-from ..compat import get_connection_response
+from ..agent import connection_pool
 from ..forksafe import Lock
 from ..hostname import get_hostname
 from ..logger import get_logger
 from ..periodic import PeriodicService
 from ..writer import _human_size
+from ._fnv import fnv1_64
+from ._fnv import fnv1_64_pair
 from .encoding import decode_var_int_64
 from .encoding import encode_var_int_64
-from .fnv import fnv1_64
 
 
 if six.PY3:
@@ -72,6 +76,8 @@ log = get_logger(__name__)
 PROPAGATION_KEY = "dd-pathway-ctx"
 PROPAGATION_KEY_BASE_64 = "dd-pathway-ctx-base64"
 SHUTDOWN_TIMEOUT = 5
+# The maximum number of distinct (service, env, edge tags) pathway nodes whose hash is cached
+PATHWAY_NODE_CACHE_SIZE = 1024
 
 """
 PathwayAggrKey uniquely identifies a pathway to aggregate stats on.
@@ -94,6 +100,52 @@ class PathwayStats(object):
         self.payload_size = LogCollapsingLowestDenseDDSketch(0.00775, bin_limit=2048)
 
 
+"""
+PathwayNode holds everything a checkpoint needs to know about the node it is created on, so that it can
+be computed once for every distinct combination of service, env and edge tags.
+"""
+PathwayNode = NamedTuple(
+    "PathwayNode",
+    [
+        ("edge_tags", Tuple[str, ...]),  # sorted edge tags
+        ("edge_tags_key", str),  # comma-separated edge tags, as used in PathwayAggrKey
+        ("direction", str),
+        ("hash", int),
+    ],
+)
+
+
+@lru_cache(maxsize=PATHWAY_NODE_CACHE_SIZE)
+def _get_pathway_node(key):
+    # type: (Tuple[str, str, Tuple[str, ...]]) -> PathwayNode
+    service, env, tags = key
+    edge_tags = tuple(sorted(tags))
+    direction = ""
+    for t in edge_tags:
+        if t.startswith("direction:"):
+            direction = t
+            break
+    node_hash = fnv1_64("".join((service, env) + edge_tags).encode("utf-8"))
+    return PathwayNode(edge_tags, ",".join(edge_tags), direction, node_hash)
+
+
+"""
+Checkpoint holds the statistics recorded by a single checkpoint on a pathway.
+"""
+Checkpoint = NamedTuple(
+    "Checkpoint",
+    [
+        ("edge_tags_key", str),
+        ("hash_value", int),
+        ("parent_hash", int),
+        ("now_sec", float),
+        ("edge_latency_sec", float),
+        ("full_pathway_latency_sec", float),
+        ("payload_size", int),
+    ],
+)
+
+
 PartitionKey = NamedTuple("PartitionKey", [("topic", str), ("partition", int)])
 ConsumerPartitionKey = NamedTuple("ConsumerPartitionKey", [("group", str), ("topic", str), ("partition", int)])
 Bucket = NamedTuple(
@@ -144,9 +196,17 @@ class DataStreamsProcessor(PeriodicService):
         self.start()
 
     def on_checkpoint_creation(
-        self, hash_value, parent_hash, edge_tags, now_sec, edge_latency_sec, full_pathway_latency_sec, payload_size=0
+        self,
+        hash_value,
+        parent_hash,
+        edge_tags,
+        now_sec,
+        edge_latency_sec,
+        full_pathway_latency_sec,
+        payload_size=0,
+        edge_tags_key=None,
     ):
-        # type: (int, int, List[str], float, float, float, Optional[int]) -> None
+        # type: (int, int, Sequence[str], float, float, float, Optional[int], Optional[str]) -> None
         """
         on_checkpoint_creation is called every time a new checkpoint is created on a pathway. It records the
         latency to the previous checkpoint in the pathway (edge latency),
@@ -160,22 +220,50 @@ class DataStreamsProcessor(PeriodicService):
         :param edge_latency_sec: latency of the direct edge between the previous point
             in the pathway, and the current step
         :param full_pathway_latency_sec: latency from the very start of the pathway.
+        :param edge_tags_key: the comma-separated edge tags, computed from ``edge_tags`` when not given.
+        :return: Nothing
+        """
+        if edge_tags_key is None:
+            edge_tags_key = ",".join(edge_tags)
+        self.on_checkpoints_creation(
+            (
+                Checkpoint(
+                    edge_tags_key,
+                    hash_value,
+                    parent_hash,
+                    now_sec,
+                    edge_latency_sec,
+                    full_pathway_latency_sec,
+                    payload_size or 0,
+                ),
+            )
+        )
+
+    def on_checkpoints_creation(self, checkpoints):
+        # type: (Iterable[Checkpoint]) -> None
+        """
+        on_checkpoints_creation records a batch of checkpoints, for instance the checkpoints of all the messages
+        returned by a single call to a consumer, with a single acquisition of the processor lock.
+
+        :param checkpoints: the checkpoints to record.
         :return: Nothing
         """
         if not self._enabled:
             return
 
-        now_ns = int(now_sec * 1e9)
+        # Align the checkpoints into the corresponding stats buckets before taking the lock
+        aggr_stats = []
+        for checkpoint in checkpoints:
+            now_ns = int(checkpoint.now_sec * 1e9)
+            aggr_key = (checkpoint.edge_tags_key, checkpoint.hash_value, checkpoint.parent_hash)
+            aggr_stats.append((now_ns - (now_ns % self._bucket_size_ns), aggr_key, checkpoint))
 
         with self._lock:
-            # Align the span into the corresponding stats bucket
-            bucket_time_ns = now_ns - (now_ns % self._bucket_size_ns)
-            aggr_key = (",".join(edge_tags), hash_value, parent_hash)
-            stats = self._buckets[bucket_time_ns].pathway_stats[aggr_key]
-            stats.full_pathway_latency.add(full_pathway_latency_sec)
-            stats.edge_latency.add(edge_latency_sec)
-            stats.payload_size.add(payload_size)
-            self._buckets[bucket_time_ns].pathway_stats[aggr_key] = stats
+            for bucket_time_ns, aggr_key, checkpoint in aggr_stats:
+                stats = self._buckets[bucket_time_ns].pathway_stats[aggr_key]
+                stats.full_pathway_latency.add(checkpoint.full_pathway_latency_sec)
+                stats.edge_latency.add(checkpoint.edge_latency_sec)
+                stats.payload_size.add(checkpoint.payload_size)
 
     def track_kafka_produce(self, topic, partition, offset, now_sec):
         now_ns = int(now_sec * 1e9)
@@ -187,13 +275,18 @@ class DataStreamsProcessor(PeriodicService):
             )
 
     def track_kafka_commit(self, group, topic, partition, offset, now_sec):
+        self.track_kafka_commits(group, ((topic, partition, offset),), now_sec)
+
+    def track_kafka_commits(self, group, offsets, now_sec):
+        # type: (str, Iterable[Tuple[str, int, int]], float) -> None
+        """Track the committed (topic, partition, offset) of a batch with a single acquisition of the lock."""
         now_ns = int(now_sec * 1e9)
-        key = ConsumerPartitionKey(group, topic, partition)
+        bucket_time_ns = now_ns - (now_ns % self._bucket_size_ns)
         with self._lock:
-            bucket_time_ns = now_ns - (now_ns % self._bucket_size_ns)
-            self._buckets[bucket_time_ns].latest_commit_offsets[key] = max(
-                offset, self._buckets[bucket_time_ns].latest_commit_offsets[key]
-            )
+            latest_commit_offsets = self._buckets[bucket_time_ns].latest_commit_offsets
+            for topic, partition, offset in offsets:
+                key = ConsumerPartitionKey(group, topic, partition)
+                latest_commit_offsets[key] = max(offset, latest_commit_offsets[key])
 
     def _serialize_buckets(self):
         # type: () -> List[Dict]
@@ -256,9 +349,9 @@ class DataStreamsProcessor(PeriodicService):
     def _flush_stats(self, payload):
         # type: (bytes) -> None
         try:
-            conn = get_connection(self._agent_url, self._timeout)
-            conn.request("POST", self._endpoint, payload, self._headers)
-            resp = get_connection_response(conn)
+            resp, body = connection_pool.request(
+                self._agent_url, "POST", self._endpoint, payload, self._headers, self._timeout
+            )
         except Exception:
             log.error("failed to submit pathway stats to the Datadog agent at %s", self._agent_endpoint, exc_info=True)
             raise
@@ -271,7 +364,7 @@ class DataStreamsProcessor(PeriodicService):
                     "failed to send data stream stats payload, %s (%s) (%s) response from Datadog agent at %s",
                     resp.status,
                     resp.reason,
-                    resp.read(),
+                    body,
                     self._agent_endpoint,
                 )
             else:
@@ -398,22 +491,13 @@ class DataStreamsCtx:
         data_streams_context = binary_pathway.decode("utf-8")
         return data_streams_context
 
-    def _compute_hash(self, tags, parent_hash):
-        if six.PY3:
-
-            def get_bytes(s):
-                return bytes(s, encoding="utf-8")
+    def _get_node(self, tags):
+        # type: (Iterable[str]) -> PathwayNode
+        return _get_pathway_node((self.service, self.env, tuple(tags)))
 
-        else:
-
-            def get_bytes(s):
-                return bytes(s)
-
-        b = get_bytes(self.service) + get_bytes(self.env)
-        for t in tags:
-            b += get_bytes(t)
-        node_hash = fnv1_64(b)
-        return fnv1_64(struct.pack("<Q", node_hash) + struct.pack("<Q", parent_hash))
+    def _compute_hash(self, tags, parent_hash):
+        # type: (Iterable[str], int) -> int
+        return fnv1_64_pair(self._get_node(tags).hash, parent_hash)
 
     def set_checkpoint(
         self, tags, now_sec=None, edge_start_sec_override=None, pathway_start_sec_override=None, payload_size=0
@@ -426,14 +510,34 @@ class DataStreamsCtx:
         :param edge_start_sec_override: Use this to override the starting time of an edge
         :param pathway_start_sec_override: Use this to override the starting time of a pathway
         """
+        node, checkpoint = self._checkpoint(
+            tags, now_sec, edge_start_sec_override, pathway_start_sec_override, payload_size
+        )
+        self.processor.on_checkpoint_creation(
+            checkpoint.hash_value,
+            checkpoint.parent_hash,
+            node.edge_tags,
+            checkpoint.now_sec,
+            checkpoint.edge_latency_sec,
+            checkpoint.full_pathway_latency_sec,
+            payload_size=checkpoint.payload_size,
+            edge_tags_key=checkpoint.edge_tags_key,
+        )
+
+    def _checkpoint(
+        self,
+        tags,  # type: Iterable[str]
+        now_sec=None,  # type: Optional[float]
+        edge_start_sec_override=None,  # type: Optional[float]
+        pathway_start_sec_override=None,  # type: Optional[float]
+        payload_size=0,  # type: int
+    ):
+        # type: (...) -> Tuple[PathwayNode, Checkpoint]
+        """Move the pathway to a new checkpoint and return it, without recording it in the processor."""
         if not now_sec:
             now_sec = time.time()
-        tags = sorted(tags)
-        direction = ""
-        for t in tags:
-            if t.startswith("direction:"):
-                direction = t
-                break
+        node = self._get_node(tags)
+        direction = node.direction
         if direction == self.previous_direction:
             self.hash = self.closest_opposite_direction_hash
             if self.hash == 0:
@@ -455,13 +559,19 @@ class DataStreamsCtx:
             self.pathway_start_sec = pathway_start_sec_override
 
         parent_hash = self.hash
-        hash_value = self._compute_hash(tags, parent_hash)
+        hash_value = fnv1_64_pair(node.hash, parent_hash)
         edge_latency_sec = now_sec - self.current_edge_start_sec
         pathway_latency_sec = now_sec - self.pathway_start_sec
         self.hash = hash_value
         self.current_edge_start_sec = now_sec
-        self.processor.on_checkpoint_creation(
-            hash_value, parent_hash, tags, now_sec, edge_latency_sec, pathway_latency_sec, payload_size=payload_size
+        return node, Checkpoint(
+            node.edge_tags_key,
+            hash_value,
+            parent_hash,
+            now_sec,
+            edge_latency_sec,
+            pathway_latency_sec,
+            payload_size,
         )
 
 
@@ -11,9 +11,21 @@ class GlobMatcher(object):
     def __init__(self, pattern):
         # type: (str) -> None
         self.pattern = pattern
+        # Patterns without wildcards, and patterns that match everything, are
+        # common and do not need the backtracking algorithm.
+        self._literal = "*" not in pattern and "?" not in pattern
+        self._match_all = bool(pattern) and not pattern.strip("*")
 
-    @cachedmethod()
     def match(self, subject):
+        # type: (str) -> bool
+        if self._literal:
+            return subject == self.pattern
+        if self._match_all:
+            return True
+        return self._match(subject)
+
+    @cachedmethod()
+    def _match(self, subject):
         # type: (str) -> bool
         pattern = self.pattern
         px = 0  # [p]attern inde[x]
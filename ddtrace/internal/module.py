@@ -1,10 +1,13 @@
 from collections import defaultdict
+from collections import deque
+import os
 from pathlib import Path
 import sys
 from types import ModuleType
 from typing import Any
 from typing import Callable
 from typing import DefaultDict
+from typing import Deque
 from typing import Dict
 from typing import List
 from typing import Optional
@@ -14,6 +17,7 @@ from typing import Type
 from typing import Union
 from typing import cast
 from weakref import WeakValueDictionary as wvdict
+from weakref import ref
 
 from ddtrace.internal.compat import PY2
 from ddtrace.internal.logger import get_logger
@@ -87,26 +91,35 @@ def unregister_post_run_module_hook(hook):
     _post_run_module_hooks.remove(hook)
 
 
-def origin(module: ModuleType) -> Optional[Path]:
-    """Get the origin source file of the module."""
+def _origin_path(module):
+    # type: (ModuleType) -> Optional[str]
+    """Get the resolved path of the origin source file of the module."""
+    # DEV: This is called on imports, so we work on strings rather than on Path
+    # objects, which are expensive to create.
     try:
         # DEV: Use object.__getattribute__ to avoid potential side-effects.
-        orig = Path(object.__getattribute__(module, "__file__")).resolve()
+        orig = os.path.realpath(object.__getattribute__(module, "__file__"))
     except (AttributeError, TypeError):
         # Module is probably only partially initialised, so we look at its
         # spec instead
         try:
             # DEV: Use object.__getattribute__ to avoid potential side-effects.
-            orig = Path(object.__getattribute__(module, "__spec__").origin).resolve()
+            orig = os.path.realpath(object.__getattribute__(module, "__spec__").origin)
         except (AttributeError, ValueError, TypeError):
-            orig = None
+            return None
 
-    if orig is not None and orig.is_file():
-        return orig.with_suffix(".py") if orig.suffix == ".pyc" else orig
+    if os.path.isfile(orig):
+        return orig[:-1] if orig.endswith(".pyc") else orig
 
     return None
 
 
+def origin(module: ModuleType) -> Optional[Path]:
+    """Get the origin source file of the module."""
+    path = _origin_path(module)
+    return Path(path) if path is not None else None
+
+
 def _resolve(path):
     # type: (Path) -> Optional[Path]
     """Resolve a (relative) path with respect to sys.path."""
@@ -158,14 +171,14 @@ class _ImportHookChainedLoader(Loader):
         if hasattr(loader, "exec_module"):
             self.exec_module = self._exec_module  # type: ignore[assignment]
 
-    def __getattribute__(self, name):
-        if name == "__class__":
-            # Make isinstance believe that self is also an instance of
-            # type(self.loader). This is required, e.g. by some tools, like
-            # slotscheck, that can handle known loaders only.
-            return self.loader.__class__
-
-        return super(_ImportHookChainedLoader, self).__getattribute__(name)
+    # DEV: Overriding __class__ with a property rather than __getattribute__
+    # avoids slowing down every attribute access on the loader during imports.
+    @property  # type: ignore[misc]
+    def __class__(self):
+        # Make isinstance believe that self is also an instance of
+        # type(self.loader). This is required, e.g. by some tools, like
+        # slotscheck, that can handle known loaders only.
+        return self.loader.__class__
 
     def __getattr__(self, name):
         # Proxy any other attribute access to the underlying loader.
@@ -191,13 +204,9 @@ class _ImportHookChainedLoader(Loader):
         pre_exec_hook = None
 
         for _ in sys.meta_path:
-            if isinstance(_, ModuleWatchdog):
+            if isinstance(_, ModuleWatchdog) and _._pre_exec_module_hooks:
                 try:
-                    for cond, hook in _._pre_exec_module_hooks:
-                        if isinstance(cond, str) and cond == module.__name__ or cond(module.__name__):
-                            # Several pre-exec hooks could match, we keep the first one
-                            pre_exec_hook = hook
-                            break
+                    pre_exec_hook = _._find_pre_exec_module_hook(module.__name__)
                 except Exception:
                     log.debug("Exception happened while processing pre_exec_module_hooks", exc_info=True)
 
@@ -229,22 +238,35 @@ class ModuleWatchdog(object):
     def __init__(self):
         # type: () -> None
         self._hook_map = defaultdict(list)  # type: DefaultDict[str, List[ModuleHookType]]
+        # Number of hooks in _hook_map that are registered by origin rather
+        # than by module name.
+        self._origin_hook_count = 0
         self._om = None  # type: Optional[wvdict[str, ModuleType]]
+        # Modules imported since the origin map was last updated. Modules can be
+        # imported by other threads while the queue is drained, so it is only
+        # consumed with popleft, which is atomic.
+        self._om_pending = deque()  # type: Deque[ref[ModuleType]]
         self._finding = set()  # type: Set[str]
         self._pre_exec_module_hooks = []  # type: List[Tuple[PreExecHookCond, PreExecHookType]]
+        # Index of the pre-exec hooks with a module name condition, mapping the
+        # module name to the position and the first hook registered for it.
+        self._pre_exec_module_hooks_by_name = {}  # type: Dict[str, Tuple[int, PreExecHookType]]
+        self._pre_exec_module_hooks_by_cond = []  # type: List[Tuple[int, Callable[[str], bool], PreExecHookType]]
 
     @property
     def _origin_map(self):
         # type: () -> wvdict[str, ModuleType]
         def modules_with_origin(modules):
-            result = wvdict({str(origin(m)): m for m in modules})
-            try:
-                del result[None]
-            except KeyError:
-                pass
+            result = wvdict()
+            for m in modules:
+                path = _origin_path(m)
+                if path is not None:
+                    result[path] = m
             return result
 
         if self._om is None:
+            # Any pending module is in sys.modules already
+            self._om_pending.clear()
             try:
                 self._om = modules_with_origin(sys.modules.values())
             except RuntimeError:
@@ -254,8 +276,38 @@ class ModuleWatchdog(object):
                 # the current values, which might be incomplete.
                 return modules_with_origin(list(sys.modules.values()))
 
+        elif self._om_pending:
+            # Resolve the origins of the modules imported since the last time
+            # the map was needed, instead of rescanning sys.modules.
+            pending = self._om_pending
+            while True:
+                try:
+                    module = pending.popleft()()
+                except IndexError:
+                    break
+                if module is not None:
+                    path = _origin_path(module)
+                    if path is not None:
+                        self._om[path] = module
+
         return self._om
 
+    def _find_pre_exec_module_hook(self, name):
+        # type: (str) -> Optional[PreExecHookType]
+        """Find the first registered pre-exec hook whose condition matches the module name."""
+        by_name = self._pre_exec_module_hooks_by_name.get(name)
+        index = by_name[0] if by_name is not None else len(self._pre_exec_module_hooks)
+
+        # Only the callable conditions registered before the first matching name
+        # condition need to be evaluated.
+        for i, cond, hook in self._pre_exec_module_hooks_by_cond:
+            if i >= index:
+                break
+            if cond(name):
+                return hook
+
+        return by_name[1] if by_name is not None else None
+
     def _add_to_meta_path(self):
         # type: () -> None
         sys.meta_path.insert(0, self)  # type: ignore[arg-type]
@@ -280,10 +332,15 @@ class ModuleWatchdog(object):
 
     def after_import(self, module):
         # type: (ModuleType) -> None
-        module_path = origin(module)
-        path = str(module_path) if module_path is not None else None
-        if path is not None:
-            self._origin_map[path] = module
+        path = None
+        if self._origin_hook_count:
+            path = _origin_path(module)
+            if path is not None:
+                self._origin_map[path] = module
+        elif self._om is not None:
+            # Resolving the origin of a module requires file system calls, so
+            # we defer it until the origin map is needed.
+            self._om_pending.append(ref(module))
 
         # Collect all hooks by module origin and name
         hooks = []
@@ -314,7 +371,7 @@ class ModuleWatchdog(object):
 
             # Check if this is the __main__ module
             main_module = sys.modules.get("__main__")
-            if main_module is not None and origin(main_module) == path:
+            if main_module is not None and _origin_path(main_module) == path:
                 # Register for future lookups
                 instance._origin_map[path] = main_module
 
@@ -404,6 +461,7 @@ class ModuleWatchdog(object):
         log.debug("Registering hook '%r' on path '%s'", hook, path)
         instance = cast(ModuleWatchdog, cls._instance)
         instance._hook_map[path].append(hook)
+        instance._origin_hook_count += 1
         try:
             module = instance._origin_map[path]
             # Sanity check: the module might have been removed from sys.modules
@@ -443,6 +501,7 @@ class ModuleWatchdog(object):
             if path in instance._hook_map:
                 hooks = instance._hook_map[path]
                 hooks.remove(hook)
+                instance._origin_hook_count -= 1
                 if not hooks:
                     del instance._hook_map[path]
         except ValueError:
@@ -515,7 +574,13 @@ class ModuleWatchdog(object):
 
         log.debug("Registering pre_exec module hook '%r' on condition '%s'", hook, cond)
         instance = cast(ModuleWatchdog, cls._instance)
+        index = len(instance._pre_exec_module_hooks)
         instance._pre_exec_module_hooks.append((cond, hook))
+        if isinstance(cond, str):
+            # Several pre-exec hooks could match, we keep the first one
+            instance._pre_exec_module_hooks_by_name.setdefault(cond, (index, hook))
+        else:
+            instance._pre_exec_module_hooks_by_cond.append((index, cond, hook))
 
     @classmethod
     def _check_installed(cls):
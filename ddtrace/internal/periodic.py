@@ -1,14 +1,22 @@
 # -*- encoding: utf-8 -*-
+import heapq
+import itertools
 import threading
 import typing
 
 import attr
 
 from ddtrace.internal import service
+from ddtrace.internal.compat import monotonic
+from ddtrace.internal.logger import get_logger
+from ddtrace.settings import _config as ddconfig
 
 from . import forksafe
 
 
+log = get_logger(__name__)
+
+
 class PeriodicThread(threading.Thread):
     """Periodic thread.
 
@@ -79,8 +87,16 @@ class AwakeablePeriodicThread(PeriodicThread):
         self.served = forksafe.Event()
         self.awake_lock = forksafe.Lock()
 
-    def awake(self):
-        """Awake the thread."""
+    def awake(self, wait=True):
+        # type: (bool) -> None
+        """Awake the thread.
+
+        :param wait: Whether to block until the thread has served the request.
+        """
+        if not wait:
+            self.request.set()
+            return
+
         with self.awake_lock:
             self.served.clear()
             self.request.set()
@@ -99,6 +115,294 @@ class AwakeablePeriodicThread(PeriodicThread):
             self._on_shutdown()
 
 
+class DeferredAwakeablePeriodicThread(AwakeablePeriodicThread):
+    """Awakeable periodic thread that waits for the interval before the first run.
+
+    Like :class:`PeriodicThread`, the target function is first executed after
+    `interval` seconds, unless the thread is awakened earlier.
+    """
+
+    def stop(self):
+        """Stop the thread."""
+        if self.is_alive():
+            self.quit.set()
+            # Wake the thread up so that it does not wait for the interval to
+            # elapse before quitting.
+            self.request.set()
+
+    def run(self):
+        """Run the target function periodically or on demand."""
+        while True:
+            if self.request.wait(self.interval):
+                self.request.clear()
+                self.served.set()
+
+            if self.quit.is_set():
+                break
+
+            self._target()
+
+        if self._on_shutdown is not None:
+            self._on_shutdown()
+
+
+class PeriodicScheduler(object):
+    """Scheduler that runs periodic tasks on a single shared thread.
+
+    Tasks are kept in a heap ordered by their next deadline. The scheduler
+    thread is started when the first task is scheduled and exits once there
+    are no tasks left.
+
+    Only :class:`PeriodicService` instances run on the scheduler, when
+    ``DD_TRACE_SHARED_SCHEDULER_ENABLED`` is set. Code that creates periodic
+    threads directly, like the remote configuration subscribers, still gets a
+    thread of its own.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._queue = []  # type: typing.List[typing.Tuple[float, int, ScheduledTask]]
+        self._seq = itertools.count()
+        self._tasks = set()  # type: typing.Set[ScheduledTask]
+        self._thread = None  # type: typing.Optional[threading.Thread]
+
+    def in_scheduler_thread(self):
+        # type: () -> bool
+        return self._thread is threading.current_thread()
+
+    def schedule(self, task, delay):
+        # type: (ScheduledTask, float) -> None
+        """Schedule the task to run after ``delay`` seconds.
+
+        This replaces any previous scheduling of the task.
+        """
+        with self._lock:
+            task._seq = seq = next(self._seq)
+            heapq.heappush(self._queue, (monotonic() + delay, seq, task))
+            self._tasks.add(task)
+            if self._thread is None:
+                self._thread = _SchedulerThread(target=self._run, name="%s:%s" % (__name__, self.__class__.__name__))
+                self._thread.start()
+            else:
+                self._wakeup.notify()
+
+    def _next_task(self):
+        # type: () -> typing.Optional[ScheduledTask]
+        with self._lock:
+            while self._queue:
+                deadline, seq, task = self._queue[0]
+                if seq != task._seq:
+                    # The task has been rescheduled since
+                    heapq.heappop(self._queue)
+                    continue
+                timeout = deadline - monotonic()
+                if timeout <= 0:
+                    heapq.heappop(self._queue)
+                    task._seq = None
+                    return task
+                self._wakeup.wait(timeout)
+            self._thread = None
+            return None
+
+    def _run(self):
+        # type: () -> None
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+
+            if task.quit.is_set():
+                task._shutdown()
+                continue
+
+            task._run_once()
+
+            if task.quit.is_set():
+                task._shutdown()
+            elif task.is_alive():
+                self.schedule(task, 0 if task.request.is_set() else task.interval)
+
+    def _after_fork(self):
+        # type: () -> None
+        # All the tasks died with the scheduler thread in the parent process.
+        for task in list(self._tasks):
+            task._alive = False
+            task._finished.set()
+        self._tasks.clear()
+
+
+class _SchedulerThread(threading.Thread):
+    _ddtrace_profiling_ignore = True
+
+    def __init__(self, target, name):
+        # type: (typing.Callable[[], typing.Any], str) -> None
+        super(_SchedulerThread, self).__init__(target=target, name=name)
+        self.daemon = True
+
+
+_scheduler = None  # type: typing.Optional[PeriodicScheduler]
+
+
+def get_scheduler():
+    # type: () -> PeriodicScheduler
+    """Return the periodic scheduler of the current process."""
+    global _scheduler
+
+    if _scheduler is None:
+        _scheduler = PeriodicScheduler()
+    return _scheduler
+
+
+@forksafe.register
+def _reset_scheduler():
+    # type: () -> None
+    global _scheduler
+
+    if _scheduler is not None:
+        _scheduler._after_fork()
+        _scheduler = None
+
+
+class ScheduledTask(object):
+    """Periodic task run by the shared :class:`PeriodicScheduler` thread.
+
+    This class has the same interface as :class:`AwakeablePeriodicThread` so
+    that it can be used by :class:`PeriodicService` in place of a dedicated
+    thread. Like with a thread, an unhandled exception raised by the target
+    function stops the task without calling ``on_shutdown``.
+    """
+
+    def __init__(
+        self,
+        interval,  # type: float
+        target,  # type: typing.Callable[[], typing.Any]
+        name=None,  # type: typing.Optional[str]
+        on_shutdown=None,  # type: typing.Optional[typing.Callable[[], typing.Any]]
+        run_on_start=False,  # type: bool
+    ):
+        # type: (...) -> None
+        """Create a periodic task.
+
+        :param interval: The interval in seconds to wait between execution of the periodic function.
+        :param target: The periodic function to execute every interval.
+        :param name: The name of the task.
+        :param on_shutdown: The function to call when the task shuts down.
+        :param run_on_start: Whether to run the target function as soon as the task is started.
+        """
+        self.interval = interval
+        self.name = name
+        self._target = target
+        self._on_shutdown = on_shutdown
+        self._run_on_start = run_on_start
+        self._seq = None  # type: typing.Optional[int]
+        self._started = False
+        self._alive = False
+        self.quit = forksafe.Event()
+        self.request = forksafe.Event()
+        self.served = forksafe.Event()
+        self.awake_lock = forksafe.Lock()
+        self._finished = forksafe.Event()
+        self._shutdown_lock = forksafe.Lock()
+
+    def start(self):
+        # type: () -> None
+        """Start the task."""
+        if self._started:
+            raise RuntimeError("tasks can only be started once")
+        self._started = self._alive = True
+        get_scheduler().schedule(self, 0 if self._run_on_start else self.interval)
+
+    def is_alive(self):
+        # type: () -> bool
+        return self._alive
+
+    def stop(self):
+        # type: () -> None
+        """Stop the task."""
+        if self.is_alive():
+            self.quit.set()
+            get_scheduler().schedule(self, 0)
+
+    def awake(self, wait=True):
+        # type: (bool) -> None
+        """Awake the task.
+
+        :param wait: Whether to block until the task has served the request.
+            Requests made from the scheduler thread never block.
+
+        This does nothing if the task is not running.
+        """
+        if not self.is_alive() or self.quit.is_set():
+            return
+
+        scheduler = get_scheduler()
+        if not wait or scheduler.in_scheduler_thread():
+            self.request.set()
+            scheduler.schedule(self, 0)
+            return
+
+        with self.awake_lock:
+            self.served.clear()
+            self.request.set()
+            scheduler.schedule(self, 0)
+            self.served.wait()
+
+    def join(self, timeout=None):
+        # type: (typing.Optional[float]) -> None
+        if not self.is_alive():
+            return
+        if get_scheduler().in_scheduler_thread():
+            # The scheduler thread cannot wait for itself
+            if self.quit.is_set():
+                self._shutdown()
+            return
+        self._finished.wait(timeout)
+
+    def _run_once(self):
+        # type: () -> None
+        served = self.request.is_set()
+        self.request.clear()
+        try:
+            self._target()
+        except Exception:
+            log.error("Unhandled exception in periodic task %s", self.name, exc_info=True)
+            self._die()
+        finally:
+            if served:
+                self.served.set()
+
+    def _die(self):
+        # type: () -> None
+        self._alive = False
+        self._finished.set()
+        # Do not leave anyone waiting for a request to be served
+        self.served.set()
+        get_scheduler()._tasks.discard(self)
+
+    def _shutdown(self):
+        # type: () -> None
+        with self._shutdown_lock:
+            if not self._alive:
+                return
+            try:
+                if self._on_shutdown is not None:
+                    self._on_shutdown()
+            except Exception:
+                log.error("Unhandled exception in periodic task %s shutdown", self.name, exc_info=True)
+            finally:
+                self._die()
+
+
+# Whether the target function of the tasks replacing each thread class runs on start
+_SCHEDULED_THREAD_CLASSES = {
+    PeriodicThread: False,
+    AwakeablePeriodicThread: True,
+    DeferredAwakeablePeriodicThread: False,
+}  # type: typing.Dict[typing.Type[PeriodicThread], bool]
+
+
 @attr.s(eq=False)
 class PeriodicService(service.Service):
     """A service that runs periodically."""
@@ -126,12 +430,22 @@ class PeriodicService(service.Service):
     def _start_service(self, *args, **kwargs):
         # type: (typing.Any, typing.Any) -> None
         """Start the periodic service."""
-        self._worker = self.__thread_class__(
-            self.interval,
-            target=self.periodic,
-            name="%s:%s" % (self.__class__.__module__, self.__class__.__name__),
-            on_shutdown=self.on_shutdown,
-        )
+        name = "%s:%s" % (self.__class__.__module__, self.__class__.__name__)
+        if ddconfig._shared_scheduler_enabled and self.__thread_class__ in _SCHEDULED_THREAD_CLASSES:
+            self._worker = ScheduledTask(
+                self.interval,
+                target=self.periodic,
+                name=name,
+                on_shutdown=self.on_shutdown,
+                run_on_start=_SCHEDULED_THREAD_CLASSES[self.__thread_class__],
+            )
+        else:
+            self._worker = self.__thread_class__(
+                self.interval,
+                target=self.periodic,
+                name=name,
+                on_shutdown=self.on_shutdown,
+            )
         self._worker.start()
 
     def _stop_service(self, *args, **kwargs):
@@ -161,6 +475,6 @@ class AwakeablePeriodicService(PeriodicService):
 
     __thread_class__ = AwakeablePeriodicThread
 
-    def awake(self):
-        # type: (...) -> None
-        self._worker.awake()
+    def awake(self, wait=True):
+        # type: (bool) -> None
+        self._worker.awake(wait)
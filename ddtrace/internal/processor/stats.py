@@ -1,10 +1,7 @@
 # coding: utf-8
-from collections import defaultdict
 import os
 import typing
 
-from ddsketch import LogCollapsingLowestDenseDDSketch
-from ddsketch.pb.proto import DDSketchProto
 import six
 
 import ddtrace
@@ -14,8 +11,8 @@ from ddtrace.span import _is_top_level
 
 from ...constants import SPAN_MEASURED_KEY
 from .._encoding import packb
-from ..agent import get_connection
-from ..compat import get_connection_response
+from .._stats import SpanStatsAggregator
+from ..agent import connection_pool
 from ..forksafe import Lock
 from ..hostname import get_hostname
 from ..logger import get_logger
@@ -25,7 +22,6 @@ from . import SpanProcessor
 
 
 if typing.TYPE_CHECKING:  # pragma: no cover
-    from typing import DefaultDict
     from typing import Dict
     from typing import List
     from typing import Optional
@@ -60,33 +56,6 @@ SpanAggrKey = typing.Tuple[
 ]
 
 
-class SpanAggrStats(object):
-    """Aggregated span statistics."""
-
-    __slots__ = ("hits", "top_level_hits", "errors", "duration", "ok_distribution", "err_distribution")
-
-    def __init__(self):
-        self.hits = 0
-        self.top_level_hits = 0
-        self.errors = 0
-        self.duration = 0
-        # Match the relative accuracy of the sketch implementation used in the backend
-        # which is 0.775%.
-        self.ok_distribution = LogCollapsingLowestDenseDDSketch(0.00775, bin_limit=2048)
-        self.err_distribution = LogCollapsingLowestDenseDDSketch(0.00775, bin_limit=2048)
-
-
-def _span_aggr_key(span):
-    # type: (Span) -> SpanAggrKey
-    """Return a hashable key that can be used to aggregate similar spans."""
-    service = span.service or ""
-    resource = span.resource or ""
-    _type = span.span_type or ""
-    status_code = span.get_tag("http.status_code") or 0
-    synthetics = span.context.dd_origin == "synthetics"
-    return span.name, service, resource, _type, int(status_code), synthetics
-
-
 class SpanStatsProcessorV06(PeriodicService, SpanProcessor):
     """SpanProcessor for computing, collecting and submitting span metrics to the Datadog Agent."""
 
@@ -101,9 +70,9 @@ class SpanStatsProcessorV06(PeriodicService, SpanProcessor):
         self._timeout = timeout
         # Have the bucket size match the interval in which flushes occur.
         self._bucket_size_ns = int(interval * 1e9)  # type: int
-        self._buckets = defaultdict(
-            lambda: defaultdict(SpanAggrStats)
-        )  # type: DefaultDict[int, DefaultDict[SpanAggrKey, SpanAggrStats]]
+        # Match the relative accuracy of the sketch implementation used in the backend
+        # which is 0.775%.
+        self._aggregator = SpanStatsAggregator(self._bucket_size_ns, relative_accuracy=0.00775, bin_limit=2048)
         self._headers = {
             "Datadog-Meta-Lang": "python",
             "Datadog-Meta-Tracer-Version": ddtrace.__version__,
@@ -133,23 +102,10 @@ class SpanStatsProcessorV06(PeriodicService, SpanProcessor):
         if not is_top_level and not _is_measured(span):
             return
 
+        assert span.duration_ns is not None
         with self._lock:
-            # Align the span into the corresponding stats bucket
-            assert span.duration_ns is not None
-            span_end_ns = span.start_ns + span.duration_ns
-            bucket_time_ns = span_end_ns - (span_end_ns % self._bucket_size_ns)
-            aggr_key = _span_aggr_key(span)
-            stats = self._buckets[bucket_time_ns][aggr_key]
-
-            stats.hits += 1
-            stats.duration += span.duration_ns
-            if is_top_level:
-                stats.top_level_hits += 1
-            if span.error:
-                stats.errors += 1
-                stats.err_distribution.add(span.duration_ns)
-            else:
-                stats.ok_distribution.add(span.duration_ns)
+            # The aggregator aligns the span into the corresponding stats bucket
+            self._aggregator.add(span, is_top_level)
 
     def _serialize_buckets(self):
         # type: () -> List[Dict]
@@ -158,24 +114,22 @@ class SpanStatsProcessorV06(PeriodicService, SpanProcessor):
         The current bucket is left in case any other spans are added.
         """
         serialized_buckets = []
-        serialized_bucket_keys = []
-        for bucket_time_ns, bucket in self._buckets.items():
+        for bucket_time_ns, bucket in self._aggregator.flush():
             bucket_aggr_stats = []
-            serialized_bucket_keys.append(bucket_time_ns)
 
-            for aggr_key, stat_aggr in bucket.items():
+            for aggr_key, hits, top_level_hits, errors, duration, ok_summary, err_summary in bucket:
                 name, service, resource, _type, http_status, synthetics = aggr_key
                 serialized_bucket = {
                     u"Name": six.ensure_text(name),
                     u"Resource": six.ensure_text(resource),
                     u"Synthetics": synthetics,
                     u"HTTPStatusCode": http_status,
-                    u"Hits": stat_aggr.hits,
-                    u"TopLevelHits": stat_aggr.top_level_hits,
-                    u"Duration": stat_aggr.duration,
-                    u"Errors": stat_aggr.errors,
-                    u"OkSummary": DDSketchProto.to_proto(stat_aggr.ok_distribution).SerializeToString(),
-                    u"ErrorSummary": DDSketchProto.to_proto(stat_aggr.err_distribution).SerializeToString(),
+                    u"Hits": hits,
+                    u"TopLevelHits": top_level_hits,
+                    u"Duration": duration,
+                    u"Errors": errors,
+                    u"OkSummary": ok_summary,
+                    u"ErrorSummary": err_summary,
                 }
                 if service:
                     serialized_bucket[u"Service"] = six.ensure_text(service)
@@ -190,18 +144,14 @@ class SpanStatsProcessorV06(PeriodicService, SpanProcessor):
                 }
             )
 
-        # Clear out buckets that have been serialized
-        for key in serialized_bucket_keys:
-            del self._buckets[key]
-
         return serialized_buckets
 
     def _flush_stats(self, payload):
         # type: (bytes) -> None
         try:
-            conn = get_connection(self._agent_url, self._timeout)
-            conn.request("PUT", self._endpoint, payload, self._headers)
-            resp = get_connection_response(conn)
+            resp, body = connection_pool.request(
+                self._agent_url, "PUT", self._endpoint, payload, self._headers, self._timeout
+            )
         except Exception:
             log.error("failed to submit span stats to the Datadog agent at %s", self._agent_endpoint, exc_info=True)
             raise
@@ -217,7 +167,7 @@ class SpanStatsProcessorV06(PeriodicService, SpanProcessor):
                     "failed to send stats payload, %s (%s) (%s) response from Datadog agent at %s",
                     resp.status,
                     resp.reason,
-                    resp.read(),
+                    body,
                     self._agent_endpoint,
                 )
             else:
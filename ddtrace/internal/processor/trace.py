@@ -27,6 +27,7 @@ from ddtrace.internal.sampling import is_single_span_sampled
 from ddtrace.internal.schema import schematize_service_name
 from ddtrace.internal.service import ServiceStatusError
 from ddtrace.internal.telemetry.constants import TELEMETRY_NAMESPACE_TAG_TRACER
+from ddtrace.internal.telemetry.metrics_namespaces import CountMetricHandle
 from ddtrace.internal.writer import TraceWriter
 from ddtrace.span import Span
 from ddtrace.span import _get_64_highest_order_bits_as_hex
@@ -158,6 +159,38 @@ class TraceTagsProcessor(TraceProcessor):
         return trace
 
 
+@attr.s
+class _SharedResources(object):
+    """Resources of the compacted spans, shared between the spans with equal resources.
+
+    The table is bounded by the total length of the resources it holds, and
+    starts over when full, so that high-cardinality or very long resources do
+    not grow it indefinitely.
+    """
+
+    max_size = attr.ib(type=int, default=1 << 20)
+    _resources = attr.ib(init=False, factory=dict, type=Dict[str, str], repr=False)
+    _size = attr.ib(init=False, type=int, default=0)
+    _lock = attr.ib(init=False, factory=Lock, repr=False, type=Lock)
+
+    def share(self, resource):
+        # type: (str) -> str
+        with self._lock:
+            shared = self._resources.get(resource)
+            if shared is not None:
+                return shared
+
+            size = len(resource)
+            if size > self.max_size:
+                return resource
+            if self._size + size > self.max_size:
+                self._resources.clear()
+                self._size = 0
+            self._resources[resource] = resource
+            self._size += size
+            return resource
+
+
 @attr.s
 class SpanAggregator(SpanProcessor):
     """Processor that aggregates spans together by trace_id and writes the
@@ -167,6 +200,10 @@ class SpanAggregator(SpanProcessor):
           the trace_id have finished; or
         - A minimum threshold of spans (``partial_flush_min_spans``) have been
           finished in the collection and ``partial_flush_enabled`` is True.
+
+    Pending traces are partitioned by trace_id into ``num_shards`` shards, each
+    guarded by its own lock, so that threads working on different traces do not
+    contend on a single process-wide lock.
     """
 
     @attr.s
@@ -174,44 +211,70 @@ class SpanAggregator(SpanProcessor):
         spans = attr.ib(default=attr.Factory(list))  # type: List[Span]
         num_finished = attr.ib(type=int, default=0)  # type: int
 
+    @attr.s
+    class _Shard(object):
+        traces = attr.ib(
+            factory=lambda: defaultdict(lambda: SpanAggregator._Trace()),
+            type=DefaultDict[int, "SpanAggregator._Trace"],
+            repr=False,
+        )
+        if config._span_aggregator_rlock:
+            lock = attr.ib(factory=RLock, repr=False, type=Union[RLock, Lock])
+        else:
+            lock = attr.ib(factory=Lock, repr=False, type=Union[RLock, Lock])
+
     _partial_flush_enabled = attr.ib(type=bool)
     _partial_flush_min_spans = attr.ib(type=int)
     _trace_processors = attr.ib(type=Iterable[TraceProcessor])
     _writer = attr.ib(type=TraceWriter)
-    _traces = attr.ib(
-        factory=lambda: defaultdict(lambda: SpanAggregator._Trace()),
-        init=False,
-        type=DefaultDict[int, "_Trace"],
-        repr=False,
+    _num_shards = attr.ib(
+        type=int,
+        default=attr.Factory(lambda: config._span_aggregator_shards),
+        converter=lambda n: max(1, int(n)),
     )
-    if config._span_aggregator_rlock:
-        _lock = attr.ib(init=False, factory=RLock, repr=False, type=Union[RLock, Lock])
-    else:
-        _lock = attr.ib(init=False, factory=Lock, repr=False, type=Union[RLock, Lock])
-    # Tracks the number of spans created and tags each count with the api that was used
-    # ex: otel api, opentracing api, datadog api
-    _span_metrics = attr.ib(
-        init=False,
-        factory=lambda: {
-            "spans_created": defaultdict(int),
-            "spans_finished": defaultdict(int),
-        },
-        type=Dict[str, DefaultDict],
+    _compact_finished_spans = attr.ib(
+        type=bool,
+        default=attr.Factory(lambda: config._trace_compact_finished_spans),
     )
+    _shards = attr.ib(init=False, type=List["SpanAggregator._Shard"], repr=False)
+    _shared_resources = attr.ib(init=False, factory=_SharedResources, type=_SharedResources, repr=False)
+    # Count the spans created and finished, by the api that was used
+    # ex: otel api, opentracing api, datadog api
+    _spans_created = attr.ib(init=False, factory=dict, type=Dict[str, CountMetricHandle], repr=False)
+    _spans_finished = attr.ib(init=False, factory=dict, type=Dict[str, CountMetricHandle], repr=False)
+    # The telemetry writer the handles above belong to
+    _telemetry_writer = attr.ib(init=False, default=None, type=Optional[telemetry.TelemetryWriter], repr=False)
+
+    @_shards.default
+    def _default_shards(self):
+        # type: () -> List[SpanAggregator._Shard]
+        return [self._Shard() for _ in range(self._num_shards)]
+
+    def _get_shard(self, trace_id):
+        # type: (int) -> SpanAggregator._Shard
+        # Trace ids are random so the lowest bits are enough to spread traces
+        # evenly across the shards.
+        return self._shards[trace_id % self._num_shards]
 
     def on_span_start(self, span):
         # type: (Span) -> None
-        with self._lock:
-            trace = self._traces[span.trace_id]
+        shard = self._get_shard(span.trace_id)
+        with shard.lock:
+            trace = shard.traces[span.trace_id]
             trace.spans.append(span)
-            self._span_metrics["spans_created"][span._span_api] += 1
-            self._queue_span_count_metrics("spans_created", "integration_name")
+        self._count_span(self._spans_created, "spans_created", span._span_api)
 
     def on_span_finish(self, span):
         # type: (Span) -> None
-        with self._lock:
-            self._span_metrics["spans_finished"][span._span_api] += 1
-            trace = self._traces[span.trace_id]
+        if self._compact_finished_spans:
+            # The span may have to wait for the rest of its trace
+            span._compact(self._shared_resources.share)
+
+        self._count_span(self._spans_finished, "spans_finished", span._span_api)
+
+        shard = self._get_shard(span.trace_id)
+        with shard.lock:
+            trace = shard.traces[span.trace_id]
             trace.num_finished += 1
             should_partial_flush = self._partial_flush_enabled and trace.num_finished >= self._partial_flush_min_spans
             if trace.num_finished == len(trace.spans) or should_partial_flush:
@@ -236,24 +299,28 @@ class SpanAggregator(SpanProcessor):
                 trace.num_finished -= num_finished
 
                 if len(trace.spans) == 0:
-                    del self._traces[span.trace_id]
-
-                spans = finished  # type: Optional[List[Span]]
-                for tp in self._trace_processors:
-                    try:
-                        if spans is None:
-                            return
-                        spans = tp.process_trace(spans)
-                    except Exception:
-                        log.error("error applying processor %r", tp, exc_info=True)
-
-                self._queue_span_count_metrics("spans_finished", "integration_name")
-                self._writer.write(spans)
+                    del shard.traces[span.trace_id]
+
+                # The writer decides whether the trace processors run now or
+                # on its background thread.
+                self._writer.write_deferred(finished, self._process_trace)
                 return
 
             log.debug("trace %d has %d spans, %d finished", span.trace_id, len(trace.spans), trace.num_finished)
             return None
 
+    def _process_trace(self, spans):
+        # type: (List[Span]) -> Optional[List[Span]]
+        """Apply the trace processors to a finished trace chunk."""
+        for tp in self._trace_processors:
+            try:
+                if spans is None:
+                    return None
+                spans = tp.process_trace(spans)
+            except Exception:
+                log.error("error applying processor %r", tp, exc_info=True)
+        return spans
+
     def shutdown(self, timeout):
         # type: (Optional[float]) -> None
         """
@@ -264,19 +331,14 @@ class SpanAggregator(SpanProcessor):
             before exiting or :obj:`None` to block until flushing has successfully completed (default: :obj:`None`)
         :type timeout: :obj:`int` | :obj:`float` | :obj:`None`
         """
-        if self._span_metrics["spans_created"] or self._span_metrics["spans_finished"]:
+        if self._spans_created or self._spans_finished:
             if config._telemetry_enabled:
                 # Telemetry writer is disabled when a process shutsdown. This is to support py3.12.
                 # Here we submit the remanining span creation metrics without restarting the periodic thread.
                 # Note - Due to how atexit hooks are registered the telemetry writer is shutdown before the tracer.
                 telemetry.telemetry_writer._is_periodic = False
                 telemetry.telemetry_writer._enabled = True
-                # on_span_start queue span created counts in batches of 100. This ensures all remaining counts are sent
-                # before the tracer is shutdown.
-                self._queue_span_count_metrics("spans_created", "integration_name", None)
-                # on_span_finish(...) queues span finish metrics in batches of 100.
-                # This ensures all remaining counts are sent before the tracer is shutdown.
-                self._queue_span_count_metrics("spans_finished", "integration_name", None)
+                # The span counts are aggregated when the telemetry metrics are flushed
                 telemetry.telemetry_writer.periodic(True)
                 # Disable the telemetry writer so no events/metrics/logs are queued during process shutdown
                 telemetry.telemetry_writer.disable()
@@ -287,17 +349,21 @@ class SpanAggregator(SpanProcessor):
             # It's possible the writer never got started in the first place :(
             pass
 
-    def _queue_span_count_metrics(self, metric_name, tag_name, min_count=100):
-        # type: (str, str, Optional[int]) -> None
-        """Queues a telemetry count metric for span created and span finished"""
-        # perf: telemetry_metrics_writer.add_count_metric(...) is an expensive operation.
-        # We should avoid calling this method on every invocation of span finish and span start.
-        if min_count is None or sum(self._span_metrics[metric_name].values()) >= min_count:
-            for tag_value, count in self._span_metrics[metric_name].items():
-                telemetry.telemetry_writer.add_count_metric(
-                    TELEMETRY_NAMESPACE_TAG_TRACER, metric_name, count, tags=((tag_name, tag_value),)
-                )
-            self._span_metrics[metric_name] = defaultdict(int)
+    def _count_span(self, handles, metric_name, span_api):
+        # type: (Dict[str, CountMetricHandle], str, str) -> None
+        """Increments the telemetry count metric of the spans created or finished with an api"""
+        writer = telemetry.telemetry_writer
+        if writer is not self._telemetry_writer:
+            # The telemetry writer was replaced: the handles of the previous one are never flushed again
+            self._spans_created.clear()
+            self._spans_finished.clear()
+            self._telemetry_writer = writer
+        handle = handles.get(span_api)
+        if handle is None:
+            handle = handles[span_api] = writer.get_count_metric_handle(
+                TELEMETRY_NAMESPACE_TAG_TRACER, metric_name, tags=(("integration_name", span_api),)
+            )
+        handle.add_point()
 
 
 @attr.s
@@ -267,15 +267,17 @@ class RemoteConfigClient(object):
             log.debug(
                 "[%s][P: %s] Requesting RC data from products: %s", os.getpid(), os.getppid(), str(self._products)
             )  # noqa: G200
-            conn = agent.get_connection(self.agent_url, timeout=ddtrace.config._agent_timeout_seconds)
-            conn.request("POST", REMOTE_CONFIG_AGENT_ENDPOINT, payload, self._headers)
-            resp = conn.getresponse()
-            data = resp.read()
+            resp, data = agent.connection_pool.request(
+                self.agent_url,
+                "POST",
+                REMOTE_CONFIG_AGENT_ENDPOINT,
+                payload,
+                self._headers,
+                timeout=ddtrace.config._agent_timeout_seconds,
+            )
         except OSError as e:
             log.debug("Unexpected connection error in remote config client request: %s", str(e))  # noqa: G200
             return None
-        finally:
-            conn.close()
 
         if resp.status == 404:
             # Remote configuration is not enabled or unsupported by the agent
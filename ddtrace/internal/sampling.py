@@ -41,8 +41,10 @@ except ImportError:
 if TYPE_CHECKING:  # pragma: no cover
     from typing import Any
     from typing import Dict
+    from typing import Iterable
     from typing import List
     from typing import Text
+    from typing import Tuple
 
     from ddtrace.context import Context
     from ddtrace.span import Span
@@ -317,3 +319,78 @@ def _get_highest_precedence_rule_matching(span, rules):
         if rule.matches(span):
             return rule
     return None
+
+
+class SamplingRulesMatcher(object):
+    """Find the first of an ordered list of sampling rules that matches a span.
+
+    The rules are compiled into a table of candidate rules indexed by the
+    exact service and name values used by the rules, so that only the rules
+    that can match a span are evaluated. The decisions are also cached by the
+    span properties that the rules depend on, which makes matching a span
+    independent of the number of rules once its properties have been seen.
+
+    Rules of ``SamplingRule`` subclasses might match spans differently, in
+    which case the rules are evaluated one at a time.
+    """
+
+    MAX_DECISIONS = 4096
+
+    def __init__(self, rules):
+        # type: (Iterable[SamplingRule]) -> None
+        self.rules = list(rules)
+        self._compiled = all(type(rule) is SamplingRule for rule in self.rules)
+        self._decisions = {}  # type: Dict[Any, Optional[SamplingRule]]
+
+        # The span properties that at least one rule depends on
+        self._match_resource = any(rule.resource is not SamplingRule.NO_RULE for rule in self.rules)
+        self._tag_keys = tuple(sorted({key for rule in self.rules for key in rule._tag_value_matchers}))
+
+        services = {rule.service for rule in self.rules if isinstance(rule.service, str)}
+        names = {rule.name for rule in self.rules if isinstance(rule.name, str)}
+        self._services = frozenset(services)
+        self._names = frozenset(names)
+        # DEV: None stands for any value that no rule matches exactly
+        self._candidates = {
+            (service, name): tuple(
+                rule
+                for rule in self.rules
+                if (not isinstance(rule.service, str) or rule.service == service)
+                and (not isinstance(rule.name, str) or rule.name == name)
+            )
+            for service in services | {None}
+            for name in names | {None}
+        }  # type: Dict[Tuple[Optional[str], Optional[str]], Tuple[SamplingRule, ...]]
+
+    def match(self, span):
+        # type: (Span) -> Optional[SamplingRule]
+        """Return the first rule that matches the span, if any."""
+        if not self._compiled:
+            return _get_highest_precedence_rule_matching(span, self.rules)
+
+        service = span.service
+        name = span.name
+        key = (
+            service,
+            name,
+            span.resource if self._match_resource else None,
+            tuple(span._meta.get(k) for k in self._tag_keys) if self._tag_keys else None,
+        )
+        try:
+            return self._decisions[key]
+        except KeyError:
+            pass
+
+        candidates = self._candidates[
+            (
+                service if service in self._services else None,
+                name if name in self._names else None,
+            )
+        ]
+        rule = _get_highest_precedence_rule_matching(span, candidates)  # type: ignore[arg-type]
+
+        if len(self._decisions) >= self.MAX_DECISIONS:
+            self._decisions.clear()
+        self._decisions[key] = rule
+
+        return rule
@@ -9,6 +9,9 @@ from typing import Tuple
 import six
 
 
+# Number of values a distribution sends per flush. Past this number the values are dropped and counted.
+DISTRIBUTION_MAX_POINTS = 1000
+
 MetricTagType = Optional[Tuple[Tuple[str, str], ...]]
 
 
@@ -122,18 +125,26 @@ class RateMetric(Metric):
 
 class DistributionMetric(Metric):
     """
-    The rate type takes the count and divides it by the length of the time interval. This is useful if you’re
-    interested in the number of hits per second.
+    A distribution type reports the values submitted in a time interval, so that the backend can compute their
+    percentiles. Only the first ``DISTRIBUTION_MAX_POINTS`` values of an interval are kept, which bounds the memory
+    used by the metric and the size of its payload. The values past this limit are counted as dropped.
     """
 
     metric_type = "distributions"
+    __slots__ = ["_dropped"]
+
+    def __init__(self, namespace, name, tags, common, interval=None):
+        # type: (str, str, MetricTagType, bool, Optional[float]) -> None
+        super(DistributionMetric, self).__init__(namespace, name, tags, common, interval)
+        self._dropped = 0
 
     def add_point(self, value=1.0):
         # type: (float) -> None
-        """Example:
-        https://github.com/DataDog/datadogpy/blob/ee5ac16744407dcbd7a3640ee7b4456536460065/datadog/threadstats/metrics.py#L181
-        """
-        self._points.append(value)
+        """adds a value to the distribution"""
+        if len(self._points) < DISTRIBUTION_MAX_POINTS:
+            self._points.append(value)
+        else:
+            self._dropped += 1
 
     def to_dict(self):
         # type: () -> Dict
@@ -1,19 +1,37 @@
+import abc
 from collections import defaultdict
+from collections import deque
+from functools import partial
+import threading
 from typing import Any
+from typing import Callable
+from typing import Deque
 from typing import Dict
 from typing import Optional
 from typing import Type
+from typing import TypeVar
+from typing import cast
+
+import six
 
 from ddtrace.internal import forksafe
 from ddtrace.internal.telemetry.constants import TELEMETRY_TYPE_DISTRIBUTION
 from ddtrace.internal.telemetry.constants import TELEMETRY_TYPE_GENERATE_METRICS
+from ddtrace.internal.telemetry.metrics import DISTRIBUTION_MAX_POINTS
+from ddtrace.internal.telemetry.metrics import CountMetric
 from ddtrace.internal.telemetry.metrics import DistributionMetric
+from ddtrace.internal.telemetry.metrics import GaugeMetric
 from ddtrace.internal.telemetry.metrics import Metric
 from ddtrace.internal.telemetry.metrics import MetricTagType
 
 
 NamespaceMetricType = Dict[str, Dict[str, Dict[str, Any]]]
 
+H = TypeVar("H", bound="MetricHandle")
+
+# Count metric reporting the values of the distributions that were dropped past DISTRIBUTION_MAX_POINTS
+DISTRIBUTION_POINTS_DROPPED = "distribution_points_dropped"
+
 
 class MetricNamespace:
     def __init__(self):
@@ -23,16 +41,83 @@ class MetricNamespace:
             TELEMETRY_TYPE_GENERATE_METRICS: defaultdict(dict),
             TELEMETRY_TYPE_DISTRIBUTION: defaultdict(dict),
         }  # type: Dict[str, Dict[str, Dict[int, Metric]]]
+        self._handles = {}  # type: Dict[int, MetricHandle]
 
     def flush(self):
         # type: () -> Dict
         with self._lock:
+            # The handles are aggregated under the lock so that concurrent flushes never report the same points twice
+            for handle in self._handles.values():
+                handle._aggregate(partial(self._get_metric_locked, handle))
             namespace_metrics = self._metrics_data
             self._metrics_data = {
                 TELEMETRY_TYPE_GENERATE_METRICS: defaultdict(dict),
                 TELEMETRY_TYPE_DISTRIBUTION: defaultdict(dict),
             }
-            return namespace_metrics
+
+        # Report the number of values each distribution dropped. The flushed metrics are no longer shared.
+        for namespace, metrics in namespace_metrics[TELEMETRY_TYPE_DISTRIBUTION].items():
+            for metric in metrics.values():
+                if metric._dropped:  # type: ignore[attr-defined]
+                    tags = (("metric", metric.name),)
+                    metric_id = Metric.get_id(DISTRIBUTION_POINTS_DROPPED, namespace, tags, CountMetric.metric_type)
+                    count_metrics = namespace_metrics[TELEMETRY_TYPE_GENERATE_METRICS][namespace]
+                    dropped = count_metrics.get(metric_id)
+                    if dropped is None:
+                        dropped = CountMetric(namespace, DISTRIBUTION_POINTS_DROPPED, tags=tags, common=True)
+                        count_metrics[metric_id] = dropped
+                    dropped.add_point(metric._dropped)  # type: ignore[attr-defined]
+        return namespace_metrics
+
+    def get_metric_handle(self, metric_class, namespace, name, tags=None, interval=None):
+        # type: (Type[Metric], str, str, MetricTagType, Optional[float]) -> MetricHandle
+        """
+        Returns a handle to add points to a metric from any thread without taking a lock or computing the id of the
+        metric. The points are added to the metric when the namespace is flushed. The same handle is returned for the
+        same metric.
+        """
+        if metric_class is DistributionMetric:
+            handle_class = DistributionMetricHandle  # type: Type[MetricHandle]
+        elif metric_class is GaugeMetric:
+            handle_class = GaugeMetricHandle
+        else:
+            # The values of count and rate metrics are summed up
+            handle_class = CountMetricHandle
+        return self._get_handle(handle_class, metric_class, namespace, name, tags, interval)
+
+    def get_count_metric_handle(self, namespace, name, tags=None):
+        # type: (str, str, MetricTagType) -> CountMetricHandle
+        """
+        Returns a handle to count events without taking a lock. The counts are added to the metric when the namespace
+        is flushed. The same handle is returned for the same metric.
+        """
+        return self._get_handle(CountMetricHandle, CountMetric, namespace, name, tags, None)
+
+    def get_gauge_metric_handle(self, namespace, name, tags=None, interval=None):
+        # type: (str, str, MetricTagType, Optional[float]) -> GaugeMetricHandle
+        """
+        Returns a handle to set a gauge without taking a lock. The last value set is added to the metric when the
+        namespace is flushed. The same handle is returned for the same metric.
+        """
+        return self._get_handle(GaugeMetricHandle, GaugeMetric, namespace, name, tags, interval)
+
+    def get_distribution_metric_handle(self, namespace, name, tags=None):
+        # type: (str, str, MetricTagType) -> DistributionMetricHandle
+        """
+        Returns a handle to add values to a distribution without taking a lock. The values are added to the metric
+        when the namespace is flushed. The same handle is returned for the same metric.
+        """
+        return self._get_handle(DistributionMetricHandle, DistributionMetric, namespace, name, tags, None)
+
+    def _get_handle(self, handle_class, metric_class, namespace, name, tags, interval):
+        # type: (Type[H], Type[Metric], str, str, MetricTagType, Optional[float]) -> H
+        metric_id = Metric.get_id(name, namespace, tags, metric_class.metric_type)
+        with self._lock:
+            handle = self._handles.get(metric_id)
+            if handle is None:
+                handle = handle_class(metric_class, namespace, name, tags, interval)
+                self._handles[metric_id] = handle
+        return cast(H, handle)
 
     def add_metric(self, metric_class, namespace, name, value=1.0, tags=None, interval=None):
         # type: (Type[Metric], str, str, float, MetricTagType, Optional[float]) -> None
@@ -40,17 +125,191 @@ class MetricNamespace:
         Telemetry Metrics are stored in DD dashboards, check the metrics in datadoghq.com/metric/explorer.
         The metric will store in dashboard as "dd.instrumentation_telemetry_data." + namespace + "." + name
         """
-        metric_id = Metric.get_id(name, namespace, tags, metric_class.metric_type)
         if metric_class is DistributionMetric:
             metrics_type_payload = TELEMETRY_TYPE_DISTRIBUTION
         else:
             metrics_type_payload = TELEMETRY_TYPE_GENERATE_METRICS
-
+        metric_id = Metric.get_id(name, namespace, tags, metric_class.metric_type)
         with self._lock:
-            existing_metric = self._metrics_data[metrics_type_payload][namespace].get(metric_id)
-            if existing_metric:
-                existing_metric.add_point(value)
-            else:
-                new_metric = metric_class(namespace, name, tags=tags, common=True, interval=interval)
-                new_metric.add_point(value)
-                self._metrics_data[metrics_type_payload][namespace][metric_id] = new_metric
+            metrics = self._metrics_data[metrics_type_payload][namespace]
+            metric = metrics.get(metric_id)
+            if metric is None:
+                metric = metric_class(namespace, name, tags=tags, common=True, interval=interval)
+                metrics[metric_id] = metric
+            metric.add_point(value)
+
+    def _get_metric_locked(self, handle):
+        # type: (MetricHandle) -> Metric
+        metrics = self._metrics_data[handle._metrics_type_payload][handle.namespace]
+        metric = metrics.get(handle._metric_id)
+        if metric is None:
+            metric = handle._metric_class(
+                handle.namespace, handle.name, tags=handle.tags, common=True, interval=handle.interval
+            )
+            metrics[handle._metric_id] = metric
+        return metric
+
+
+class _ThreadTotals(object):
+    """
+    Running totals that threads increment without taking a lock. Each thread adds to its own total, and
+    ``collect`` returns the difference between the sum of the totals and the sum at the previous call. The totals of
+    the threads that have exited are dropped once they are collected.
+    """
+
+    __slots__ = ["totals", "_collected"]
+
+    def __init__(self):
+        # type: () -> None
+        # Keyed by the thread objects rather than the thread ids: the ids of the threads that have exited are reused
+        self.totals = {}  # type: Dict[threading.Thread, float]
+        self._collected = 0.0
+
+    def add(self, value):
+        # type: (float) -> None
+        # Only the current thread writes its total, so no increment is lost
+        totals = self.totals
+        thread = threading.current_thread()
+        totals[thread] = totals.get(thread, 0.0) + value
+
+    def collect(self):
+        # type: () -> float
+        totals = self.totals.copy()
+        total = sum(totals.values())
+        value, self._collected = total - self._collected, total
+        # A thread that has exited never adds to its total again. Its last increments may have been added after the
+        # copy: removing its final total from the collected sum reports them at the next call.
+        for thread in totals:
+            if not thread.is_alive():
+                self._collected -= self.totals.pop(thread)
+        return value
+
+
+class MetricHandle(six.with_metaclass(abc.ABCMeta)):
+    """
+    A metric of a namespace with its id precomputed. The points are buffered by the handle, without taking a lock,
+    until the namespace is flushed.
+    """
+
+    __slots__ = [
+        "_metric_class",
+        "_metrics_type_payload",
+        "_metric_id",
+        "namespace",
+        "name",
+        "tags",
+        "interval",
+    ]
+
+    def __init__(self, metric_class, namespace, name, tags=None, interval=None):
+        # type: (Type[Metric], str, str, MetricTagType, Optional[float]) -> None
+        self._metric_class = metric_class
+        if metric_class is DistributionMetric:
+            self._metrics_type_payload = TELEMETRY_TYPE_DISTRIBUTION
+        else:
+            self._metrics_type_payload = TELEMETRY_TYPE_GENERATE_METRICS
+        self._metric_id = Metric.get_id(name, namespace, tags, metric_class.metric_type)
+        self.namespace = namespace
+        self.name = name
+        self.tags = tags
+        self.interval = interval
+
+    @abc.abstractmethod
+    def add_point(self, value=1.0):
+        # type: (float) -> None
+        """buffers a data point of the metric"""
+
+    @abc.abstractmethod
+    def _aggregate(self, get_metric):
+        # type: (Callable[[], Metric]) -> None
+        """adds the buffered points to the metric returned by ``get_metric``, which creates it if needed"""
+
+
+class CountMetricHandle(MetricHandle):
+    """A count or rate metric that can be incremented from any thread without taking a lock"""
+
+    __slots__ = ["_counts"]
+
+    def __init__(self, metric_class, namespace, name, tags=None, interval=None):
+        # type: (Type[Metric], str, str, MetricTagType, Optional[float]) -> None
+        super(CountMetricHandle, self).__init__(metric_class, namespace, name, tags, interval)
+        self._counts = _ThreadTotals()
+
+    def add_point(self, value=1.0):
+        # type: (float) -> None
+        self._counts.add(value)
+
+    def _aggregate(self, get_metric):
+        # type: (Callable[[], Metric]) -> None
+        value = self._counts.collect()
+        if value:
+            get_metric().add_point(value)
+
+
+class GaugeMetricHandle(MetricHandle):
+    """A gauge metric that can be set from any thread without taking a lock. The last value set is reported."""
+
+    __slots__ = ["_value"]
+
+    def __init__(self, metric_class, namespace, name, tags=None, interval=None):
+        # type: (Type[Metric], str, str, MetricTagType, Optional[float]) -> None
+        super(GaugeMetricHandle, self).__init__(metric_class, namespace, name, tags, interval)
+        self._value = None  # type: Optional[float]
+
+    def add_point(self, value=1.0):
+        # type: (float) -> None
+        self._value = value
+
+    def _aggregate(self, get_metric):
+        # type: (Callable[[], Metric]) -> None
+        value, self._value = self._value, None
+        if value is not None:
+            get_metric().add_point(value)
+
+
+class DistributionMetricHandle(MetricHandle):
+    """
+    A distribution metric that can receive values from any thread without taking a lock. Each thread appends to its
+    own queue, which is drained when the namespace is flushed. A queue keeps at most ``DISTRIBUTION_MAX_POINTS`` values
+    between two flushes, the values past this limit are counted as dropped.
+    """
+
+    __slots__ = ["_values", "_dropped"]
+
+    def __init__(self, metric_class, namespace, name, tags=None, interval=None):
+        # type: (Type[Metric], str, str, MetricTagType, Optional[float]) -> None
+        super(DistributionMetricHandle, self).__init__(metric_class, namespace, name, tags, interval)
+        self._values = {}  # type: Dict[threading.Thread, Deque[float]]
+        self._dropped = _ThreadTotals()
+
+    def add_point(self, value=1.0):
+        # type: (float) -> None
+        thread = threading.current_thread()
+        values = self._values.get(thread)
+        if values is None:
+            values = self._values[thread] = deque()
+        if len(values) < DISTRIBUTION_MAX_POINTS:
+            values.append(value)
+        else:
+            self._dropped.add(1)
+
+    def _aggregate(self, get_metric):
+        # type: (Callable[[], Metric]) -> None
+        metric = None  # type: Optional[Metric]
+        for thread, values in list(self._values.items()):
+            alive = thread.is_alive()
+            # The owner thread can append while the queue is drained: only the values queued so far are popped
+            for _ in range(len(values)):
+                value = values.popleft()
+                if metric is None:
+                    metric = get_metric()
+                metric.add_point(value)
+            if not alive:
+                # The thread had exited before the queue was drained: no value can be left behind
+                del self._values[thread]
+
+        dropped = self._dropped.collect()
+        if dropped:
+            if metric is None:
+                metric = get_metric()
+            metric._dropped += int(dropped)  # type: ignore[attr-defined]
@@ -22,9 +22,8 @@ from ...settings.dynamic_instrumentation import config as di_config
 from ...settings.exception_debugging import config as ed_config
 from ...settings.peer_service import _ps_config
 from ...settings.profiling import config as profiling_config
-from ..agent import get_connection
+from ..agent import connection_pool
 from ..agent import get_trace_url
-from ..compat import get_connection_response
 from ..compat import httplib
 from ..encoding import JSONEncoderV2
 from ..logger import get_logger
@@ -92,6 +91,9 @@ from .metrics import DistributionMetric
 from .metrics import GaugeMetric
 from .metrics import MetricTagType
 from .metrics import RateMetric
+from .metrics_namespaces import CountMetricHandle
+from .metrics_namespaces import DistributionMetricHandle
+from .metrics_namespaces import GaugeMetricHandle
 from .metrics_namespaces import MetricNamespace
 from .metrics_namespaces import NamespaceMetricType
 
@@ -132,23 +134,17 @@ class _TelemetryClient:
         # type: (Dict) -> Optional[httplib.HTTPResponse]
         """Sends a telemetry request to the trace agent"""
         resp = None
-        conn = None
         try:
             rb_json = self._encoder.encode(request)
             headers = self.get_headers(request)
             with StopWatch() as sw:
-                conn = get_connection(self._agent_url)
-                conn.request("POST", self._endpoint, rb_json, headers)
-                resp = get_connection_response(conn)
+                resp, _ = connection_pool.request(self._agent_url, "POST", self._endpoint, rb_json, headers)
             if resp.status < 300:
                 log.debug("sent %d in %.5fs to %s. response: %s", len(rb_json), sw.elapsed(), self.url, resp.status)
             else:
                 log.debug("failed to send telemetry to the Datadog Agent at %s. response: %s", self.url, resp.status)
         except Exception:
             log.debug("failed to send telemetry to the Datadog Agent at %s.", self.url)
-        finally:
-            if conn is not None:
-                conn.close()
         return resp
 
     def get_headers(self, request):
@@ -535,6 +531,30 @@ class TelemetryWriter(PeriodicService):
                 tags,
             )
 
+    def get_count_metric_handle(self, namespace, name, tags=None):
+        # type: (str, str, MetricTagType) -> CountMetricHandle
+        """
+        Returns a counter bound to a count metric. Incrementing it with ``add_point`` is cheaper than calling
+        ``add_count_metric``: the counts are aggregated when the metrics are flushed.
+        """
+        return self._namespace.get_count_metric_handle(namespace, name, tags)
+
+    def get_gauge_metric_handle(self, namespace, name, tags=None):
+        # type: (str, str, MetricTagType) -> GaugeMetricHandle
+        """
+        Returns a gauge bound to a gauge metric. The last value passed to its ``add_point`` method is reported when
+        the metrics are flushed.
+        """
+        return self._namespace.get_gauge_metric_handle(namespace, name, tags, self.interval)
+
+    def get_distribution_metric_handle(self, namespace, name, tags=None):
+        # type: (str, str, MetricTagType) -> DistributionMetricHandle
+        """
+        Returns a handle to add values to a distribution metric. Adding a value with ``add_point`` does not take a lock:
+        the values are added to the metric when the metrics are flushed.
+        """
+        return self._namespace.get_distribution_metric_handle(namespace, name, tags)
+
     def _flush_log_metrics(self):
         # type () -> Set[Metric]
         with self._lock:
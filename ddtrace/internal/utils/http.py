@@ -1,11 +1,15 @@
+from collections import defaultdict
 from contextlib import contextmanager
 from json import loads
 import logging
 import os
 import re
+import select
+import threading
 from typing import Any
 from typing import Callable
 from typing import ContextManager
+from typing import DefaultDict
 from typing import Dict
 from typing import Generator
 from typing import List
@@ -17,8 +21,10 @@ from typing import Union
 from ddtrace.constants import USER_ID_KEY
 from ddtrace.internal import compat
 from ddtrace.internal.compat import parse
+from ddtrace.internal.constants import _HTTPLIB_NO_TRACE_REQUEST
 from ddtrace.internal.constants import BLOCKED_RESPONSE_HTML
 from ddtrace.internal.constants import BLOCKED_RESPONSE_JSON
+from ddtrace.internal.constants import DEFAULT_MAX_IDLE_CONNECTIONS
 from ddtrace.internal.constants import DEFAULT_TIMEOUT
 from ddtrace.internal.constants import SAMPLING_DECISION_TRACE_TAG_KEY
 from ddtrace.internal.constants import W3C_TRACESTATE_ORIGIN_KEY
@@ -290,6 +296,178 @@ def get_connection(url, timeout=DEFAULT_TIMEOUT):
     raise ValueError("Unsupported protocol '%s'" % parsed.scheme)
 
 
+def _is_connection_dropped(conn):
+    # type: (ConnectionType) -> bool
+    """Check whether an idle keep-alive connection has been closed by the peer.
+
+    Nothing should be readable from an idle connection, so a readable socket
+    means that the peer has either closed it or sent unexpected data.
+    """
+    sock = conn.sock
+    if sock is None:
+        # httplib opens a new socket on demand
+        return False
+    try:
+        if hasattr(select, "poll"):
+            poller = select.poll()
+            poller.register(sock, select.POLLIN)
+            return bool(poller.poll(0))
+        return bool(select.select([sock], [], [], 0)[0])
+    except (OSError, ValueError):
+        return True
+
+
+class ConnectionPool(object):
+    """Pool of keep-alive HTTP connections, keyed by URL.
+
+    Connections are checked out with :meth:`acquire` and handed back with
+    :meth:`release`. Only connections whose last response has been fully read
+    are kept for reuse, up to ``max_idle`` per URL; any other connection is
+    closed on release. A ``max_idle`` of 0 disables connection reuse.
+    """
+
+    def __init__(self, max_idle=DEFAULT_MAX_IDLE_CONNECTIONS):
+        # type: (int) -> None
+        self.max_idle = max_idle
+        self._idle = defaultdict(list)  # type: DefaultDict[str, List[ConnectionType]]
+        self._lock = threading.Lock()
+
+    def take(self, url, timeout=DEFAULT_TIMEOUT):
+        # type: (str, float) -> Optional[ConnectionType]
+        """Take an idle connection to the given URL out of the pool, if any."""
+        while True:
+            with self._lock:
+                idle = self._idle.get(url)
+                if not idle:
+                    return None
+                conn = idle.pop()
+            if not _is_connection_dropped(conn):
+                break
+            conn.close()
+
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn
+
+    def acquire(self, url, timeout=DEFAULT_TIMEOUT):
+        # type: (str, float) -> ConnectionType
+        """Return an idle connection to the given URL, or a new one."""
+        conn = self.take(url, timeout)
+        return conn if conn is not None else get_connection(url, timeout)
+
+    def release(self, url, conn):
+        # type: (str, ConnectionType) -> None
+        """Give a connection back to the pool, or close it if it cannot be reused."""
+        # DEV: httplib keeps track of the response that has not been read yet
+        # in a private attribute. Requests cannot be sent over the connection
+        # until that response is closed.
+        response = getattr(conn, "_HTTPConnection__response", None)
+        if (
+            isinstance(conn, compat.httplib.HTTPConnection)
+            and conn.sock is not None
+            and (response is None or response.isclosed())
+        ):
+            conn.__dict__.pop(_HTTPLIB_NO_TRACE_REQUEST, None)
+            with self._lock:
+                idle = self._idle[url]
+                if len(idle) < self.max_idle:
+                    idle.append(conn)
+                    return
+        conn.close()
+
+    def _request(self, url, conn, method, path, body, headers, no_trace, reuse):
+        # type: (str, ConnectionType, str, str, Optional[bytes], Dict[str, str], bool, bool) -> Tuple[compat.httplib.HTTPResponse, bytes]
+        if no_trace:
+            setattr(conn, _HTTPLIB_NO_TRACE_REQUEST, True)
+        try:
+            conn.request(method, path, body, headers)
+            resp = compat.get_connection_response(conn)
+            data = resp.read()
+        except BaseException:
+            conn.close()
+            raise
+        if reuse:
+            self.release(url, conn)
+        else:
+            conn.close()
+        return resp, data
+
+    def request(
+        self,
+        url,  # type: str
+        method,  # type: str
+        path,  # type: str
+        body=None,  # type: Optional[bytes]
+        headers=None,  # type: Optional[Dict[str, str]]
+        timeout=DEFAULT_TIMEOUT,  # type: float
+        no_trace=False,  # type: bool
+        reuse=True,  # type: bool
+    ):
+        # type: (...) -> Tuple[compat.httplib.HTTPResponse, bytes]
+        """Send a request over a pooled connection and read the whole response.
+
+        The peer can close an idle keep-alive connection at any time. If the
+        request fails on a reused connection because it was closed, it is sent
+        again once over a new connection.
+
+        With ``no_trace``, the request is not traced by the httplib
+        integration. With ``reuse`` set to false, the request is sent over a
+        new connection that is closed afterwards.
+
+        Returns the response and its body.
+        """
+        headers = headers or {}
+        conn = self.take(url, timeout) if reuse else None
+        if conn is not None:
+            try:
+                return self._request(url, conn, method, path, body, headers, no_trace, reuse)
+            except ConnectionError:
+                log.debug("reused connection to %s was closed by the peer, retrying with a new one", url, exc_info=True)
+        return self._request(url, get_connection(url, timeout), method, path, body, headers, no_trace, reuse)
+
+    @contextmanager
+    def connection(self, url, timeout=DEFAULT_TIMEOUT):
+        # type: (str, float) -> Generator[ConnectionType, None, None]
+        """Context manager that checks out a connection to the given URL.
+
+        The connection is handed back to the pool on exit, unless an exception
+        is raised, in which case it is closed.
+        """
+        conn = self.acquire(url, timeout)
+        try:
+            yield conn
+        except BaseException:
+            conn.close()
+            raise
+        self.release(url, conn)
+
+    def clear(self):
+        # type: () -> None
+        """Close all the idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, defaultdict(list)
+        self._close_all(idle)
+
+    def _after_fork(self):
+        # type: () -> None
+        """Drop the connections inherited from the parent process.
+
+        The lock is replaced rather than acquired: another thread of the parent
+        could have been holding it when the process forked.
+        """
+        self._lock = threading.Lock()
+        idle, self._idle = self._idle, defaultdict(list)
+        self._close_all(idle)
+
+    @staticmethod
+    def _close_all(idle):
+        # type: (DefaultDict[str, List[ConnectionType]]) -> None
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
 def verify_url(url):
     # type: (str) -> parse.ParseResult
     """Validates that the given URL can be used as an intake
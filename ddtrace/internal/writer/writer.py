@@ -6,10 +6,12 @@ import os
 import sys
 import threading
 from typing import TYPE_CHECKING
+from typing import Callable
 from typing import Dict
 from typing import List
 from typing import Optional
 from typing import TextIO
+import zlib
 
 import six
 
@@ -32,8 +34,7 @@ from .. import service
 from .._encoding import BufferFull
 from .._encoding import BufferItemTooLarge
 from .._encoding import EncodingValidationError
-from ..agent import get_connection
-from ..constants import _HTTPLIB_NO_TRACE_REQUEST
+from ..agent import connection_pool
 from ..encoding import JSONEncoderV2
 from ..logger import get_logger
 from ..runtime import container
@@ -49,8 +50,6 @@ if TYPE_CHECKING:  # pragma: no cover
 
     from ddtrace import Span
 
-    from .agent import ConnectionType
-
 
 log = get_logger(__name__)
 
@@ -61,6 +60,14 @@ class NoEncodableSpansError(Exception):
     pass
 
 
+# zlib window bits producing the gzip and zlib container formats
+# respectively. See https://docs.python.org/3/library/zlib.html#zlib.compressobj
+_COMPRESSION_WBITS = {
+    "gzip": 16 + zlib.MAX_WBITS,
+    "deflate": zlib.MAX_WBITS,
+}
+
+
 # The window size should be chosen so that the look-back period is
 # greater-equal to the agent API's timeout. Although most tracers have a
 # 2s timeout, the java tracer has a 10s timeout, so we set the window size
@@ -68,6 +75,19 @@ class NoEncodableSpansError(Exception):
 DEFAULT_SMA_WINDOW = 10
 
 
+def _compress(payload, content_encoding, level):
+    # type: (bytes, str, int) -> bytes
+    """Compress a payload with the given HTTP content encoding."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _COMPRESSION_WBITS[content_encoding])
+    return compressor.compress(payload) + compressor.flush()
+
+
+def _decompress(payload, content_encoding):
+    # type: (bytes, str) -> bytes
+    """Decompress a payload compressed with the given HTTP content encoding."""
+    return zlib.decompress(payload, _COMPRESSION_WBITS[content_encoding])
+
+
 def _human_size(nbytes):
     """Return a human-readable size."""
     i = 0
@@ -100,6 +120,15 @@ class TraceWriter(six.with_metaclass(abc.ABCMeta)):
         # type: () -> None
         pass
 
+    def write_deferred(self, spans, process_trace):
+        # type: (List[Span], Callable[[List[Span]], Optional[List[Span]]]) -> None
+        """Write a trace chunk that still has to go through the trace processors.
+
+        Writers that do not support background processing apply ``process_trace``
+        on the calling thread and write the result.
+        """
+        self.write(process_trace(spans))
+
 
 class LogWriter(TraceWriter):
     def __init__(
@@ -140,13 +169,15 @@ class LogWriter(TraceWriter):
         pass
 
 
-class HTTPWriter(periodic.PeriodicService, TraceWriter):
+class HTTPWriter(periodic.AwakeablePeriodicService, TraceWriter):
     """Writer to an arbitrary HTTP intake endpoint."""
 
     RETRY_ATTEMPTS = 3
     HTTP_METHOD = "PUT"
     STATSD_NAMESPACE = "tracer"
 
+    __thread_class__ = periodic.DeferredAwakeablePeriodicThread
+
     def __init__(
         self,
         intake_url,  # type: str
@@ -162,6 +193,9 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
         sync_mode=False,  # type: bool
         reuse_connections=None,  # type: Optional[bool]
         headers=None,  # type: Optional[Dict[str, str]]
+        processing_queue_size=None,  # type: Optional[int]
+        early_flush_ratio=None,  # type: Optional[float]
+        compression_level=None,  # type: Optional[int]
     ):
         # type: (...) -> None
 
@@ -182,11 +216,6 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
         self._metrics_reset()
         self._drop_sma = SimpleMovingAverage(DEFAULT_SMA_WINDOW)
         self._sync_mode = sync_mode
-        self._conn = None  # type: Optional[ConnectionType]
-        # The connection has to be locked since there exists a race between
-        # the periodic thread of HTTPWriter and other threads that might
-        # force a flush with `flush_queue()`.
-        self._conn_lck = threading.RLock()  # type: threading.RLock
 
         self._send_payload_with_backoff = fibonacci_backoff_with_jitter(  # type ignore[assignment]
             attempts=self.RETRY_ATTEMPTS,
@@ -194,10 +223,29 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
             until=lambda result: isinstance(result, Response),
         )(self._send_payload)
 
+        # The payloads are sent over the connections of the agent connection
+        # pool, unless connection reuse is explicitly disabled.
         self._reuse_connections = (
             config._trace_writer_connection_reuse if reuse_connections is None else reuse_connections
         )
 
+        # Trace chunks waiting to be processed and encoded by the writer
+        # thread. Background processing is disabled when the queue size is 0.
+        self._processing_queue_size = (
+            config._trace_writer_processing_queue_size if processing_queue_size is None else processing_queue_size
+        )
+        self._pending = []  # type: List[Tuple[List[Span], Callable[[List[Span]], Optional[List[Span]]]]]
+        self._pending_lock = threading.Lock()
+
+        # Fraction of the encoder buffer above which the writer thread is
+        # awakened to send a payload before the end of the interval.
+        self._early_flush_ratio = (
+            config._trace_writer_early_flush_ratio if early_flush_ratio is None else early_flush_ratio
+        )
+        self._compression_level = (
+            config._trace_writer_compression_level if compression_level is None else compression_level
+        )
+
     def _intake_endpoint(self, client=None):
         return "{}/{}".format(self._intake_url(client), client.ENDPOINT if client else self._endpoint)
 
@@ -249,48 +297,29 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
         if trace:
             trace[0].set_metric(KEEP_SPANS_RATE_KEY, 1.0 - self._drop_sma.get())
 
-    def _reset_connection(self):
-        # type: () -> None
-        with self._conn_lck:
-            if self._conn:
-                self._conn.close()
-                self._conn = None
-
     def _put(self, data, headers, client, no_trace):
         # type: (bytes, Dict[str, str], WriterClientBase, bool) -> Response
         sw = StopWatch()
         sw.start()
-        with self._conn_lck:
-            if self._conn is None:
-                log.debug("creating new intake connection to %s with timeout %d", self.intake_url, self._timeout)
-                self._conn = get_connection(self._intake_url(client), self._timeout)
-                setattr(self._conn, _HTTPLIB_NO_TRACE_REQUEST, no_trace)
-            try:
-                log.debug("Sending request: %s %s %s", self.HTTP_METHOD, client.ENDPOINT, headers)
-                self._conn.request(
-                    self.HTTP_METHOD,
-                    client.ENDPOINT,
-                    data,
-                    headers,
-                )
-                resp = compat.get_connection_response(self._conn)
-                log.debug("Got response: %s %s", resp.status, resp.reason)
-                t = sw.elapsed()
-                if t >= self.interval:
-                    log_level = logging.WARNING
-                else:
-                    log_level = logging.DEBUG
-                log.log(log_level, "sent %s in %.5fs to %s", _human_size(len(data)), t, self._intake_endpoint(client))
-            except Exception:
-                # Always reset the connection when an exception occurs
-                self._reset_connection()
-                raise
-            else:
-                return Response.from_http_response(resp)
-            finally:
-                # Reset the connection if reusing connections is disabled.
-                if not self._reuse_connections:
-                    self._reset_connection()
+        log.debug("Sending request: %s %s %s", self.HTTP_METHOD, client.ENDPOINT, headers)
+        resp, body = connection_pool.request(
+            self._intake_url(client),
+            self.HTTP_METHOD,
+            client.ENDPOINT,
+            data,
+            headers,
+            self._timeout,
+            no_trace=no_trace,
+            reuse=self._reuse_connections,
+        )
+        log.debug("Got response: %s %s", resp.status, resp.reason)
+        t = sw.elapsed()
+        if t >= self.interval:
+            log_level = logging.WARNING
+        else:
+            log_level = logging.DEBUG
+        log.log(log_level, "sent %s in %.5fs to %s", _human_size(len(data)), t, self._intake_endpoint(client))
+        return Response(status=resp.status, body=body, reason=resp.reason, msg=resp.msg)
 
     def _get_finalized_headers(self, count, client):
         # type: (int, WriterClientBase) -> dict
@@ -300,9 +329,29 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
             headers.update(client._headers)
         return headers
 
-    def _send_payload(self, payload, count, client):
+    def _content_encoding(self, client):
+        # type: (WriterClientBase) -> Optional[str]
+        """Return the HTTP content encoding used to compress the payloads of the client, if any."""
+        return None
+
+    def _compress_payload(self, payload, client):
+        # type: (bytes, WriterClientBase) -> bytes
+        """Compress the payload once, before it is sent and possibly retried."""
+        content_encoding = self._content_encoding(client)
+        if content_encoding is None:
+            return payload
+
+        compressed = _compress(payload, content_encoding, self._compression_level)
+        self._metrics_dist("http.compression.saved.bytes", len(payload) - len(compressed))
+        return compressed
+
+    def _send_payload(self, payload, count, client, compressed=True):
         headers = self._get_finalized_headers(count, client)
 
+        content_encoding = self._content_encoding(client) if compressed else None
+        if content_encoding is not None:
+            headers["Content-Encoding"] = content_encoding
+
         self._metrics_dist("http.requests")
 
         response = self._put(payload, headers, client, no_trace=True)
@@ -339,11 +388,48 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
         if self._sync_mode:
             self.flush_queue()
 
-    def _write_with_client(self, client, spans=None):
-        # type: (WriterClientBase, Optional[List[Span]]) -> None
-        if spans is None:
+    def write_deferred(self, spans, process_trace):
+        # type: (List[Span], Callable[[List[Span]], Optional[List[Span]]]) -> None
+        if self._sync_mode or self._processing_queue_size <= 0:
+            return super(HTTPWriter, self).write_deferred(spans, process_trace)
+
+        self._start_on_first_write()
+
+        with self._pending_lock:
+            queued = len(self._pending) < self._processing_queue_size
+            if queued:
+                self._pending.append((spans, process_trace))
+            n_pending = len(self._pending)
+
+        if queued:
+            # Queued traces are only processed when the writer flushes, so the queue counts towards the early flush
+            # threshold like the encoder buffer.
+            if self._above_early_flush_threshold(n_pending, self._processing_queue_size):
+                log.debug("trace processing queue (%d traces) above early flush threshold, awakening writer", n_pending)
+                self._flush_early()
             return
 
+        log.warning(
+            "trace processing queue (%d traces) is full, dropping trace (writer status: %s)",
+            self._processing_queue_size,
+            self.status.value,
+        )
+        self._metrics_dist("writer.accepted.traces")
+        self._metrics_dist("buffer.dropped.traces", 1, tags=("reason:queue_full",))
+
+    def _process_pending(self):
+        # type: () -> None
+        """Apply the trace processors to the queued trace chunks and encode them."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+
+        for spans, process_trace in pending:
+            processed = process_trace(spans)
+            if processed is not None:
+                self.write(processed)
+
+    def _start_on_first_write(self):
+        # type: () -> None
         if self._sync_mode is False:
             # Start the HTTPWriter on first write.
             try:
@@ -353,6 +439,13 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
             except service.ServiceStatusError:
                 pass
 
+    def _write_with_client(self, client, spans=None):
+        # type: (WriterClientBase, Optional[List[Span]]) -> None
+        if spans is None:
+            return
+
+        self._start_on_first_write()
+
         self._metrics_dist("writer.accepted.traces")
         self._set_keep_rate(spans)
 
@@ -384,8 +477,39 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
         else:
             self._metrics_dist("buffer.accepted.traces", 1)
             self._metrics_dist("buffer.accepted.spans", len(spans))
+            self._maybe_flush_early(client)
+
+    def _above_early_flush_threshold(self, size, max_size):
+        # type: (int, int) -> bool
+        if self._sync_mode or self._early_flush_ratio <= 0 or self._worker is None:
+            return False
+        if self._worker.request.is_set():
+            return False
+        return size >= max_size * self._early_flush_ratio
+
+    def _flush_early(self):
+        # type: () -> None
+        self._metrics_dist("writer.flush.early")
+        self.awake(wait=False)
+
+    def _maybe_flush_early(self, client):
+        # type: (WriterClientBase) -> None
+        """Awake the writer thread when the encoder buffer crosses the early flush threshold."""
+        encoder = client.encoder
+        # Unbounded encoders (max_size of 0) never need an early flush.
+        if not encoder.max_size or not self._above_early_flush_threshold(encoder.size, encoder.max_size):
+            return
+
+        log.debug(
+            "trace buffer (%s traces %db/%db) above early flush threshold, awakening writer",
+            len(encoder),
+            encoder.size,
+            encoder.max_size,
+        )
+        self._flush_early()
 
     def flush_queue(self, raise_exc=False):
+        self._process_pending()
         try:
             for client in self._clients:
                 self._flush_queue_with_client(client, raise_exc=raise_exc)
@@ -395,6 +519,8 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
 
     def _flush_queue_with_client(self, client, raise_exc=False):
         # type: (WriterClientBase, bool) -> None
+        sw = StopWatch()
+        sw.start()
         n_traces = len(client.encoder)
         try:
             encoded = client.encoder.encode()
@@ -411,7 +537,7 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
             return
 
         try:
-            self._send_payload_with_backoff(encoded, n_traces, client)
+            self._send_payload_with_backoff(self._compress_payload(encoded, client), n_traces, client)
         except Exception:
             self._metrics_dist("http.errors", tags=("type:err",))
             self._metrics_dist("http.dropped.bytes", len(encoded))
@@ -434,6 +560,9 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
                 # This really isn't ideal as now we're going to do a ton of socket calls.
                 self.dogstatsd.distribution("datadog.%s.http.sent.bytes" % namespace, len(encoded))
                 self.dogstatsd.distribution("datadog.%s.http.sent.traces" % namespace, n_traces)
+                self.dogstatsd.distribution("datadog.%s.http.sent.payloads" % namespace, 1)
+                self.dogstatsd.distribution("datadog.%s.writer.flush.duration" % namespace, sw.elapsed())
+                self.dogstatsd.distribution("datadog.%s.writer.drop.rate" % namespace, self._drop_sma.get())
                 for name, metric_tags in self._metrics.items():
                     for tags, count in metric_tags.items():
                         self.dogstatsd.distribution("datadog.%s.%s" % (namespace, name), count, tags=list(tags))
@@ -451,10 +580,7 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
         self.join(timeout=timeout)
 
     def on_shutdown(self):
-        try:
-            self.periodic()
-        finally:
-            self._reset_connection()
+        self.periodic()
 
 
 class AgentWriter(HTTPWriter):
@@ -486,6 +612,10 @@ class AgentWriter(HTTPWriter):
         api_version=None,  # type: Optional[str]
         reuse_connections=None,  # type: Optional[bool]
         headers=None,  # type: Optional[Dict[str, str]]
+        processing_queue_size=None,  # type: Optional[int]
+        early_flush_ratio=None,  # type: Optional[float]
+        compression=None,  # type: Optional[str]
+        compression_level=None,  # type: Optional[int]
     ):
         # type: (...) -> None
         if processing_interval is None:
@@ -510,6 +640,15 @@ class AgentWriter(HTTPWriter):
                 "please see https://github.com/DataDog/dd-trace-py/issues/4829 for more details."
             )
 
+        self._compression = config._trace_writer_compression if compression is None else (compression or None)
+        if self._compression is not None and self._compression not in _COMPRESSION_WBITS:
+            log.warning(
+                "Unsupported trace payload compression '%s'. The supported values are: %s",
+                self._compression,
+                ", ".join(sorted(_COMPRESSION_WBITS)),
+            )
+            self._compression = None
+
         buffer_size = buffer_size or config._trace_writer_buffer_size
         max_payload_size = max_payload_size or config._trace_writer_payload_size
         try:
@@ -553,6 +692,9 @@ class AgentWriter(HTTPWriter):
             sync_mode=sync_mode,
             reuse_connections=reuse_connections,
             headers=_headers,
+            processing_queue_size=processing_queue_size,
+            early_flush_ratio=early_flush_ratio,
+            compression_level=compression_level,
         )
 
     def recreate(self):
@@ -567,6 +709,10 @@ class AgentWriter(HTTPWriter):
             dogstatsd=self.dogstatsd,
             sync_mode=self._sync_mode,
             api_version=self._api_version,
+            processing_queue_size=self._processing_queue_size,
+            early_flush_ratio=self._early_flush_ratio,
+            compression=self._compression or "",
+            compression_level=self._compression_level,
         )
 
     @property
@@ -577,6 +723,12 @@ class AgentWriter(HTTPWriter):
     def _agent_endpoint(self):
         return self._intake_endpoint(client=None)
 
+    def _content_encoding(self, client):
+        # type: (WriterClientBase) -> Optional[str]
+        if client.ENDPOINT not in ("v0.4/traces", "v0.5/traces"):
+            return None
+        return self._compression
+
     def _downgrade(self, payload, response, client):
         if client.ENDPOINT == "v0.5/traces":
             self._clients = [AgentWriterClientV4(self._buffer_size, self._max_payload_size)]
@@ -596,8 +748,30 @@ class AgentWriter(HTTPWriter):
             return payload
         raise ValueError()
 
-    def _send_payload(self, payload, count, client):
-        response = super(AgentWriter, self)._send_payload(payload, count, client)
+    def _send_payload(self, payload, count, client, compressed=True):
+        content_encoding = self._content_encoding(client) if compressed else None
+        response = super(AgentWriter, self)._send_payload(payload, count, client, compressed)
+        if content_encoding is not None and response.status == 415:
+            log.warning(
+                "agent at %s does not support %s compressed trace payloads, disabling compression",
+                self.agent_url,
+                content_encoding,
+            )
+            self._compression = None
+            return self._send_payload(_decompress(payload, content_encoding), count, client)
+        if content_encoding is not None and response.status == 400:
+            # DEV: The payload might have been rejected for reasons other than
+            # its compression, so only disable the compression if the agent
+            # accepts the same payload uncompressed.
+            response = self._send_payload(_decompress(payload, content_encoding), count, client, compressed=False)
+            if response.status < 400:
+                log.warning(
+                    "agent at %s rejected a %s compressed trace payload, disabling compression",
+                    self.agent_url,
+                    content_encoding,
+                )
+                self._compression = None
+            return response
         if response.status in [404, 415]:
             log.debug("calling endpoint '%s' but received %s; downgrading API", client.ENDPOINT, response.status)
             try:
@@ -611,7 +785,7 @@ class AgentWriter(HTTPWriter):
                 )
             else:
                 if payload is not None:
-                    self._send_payload(payload, count, client)
+                    self._send_payload(payload, count, client, compressed)
         elif response.status < 400 and isinstance(self._sampler, BasePrioritySampler):
             result_traces_json = response.get_json()
             if result_traces_json and "rate_by_service" in result_traces_json:
@@ -3,6 +3,9 @@ import typing
 
 from .. import event
 
+FRAME_TABLE_MAX_SIZE: int
+
+def clear_frame_table() -> None: ...
 def traceback_to_frames(
     traceback: types.TracebackType, max_nframes: int
 ) -> typing.Tuple[typing.List[event.DDFrame], int]: ...
@@ -1,6 +1,7 @@
 from types import CodeType
 from types import FrameType
 
+from ddtrace.internal import forksafe
 from ddtrace.internal.logger import get_logger
 from ddtrace.profiling.event import DDFrame
 
@@ -8,6 +9,40 @@ from ddtrace.profiling.event import DDFrame
 log = get_logger(__name__)
 
 
+# Maximum number of frames kept in the frame table. Once it is full, new frames are still returned but not interned.
+FRAME_TABLE_MAX_SIZE = 65536
+
+# Process-wide table of the frames seen by the collectors, keyed by code object, line number and class name.
+# Samples share the interned DDFrame objects instead of building new ones each time a stack is walked. This also
+# makes samples cheaper to hash and compare when the exporter turns their stacks into pprof locations.
+# The key uses the id of the code object rather than the code object itself, as hashing a code object is expensive;
+# the entry keeps a reference to the code object so that its id cannot be reused while it is in the table.
+cdef dict _frame_table = {}
+
+
+cdef object _intern_frame(object code, object lineno, str class_name):
+    key = (id(code), lineno, class_name)
+    entry = _frame_table.get(key)
+    if entry is not None:
+        return (<tuple>entry)[1]
+
+    frame = DDFrame(code.co_filename, lineno, code.co_name, class_name)
+    if len(_frame_table) < FRAME_TABLE_MAX_SIZE:
+        _frame_table[key] = (code, frame)
+    return frame
+
+
+@forksafe.register
+def clear_frame_table():
+    # type: () -> None
+    """Remove all the interned frames.
+
+    This is done when the profiler stops and after a fork, so that the table does not keep the code objects alive
+    for the life of the process.
+    """
+    _frame_table.clear()
+
+
 cpdef _extract_class_name(frame):
     # type: (...) -> str
     """Extract class name from a frame, if possible.
@@ -16,6 +51,9 @@ cpdef _extract_class_name(frame):
     """
     if frame.f_code.co_varnames:
         argname = frame.f_code.co_varnames[0]
+        # Only look at the locals when they can give a class name: building f_locals is expensive
+        if argname != "self" and argname != "cls":
+            return ""
         try:
             value = frame.f_locals[argname]
         except KeyError:
@@ -23,8 +61,7 @@ cpdef _extract_class_name(frame):
         try:
             if argname == "self":
                 return object.__getattribute__(type(value), "__name__")  # use type() and object.__getattribute__ to avoid side-effects
-            if argname == "cls":
-                return object.__getattribute__(value, "__name__")
+            return object.__getattribute__(value, "__name__")
         except AttributeError:
             return ""
     return ""
@@ -45,9 +82,10 @@ cpdef traceback_to_frames(traceback, max_nframes):
             frame = tb.tb_frame
             code = frame.f_code
             lineno = 0 if frame.f_lineno is None else frame.f_lineno
-            frames.insert(0, DDFrame(code.co_filename, lineno, code.co_name, _extract_class_name(frame)))
+            frames.append(_intern_frame(code, lineno, _extract_class_name(frame)))
         nframes += 1
         tb = tb.tb_next
+    frames.reverse()
     return frames, nframes
 
 
@@ -89,7 +127,7 @@ cpdef pyframe_to_frames(frame, max_nframes):
                     return [], 0
 
             lineno = 0 if frame.f_lineno is None else frame.f_lineno
-            frames.append(DDFrame(code.co_filename, lineno, code.co_name, _extract_class_name(frame)))
+            frames.append(_intern_frame(code, lineno, _extract_class_name(frame)))
         nframes += 1
         frame = frame.f_back
     return frames, nframes
@@ -127,11 +127,25 @@ StackEventGroupKey: Any
 LockEventGroupKey: Any
 StackExceptionEventGroupKey: Any
 
+class PprofAggregator:
+    @property
+    def period(self) -> typing.Optional[int]: ...
+    @staticmethod
+    def group_events(events: typing.Sequence[Any]) -> typing.Optional[typing.Tuple[Any, Any, Any]]: ...
+    def add_grouped_events(self, grouped_events: typing.Optional[typing.Tuple[Any, Any, Any]]) -> None: ...
+    def push_events(self, events: typing.Sequence[Any]) -> None: ...
+    @classmethod
+    def from_events(cls, events: recorder.EventsType) -> PprofAggregator: ...
+    def __reduce__(self) -> typing.Tuple[Any, typing.Tuple[Any, ...]]: ...
+    def __init__(self) -> None: ...
+
 class PprofExporter(exporter.Exporter):
+    enable_code_provenance: bool
+    program_name: typing.Optional[str]
     def export(
-        self, events: recorder.EventsType, start_time_ns: int, end_time_ns: int
+        self, events: typing.Union[recorder.EventsType, PprofAggregator], start_time_ns: int, end_time_ns: int
     ) -> typing.Tuple[pprof_ProfileType, typing.List[Package]]: ...
-    def __init__(self) -> None: ...
+    def __init__(self, enable_code_provenance: bool = ..., program_name: typing.Optional[str] = ...) -> None: ...
     def __lt__(self, other: Any) -> Any: ...
     def __le__(self, other: Any) -> Any: ...
     def __gt__(self, other: Any) -> Any: ...
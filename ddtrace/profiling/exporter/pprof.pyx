@@ -164,29 +164,37 @@ _Location_Key_T = typing.Tuple[typing.Tuple[int, ...], _Label_List_T]
 
 
 HashableStackTraceType = typing.Tuple[event.DDFrame, ...]
+_Stack_Key_T = typing.Tuple[HashableStackTraceType, int]
 
 
 @attr.s
 class _PprofConverter(object):
     """Convert stacks generated by a Profiler to pprof format."""
 
-    # Those attributes will be serialize in a `pprof_pb2.Profile`
-    _functions = attr.ib(
-        init=False, factory=dict, type=typing.Dict[typing.Tuple[str, typing.Optional[str]], pprof_FunctionType]
+    # Those attributes will be serialize in a `pprof_pb2.Profile`.
+    # Functions and locations are only turned into protobuf objects when the profile is built, so that the converter
+    # only holds plain Python data until then.
+    # A dict of {(filename, funcname): function id}
+    _functions = attr.ib(init=False, factory=dict, type=typing.Dict[typing.Tuple[str, str], int])
+    # A dict of {(filename, lineno, funcname): (location id, function id)}
+    _locations = attr.ib(
+        init=False, factory=dict, type=typing.Dict[typing.Tuple[str, int, str], typing.Tuple[int, int]]
     )
-    _locations = attr.ib(init=False, factory=dict, type=typing.Dict[typing.Tuple[str, int, str], pprof_LocationType])
     _string_table = attr.ib(init=False, factory=_StringTable)
 
     _last_location_id = attr.ib(init=False, factory=lambda: itertools.count(1))
     _last_func_id = attr.ib(init=False, factory=lambda: itertools.count(1))
 
+    # The interned location ids of each (frames, nframes) stack seen so far
+    _stacks = attr.ib(init=False, factory=dict, repr=False, type=typing.Dict[_Stack_Key_T, typing.Tuple[int, ...]])
+
     # A dict where key is a (Location, [Labels]) and value is a a dict.
     # This dict has sample-type (e.g. "cpu-time") as key and the numeric value.
     _location_values = attr.ib(
-        factory=lambda: collections.defaultdict(lambda: collections.defaultdict(lambda: 0)),
+        factory=lambda: collections.defaultdict(collections.Counter),
         init=False,
         repr=False,
-        type=typing.DefaultDict[_Location_Key_T, typing.DefaultDict[str, int]],
+        type=typing.DefaultDict[_Location_Key_T, typing.Counter[str]],
     )
 
     def _to_Function(
@@ -194,21 +202,13 @@ class _PprofConverter(object):
         filename,  # type: str
         funcname,  # type: str
     ):
-        # type: (...) -> pprof_FunctionType
-        # filename/funcname are "guaranteed" to be str, but on 3.11 and later
-        # they may (erroneously?) be bytes.  Try to fix this.
-        filename = sanitize_string(filename)
-        funcname = sanitize_string(funcname)
+        # type: (...) -> int
+        """Return the id of a function."""
         try:
             return self._functions[(filename, funcname)]
         except KeyError:
-            func = pprof_pb2.Function(
-                id=next(self._last_func_id),
-                name=self._str(funcname),
-                filename=self._str(filename),
-            )
-            self._functions[(filename, funcname)] = func
-            return func
+            func_id = self._functions[(filename, funcname)] = next(self._last_func_id)
+            return func_id
 
     def _to_Location(
         self,
@@ -216,25 +216,18 @@ class _PprofConverter(object):
         lineno,  # type: int
         funcname,  # type: str
     ):
-        # type: (...) -> pprof_LocationType
+        # type: (...) -> int
+        """Return the id of a location."""
         # filename/funcname are "guaranteed" to be str, but on 3.11 and later
         # they may (erroneously?) be bytes.  Try to fix this.
         filename = sanitize_string(filename)
         funcname = sanitize_string(funcname)
         try:
-            return self._locations[(filename, lineno, funcname)]
+            return self._locations[(filename, lineno, funcname)][0]
         except KeyError:
-            location = pprof_pb2.Location(
-                id=next(self._last_location_id),
-                line=[
-                    pprof_pb2.Line(
-                        function_id=self._to_Function(filename, funcname).id,
-                        line=lineno,
-                    ),
-                ],
-            )
-            self._locations[(filename, lineno, funcname)] = location
-            return location
+            location_id = next(self._last_location_id)
+            self._locations[(filename, lineno, funcname)] = (location_id, self._to_Function(filename, funcname))
+            return location_id
 
     def _str(self, string: typing.Optional[str]) -> int:
         """Convert a string to an id from the string table."""
@@ -246,17 +239,24 @@ class _PprofConverter(object):
         nframes,  # type: int
     ):
         # type: (...) -> typing.Tuple[int, ...]
+        stack_key = (frames, nframes)
+        try:
+            return self._stacks[stack_key]
+        except KeyError:
+            pass
+
         locations = [
-            self._to_Location(filename, lineno, funcname).id for filename, lineno, funcname, class_name in frames
+            self._to_Location(filename, lineno, funcname) for filename, lineno, funcname, class_name in frames
         ]
 
         omitted = nframes - len(frames)
         if omitted:
             locations.append(
-                self._to_Location("", 0, "<%d frame%s omitted>" % (omitted, ("s" if omitted > 1 else ""))).id
+                self._to_Location("", 0, "<%d frame%s omitted>" % (omitted, ("s" if omitted > 1 else "")))
             )
 
-        return tuple(locations)
+        stack = self._stacks[stack_key] = tuple(locations)
+        return stack
 
     def convert_stack_event(
         self,
@@ -290,9 +290,10 @@ class _PprofConverter(object):
             ),
         )
 
-        self._location_values[location_key]["cpu-samples"] = len(samples)
-        self._location_values[location_key]["cpu-time"] = sum(s.cpu_time_ns for s in samples)
-        self._location_values[location_key]["wall-time"] = sum(s.wall_time_ns for s in samples)
+        values = self._location_values[location_key]
+        values["cpu-samples"] += len(samples)
+        values["cpu-time"] += sum(s.cpu_time_ns for s in samples)
+        values["wall-time"] += sum(s.wall_time_ns for s in samples)
 
     def convert_memalloc_event(
         self,
@@ -313,12 +314,9 @@ class _PprofConverter(object):
             ),
         )
 
-        self._location_values[location_key]["alloc-samples"] = round(
-            sum(event.nevents * (event.capture_pct / 100.0) for event in events)
-        )
-        self._location_values[location_key]["alloc-space"] = round(
-            sum(event.size / event.capture_pct * 100.0 for event in events)
-        )
+        values = self._location_values[location_key]
+        values["alloc-samples"] += round(sum(event.nevents * (event.capture_pct / 100.0) for event in events))
+        values["alloc-space"] += round(sum(event.size / event.capture_pct * 100.0 for event in events))
 
     def convert_memalloc_heap_event(self, event: memalloc.MemoryHeapSampleEvent) -> None:
         location_key = (
@@ -365,10 +363,9 @@ class _PprofConverter(object):
             ),
         )
 
-        self._location_values[location_key]["lock-acquire"] = len(events)
-        self._location_values[location_key]["lock-acquire-wait"] = int(
-            sum(e.wait_time_ns for e in events) / sampling_ratio
-        )
+        values = self._location_values[location_key]
+        values["lock-acquire"] += len(events)
+        values["lock-acquire-wait"] += int(sum(e.wait_time_ns for e in events) / sampling_ratio)
 
     def convert_lock_release_event(
         self,
@@ -403,10 +400,9 @@ class _PprofConverter(object):
             ),
         )
 
-        self._location_values[location_key]["lock-release"] = len(events)
-        self._location_values[location_key]["lock-release-hold"] = int(
-            sum(e.locked_for_ns for e in events) / sampling_ratio
-        )
+        values = self._location_values[location_key]
+        values["lock-release"] += len(events)
+        values["lock-release-hold"] += int(sum(e.locked_for_ns for e in events) / sampling_ratio)
 
     def convert_stack_exception_event(
         self,
@@ -437,7 +433,7 @@ class _PprofConverter(object):
             ),
         )
 
-        self._location_values[location_key]["exception-samples"] = len(events)
+        self._location_values[location_key]["exception-samples"] += len(events)
 
     def _build_libraries(self) -> typing.List[Package]:
         return [
@@ -484,6 +480,18 @@ class _PprofConverter(object):
 
         period_type = pprof_pb2.ValueType(type=self._str("time"), unit=self._str("nanoseconds"))
 
+        functions = [
+            pprof_pb2.Function(id=func_id, name=self._str(funcname), filename=self._str(filename))
+            for (filename, funcname), func_id in self._functions.items()
+        ]
+
+        locations = [
+            pprof_pb2.Location(id=location_id, line=[pprof_pb2.Line(function_id=func_id, line=lineno)])
+            for (filename, lineno, funcname), (location_id, func_id) in self._locations.items()
+        ]
+
+        mapping_filename = self._str(program_name)
+
         # WARNING: no code should use _str() here as once the _string_table is serialized below,
         # it won't be updated if you call _str later in the code here
         return pprof_pb2.Profile(
@@ -492,11 +500,11 @@ class _PprofConverter(object):
             mapping=[
                 pprof_pb2.Mapping(
                     id=1,
-                    filename=self._str(program_name),
+                    filename=mapping_filename,
                 ),
             ],
-            location=self._locations.values(),
-            function=self._functions.values(),
+            location=locations,
+            function=functions,
             string_table=self._string_table,
             time_nanos=start_time_ns,
             duration_nanos=duration_ns,
@@ -559,158 +567,156 @@ StackExceptionEventGroupKey = typing.NamedTuple(
 )
 
 
-@attr.s
-class PprofExporter(exporter.Exporter):
-    """Export recorder events to pprof format."""
+def _get_event_trace_resource(event: event.StackBasedEvent) -> str:
+    trace_resource = ""
+    # Do not export trace_resource for non Web spans for privacy concerns.
+    if event.trace_resource_container and event.trace_type == ext.SpanTypes.WEB:
+        (trace_resource,) = event.trace_resource_container
+    return ensure_str(trace_resource, errors="backslashreplace")
+
+
+def _stack_event_group_key(event: event.StackBasedEvent) -> StackEventGroupKey:
+    return StackEventGroupKey(
+        _none_to_str(event.thread_id),
+        _none_to_str(event.thread_native_id),
+        _get_thread_name(event.thread_id, event.thread_name),
+        _none_to_str(event.task_id),
+        _none_to_str(event.task_name),
+        _none_to_str(event.local_root_span_id),
+        _none_to_str(event.span_id),
+        _get_event_trace_resource(event),
+        _none_to_str(event.trace_type),
+        # TODO: store this as a tuple directly?
+        tuple(event.frames),
+        event.nframes,
+    )
 
-    enable_code_provenance = attr.ib(default=True, type=bool)
 
-    def _stack_event_group_key(self, event: event.StackBasedEvent) -> StackEventGroupKey:
-        return StackEventGroupKey(
-            _none_to_str(event.thread_id),
-            _none_to_str(event.thread_native_id),
-            _get_thread_name(event.thread_id, event.thread_name),
-            _none_to_str(event.task_id),
-            _none_to_str(event.task_name),
-            _none_to_str(event.local_root_span_id),
-            _none_to_str(event.span_id),
-            self._get_event_trace_resource(event),
-            _none_to_str(event.trace_type),
-            # TODO: store this as a tuple directly?
-            tuple(event.frames),
-            event.nframes,
-        )
+def _lock_event_group_key(event: _lock.LockEventBase) -> LockEventGroupKey:
+    return LockEventGroupKey(
+        _none_to_str(event.lock_name),
+        _none_to_str(event.thread_id),
+        _get_thread_name(event.thread_id, event.thread_name),
+        _none_to_str(event.task_id),
+        _none_to_str(event.task_name),
+        _none_to_str(event.local_root_span_id),
+        _none_to_str(event.span_id),
+        _get_event_trace_resource(event),
+        _none_to_str(event.trace_type),
+        tuple(event.frames),
+        event.nframes,
+    )
 
-    def _group_stack_events(
-        self, events: typing.Iterable[event.StackBasedEvent]
-    ) -> typing.Iterator[typing.Tuple[StackEventGroupKey, typing.Iterator[event.StackBasedEvent]]]:
-        return groupby(events, self._stack_event_group_key)
 
-    def _lock_event_group_key(
-        self,
-        event: _lock.LockEventBase,
-    ) -> LockEventGroupKey:
-        return LockEventGroupKey(
-            _none_to_str(event.lock_name),
-            _none_to_str(event.thread_id),
-            _get_thread_name(event.thread_id, event.thread_name),
-            _none_to_str(event.task_id),
-            _none_to_str(event.task_name),
-            _none_to_str(event.local_root_span_id),
-            _none_to_str(event.span_id),
-            self._get_event_trace_resource(event),
-            _none_to_str(event.trace_type),
-            tuple(event.frames),
-            event.nframes,
-        )
+def _stack_exception_group_key(event: stack_event.StackExceptionSampleEvent) -> StackExceptionEventGroupKey:
+    exc_type = event.exc_type
+    exc_type_name = exc_type.__module__ + "." + exc_type.__name__
+
+    return StackExceptionEventGroupKey(
+        _none_to_str(event.thread_id),
+        _none_to_str(event.thread_native_id),
+        _get_thread_name(event.thread_id, event.thread_name),
+        _none_to_str(event.local_root_span_id),
+        _none_to_str(event.span_id),
+        _get_event_trace_resource(event),
+        _none_to_str(event.trace_type),
+        tuple(event.frames),
+        event.nframes,
+        exc_type_name,
+    )
 
-    def _group_lock_events(
-        self, events: typing.Iterable[_lock.LockEventBase]
-    ) -> typing.Iterator[typing.Tuple[LockEventGroupKey, typing.Iterator[_lock.LockEventBase]]]:
-        return groupby(events, self._lock_event_group_key)
-
-    def _stack_exception_group_key(self, event: stack_event.StackExceptionSampleEvent) -> StackExceptionEventGroupKey:
-        exc_type = event.exc_type
-        exc_type_name = exc_type.__module__ + "." + exc_type.__name__
-
-        return StackExceptionEventGroupKey(
-            _none_to_str(event.thread_id),
-            _none_to_str(event.thread_native_id),
-            _get_thread_name(event.thread_id, event.thread_name),
-            _none_to_str(event.local_root_span_id),
-            _none_to_str(event.span_id),
-            self._get_event_trace_resource(event),
-            _none_to_str(event.trace_type),
-            tuple(event.frames),
-            event.nframes,
-            exc_type_name,
-        )
 
-    def _group_stack_exception_events(
-        self, events: typing.Iterable[stack_event.StackExceptionSampleEvent]
-    ) -> typing.Iterator[
-        typing.Tuple[StackExceptionEventGroupKey, typing.Iterator[stack_event.StackExceptionSampleEvent]]
-    ]:
-        return groupby(events, self._stack_exception_group_key)
+_LOCK_EVENT_CONVERTERS = {
+    _lock.LockAcquireEvent: "convert_lock_acquire_event",
+    _lock.LockReleaseEvent: "convert_lock_release_event",
+    threading.ThreadingLockAcquireEvent: "convert_lock_acquire_event",
+    threading.ThreadingLockReleaseEvent: "convert_lock_release_event",
+}
+
+
+# The event types supported by the exporter, in the order they are converted
+_EVENT_TYPES = (
+    stack_event.StackSampleEvent,
+    _lock.LockAcquireEvent,
+    _lock.LockReleaseEvent,
+    threading.ThreadingLockAcquireEvent,
+    threading.ThreadingLockReleaseEvent,
+    stack_event.StackExceptionSampleEvent,
+    memalloc.MemoryAllocSampleEvent,
+    memalloc.MemoryHeapSampleEvent,
+)
 
-    def _get_event_trace_resource(self, event: event.StackBasedEvent) -> str:
-        trace_resource = ""
-        # Do not export trace_resource for non Web spans for privacy concerns.
-        if event.trace_resource_container and event.trace_type == ext.SpanTypes.WEB:
-            (trace_resource,) = event.trace_resource_container
-        return ensure_str(trace_resource, errors="backslashreplace")
 
-    def export(
-        self, events: recorder.EventsType, start_time_ns: int, end_time_ns: int
-    ) -> typing.Tuple[pprof_ProfileType, typing.List[Package]]:
-        """Convert events to pprof format.
+_GroupedEvents_T = typing.Tuple[typing.Type[event.Event], typing.Any, typing.Any]
 
-        :param events: The event dictionary from a `ddtrace.profiling.recorder.Recorder`.
-        :param start_time_ns: The start time of recording.
-        :param end_time_ns: The end time of recording.
-        :return: A protobuf Profile object.
+
+@attr.s
+class PprofAggregator(object):
+    """Aggregate events into pprof samples as they are recorded.
+
+    Each batch of events is folded into the samples of a single profile, indexed by interned stacks and labels. The
+    memory used is therefore bounded by the number of distinct stacks rather than by the number of events, and
+    exporting the aggregate only needs to serialize it.
+    """
+
+    _converter = attr.ib(init=False, factory=_PprofConverter, repr=False)
+    _sum_period = attr.ib(init=False, default=0)
+    _nb_event = attr.ib(init=False, default=0)
+
+    @property
+    def period(self) -> typing.Optional[int]:
+        """The average sampling period of the stack events, if any."""
+        if self._nb_event:
+            return int(self._sum_period / self._nb_event)
+        return None
+
+    @staticmethod
+    def group_events(events: typing.Sequence[event.Event]) -> typing.Optional[_GroupedEvents_T]:
+        """Group a batch of events of the same type by sample.
+
+        This does not modify the aggregate, so it can be done before acquiring any lock protecting it.
+
+        :param events: The events to group. They MUST all be of the same type.
+        :return: The grouped events to pass to `add_grouped_events`, or ``None`` if the events are not supported.
         """
-        program_name = config.get_application_name() or "<unknown program>"
+        if not events:
+            return None
 
-        sum_period = 0
-        nb_event = 0
+        event_type = events[0].__class__
 
-        converter = _PprofConverter()
+        if event_type is stack_event.StackSampleEvent:
+            return event_type, groupby(events, _stack_event_group_key), sum(e.sampling_period for e in events)
 
-        # Handle StackSampleEvent
-        stack_events = []
-        for event in events.get(stack_event.StackSampleEvent, []):  # type: ignore[call-overload]
-            stack_events.append(event)
-            sum_period += event.sampling_period
-            nb_event += 1
+        if event_type in _LOCK_EVENT_CONVERTERS:
+            sampling_ratio_avg = sum(e.sampling_pct for e in events) / (len(events) * 100.0)
+            return event_type, groupby(events, _lock_event_group_key), sampling_ratio_avg
 
-        for (
-            (
-                thread_id,
-                thread_native_id,
-                thread_name,
-                task_id,
-                task_name,
-                local_root_span_id,
-                span_id,
-                trace_resource,
-                trace_type,
-                frames,
-                nframes,
-            ),
-            grouped_stack_events,
-        ) in self._group_stack_events(stack_events):
-            converter.convert_stack_event(
-                thread_id,
-                thread_native_id,
-                thread_name,
-                task_id,
-                task_name,
-                local_root_span_id,
-                span_id,
-                trace_resource,
-                trace_type,
-                frames,
-                nframes,
-                list(typing.cast(typing.Iterator[stack_event.StackSampleEvent], grouped_stack_events)),
-            )
+        if event_type is stack_event.StackExceptionSampleEvent:
+            return event_type, groupby(events, _stack_exception_group_key), None
 
-        # Handle Lock events
-        for event_class, convert_fn in (
-            (_lock.LockAcquireEvent, converter.convert_lock_acquire_event),
-            (_lock.LockReleaseEvent, converter.convert_lock_release_event),
-            (threading.ThreadingLockAcquireEvent, converter.convert_lock_acquire_event),
-            (threading.ThreadingLockReleaseEvent, converter.convert_lock_release_event),
-        ):
-            lock_events = events.get(event_class, [])  # type: ignore[call-overload]
-            sampling_sum_pct = sum(event.sampling_pct for event in lock_events)
+        if memalloc._memalloc:
+            if event_type is memalloc.MemoryAllocSampleEvent:
+                return event_type, groupby(events, _stack_event_group_key), None
 
-            if lock_events:
-                sampling_ratio_avg = sampling_sum_pct / (len(lock_events) * 100.0)
+            if event_type is memalloc.MemoryHeapSampleEvent:
+                return event_type, events, None
 
-                for (
-                    lock_name,
+        return None
+
+    def add_grouped_events(self, grouped_events: typing.Optional[_GroupedEvents_T]) -> None:
+        """Fold events grouped by `group_events` into the aggregate."""
+        if grouped_events is None:
+            return
+
+        event_type, groups, extra = grouped_events
+        converter = self._converter
+
+        if event_type is stack_event.StackSampleEvent:
+            nb_event = 0
+            for (
+                (
                     thread_id,
+                    thread_native_id,
                     thread_name,
                     task_id,
                     task_name,
@@ -720,55 +726,89 @@ class PprofExporter(exporter.Exporter):
                     trace_type,
                     frames,
                     nframes,
-                ), l_events in self._group_lock_events(lock_events):
-                    convert_fn(  # type: ignore[operator]
-                        lock_name,
-                        thread_id,
-                        thread_name,
-                        task_id,
-                        task_name,
-                        local_root_span_id,
-                        span_id,
-                        trace_resource,
-                        trace_type,
-                        frames,
-                        nframes,
-                        list(l_events),
-                        sampling_ratio_avg,
-                    )
+                ),
+                grouped_stack_events,
+            ) in groups:
+                converter.convert_stack_event(
+                    thread_id,
+                    thread_native_id,
+                    thread_name,
+                    task_id,
+                    task_name,
+                    local_root_span_id,
+                    span_id,
+                    trace_resource,
+                    trace_type,
+                    frames,
+                    nframes,
+                    grouped_stack_events,
+                )
+                nb_event += len(grouped_stack_events)
+            self._sum_period += extra
+            self._nb_event += nb_event
 
-        for (
-            (
-                thread_id,
-                thread_native_id,
-                thread_name,
-                local_root_span_id,
-                span_id,
-                trace_resource,
-                trace_type,
-                frames,
-                nframes,
-                exc_type_name,
-            ),
-            se_events,
-        ) in self._group_stack_exception_events(
-            events.get(stack_event.StackExceptionSampleEvent, [])  # type: ignore[call-overload]
-        ):
-            converter.convert_stack_exception_event(
+        elif event_type in _LOCK_EVENT_CONVERTERS:
+            convert_fn = getattr(converter, _LOCK_EVENT_CONVERTERS[event_type])
+            for (
+                lock_name,
                 thread_id,
-                thread_native_id,
                 thread_name,
+                task_id,
+                task_name,
                 local_root_span_id,
                 span_id,
                 trace_resource,
                 trace_type,
                 frames,
                 nframes,
-                exc_type_name,
-                list(typing.cast(typing.Iterator[stack_event.StackExceptionSampleEvent], se_events)),
-            )
+            ), l_events in groups:
+                convert_fn(
+                    lock_name,
+                    thread_id,
+                    thread_name,
+                    task_id,
+                    task_name,
+                    local_root_span_id,
+                    span_id,
+                    trace_resource,
+                    trace_type,
+                    frames,
+                    nframes,
+                    l_events,
+                    extra,
+                )
 
-        if memalloc._memalloc:
+        elif event_type is stack_event.StackExceptionSampleEvent:
+            for (
+                (
+                    thread_id,
+                    thread_native_id,
+                    thread_name,
+                    local_root_span_id,
+                    span_id,
+                    trace_resource,
+                    trace_type,
+                    frames,
+                    nframes,
+                    exc_type_name,
+                ),
+                se_events,
+            ) in groups:
+                converter.convert_stack_exception_event(
+                    thread_id,
+                    thread_native_id,
+                    thread_name,
+                    local_root_span_id,
+                    span_id,
+                    trace_resource,
+                    trace_type,
+                    frames,
+                    nframes,
+                    exc_type_name,
+                    se_events,
+                )
+
+        elif event_type is memalloc.MemoryAllocSampleEvent:
             for (
                 (
                     thread_id,
@@ -784,25 +824,93 @@ class PprofExporter(exporter.Exporter):
                     nframes,
                 ),
                 memalloc_events,
-            ) in self._group_stack_events(
-                events.get(memalloc.MemoryAllocSampleEvent, [])  # type: ignore[call-overload]
-            ):
+            ) in groups:
                 converter.convert_memalloc_event(
                     thread_id,
                     thread_native_id,
                     thread_name,
                     frames,
                     nframes,
-                    list(typing.cast(typing.Iterator[memalloc.MemoryAllocSampleEvent], memalloc_events)),
+                    memalloc_events,
                 )
 
-            for event in events.get(memalloc.MemoryHeapSampleEvent, []):  # type: ignore[call-overload]
+        elif event_type is memalloc.MemoryHeapSampleEvent:
+            for event in groups:
                 converter.convert_memalloc_heap_event(event)
 
-        # Compute some metadata
-        period = None  # type: typing.Optional[int]
-        if nb_event:
-            period = int(sum_period / nb_event)
+    def push_events(self, events: typing.Sequence[event.Event]) -> None:
+        """Fold a batch of events of the same type into the aggregate."""
+        self.add_grouped_events(self.group_events(events))
+
+    def __reduce__(self):
+        # Only pickle the plain Python data of the aggregate, e.g. to hand it over to another process that builds and
+        # exports the profile.
+        converter = self._converter
+        return (
+            _restore_aggregator,
+            (
+                converter._functions,
+                converter._locations,
+                converter._location_values,
+                self._sum_period,
+                self._nb_event,
+            ),
+        )
+
+    @classmethod
+    def from_events(cls, events: recorder.EventsType) -> "PprofAggregator":
+        """Aggregate the events recorded by a `ddtrace.profiling.recorder.Recorder`."""
+        aggregator = cls()
+        for event_type in _EVENT_TYPES:
+            type_events = events.get(event_type)  # type: ignore[call-overload]
+            if type_events:
+                aggregator.push_events(list(type_events))
+        return aggregator
+
+
+def _restore_aggregator(functions, locations, location_values, sum_period, nb_event):
+    aggregator = PprofAggregator()
+    converter = aggregator._converter
+    converter._functions = functions
+    converter._locations = locations
+    converter._location_values = location_values
+    converter._last_func_id = itertools.count(len(functions) + 1)
+    converter._last_location_id = itertools.count(len(locations) + 1)
+    aggregator._sum_period = sum_period
+    aggregator._nb_event = nb_event
+    return aggregator
+
+
+@attr.s
+class PprofExporter(exporter.Exporter):
+    """Export recorder events to pprof format."""
+
+    enable_code_provenance = attr.ib(default=True, type=bool)
+    # Defaults to the name of the running application
+    program_name = attr.ib(default=None, type=typing.Optional[str])
+
+    def export(
+        self,
+        events: typing.Union[recorder.EventsType, PprofAggregator],
+        start_time_ns: int,
+        end_time_ns: int,
+    ) -> typing.Tuple[pprof_ProfileType, typing.List[Package]]:
+        """Convert events to pprof format.
+
+        :param events: The event dictionary from a `ddtrace.profiling.recorder.Recorder`, or the `PprofAggregator`
+            from a `ddtrace.profiling.recorder.AggregatingRecorder`.
+        :param start_time_ns: The start time of recording.
+        :param end_time_ns: The end time of recording.
+        :return: A protobuf Profile object.
+        """
+        program_name = self.program_name or config.get_application_name() or "<unknown program>"
+
+        if isinstance(events, PprofAggregator):
+            aggregator = events
+        else:
+            aggregator = PprofAggregator.from_events(events)
+
+        converter = aggregator._converter
 
         duration_ns = end_time_ns - start_time_ns
 
@@ -823,7 +931,7 @@ class PprofExporter(exporter.Exporter):
         profile = converter._build_profile(
             start_time_ns=start_time_ns,
             duration_ns=duration_ns,
-            period=period,
+            period=aggregator.period,
             sample_types=sample_types,
             program_name=program_name,
         )
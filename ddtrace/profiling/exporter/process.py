@@ -0,0 +1,254 @@
+# -*- encoding: utf-8 -*-
+"""Export profiles from a helper subprocess.
+
+The profiled process only aggregates the recorded events into a `ddtrace.profiling.exporter.pprof.PprofAggregator`
+and sends its plain data over a pipe to a helper interpreter, which builds, encodes and uploads the profile with a
+`ddtrace.profiling.exporter.http.PprofHTTPExporter`.
+"""
+import os
+import pickle
+import struct
+import subprocess  # nosec
+import sys
+import typing
+
+import attr
+
+from ddtrace.internal import forksafe
+from ddtrace.internal import runtime
+from ddtrace.internal.logger import get_logger
+from ddtrace.internal.processor.endpoint_call_counter import EndpointCallCounterProcessor
+from ddtrace.internal.utils.config import get_application_name
+from ddtrace.profiling import exporter
+from ddtrace.profiling.exporter import http
+from ddtrace.profiling.exporter import pprof
+
+from .. import recorder
+
+
+LOG = get_logger(__name__)
+
+_FRAME_HEADER = struct.Struct("!I")
+
+_DDTRACE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+_BOOTSTRAP_DIR = os.path.join(_DDTRACE_ROOT, "ddtrace", "bootstrap")
+
+
+def _write_frame(stream, obj):
+    # type: (typing.IO[bytes], typing.Any) -> None
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    stream.write(_FRAME_HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def _read_frame(stream):
+    # type: (typing.IO[bytes]) -> typing.Any
+    header = stream.read(_FRAME_HEADER.size)
+    if len(header) < _FRAME_HEADER.size:
+        raise EOFError
+    (size,) = _FRAME_HEADER.unpack(header)
+    data = stream.read(size)
+    if len(data) < size:
+        raise EOFError
+    return pickle.loads(data)  # nosec
+
+
+def _worker_env():
+    # type: () -> typing.Dict[str, str]
+    env = os.environ.copy()
+    # The helper must not profile, trace or report itself: it only uploads the profiles of its parent.
+    env["DD_PROFILING_ENABLED"] = "false"
+    env["DD_INSTRUMENTATION_TELEMETRY_ENABLED"] = "false"
+    env["DD_REMOTE_CONFIGURATION_ENABLED"] = "false"
+    # Do not let ddtrace-run auto-instrument the helper through sitecustomize
+    python_path = [p for p in env.get("PYTHONPATH", "").split(os.pathsep) if p and os.path.abspath(p) != _BOOTSTRAP_DIR]
+    env["PYTHONPATH"] = os.pathsep.join([_DDTRACE_ROOT] + python_path)
+    return env
+
+
+def _is_python_executable(executable):
+    # type: (typing.Optional[str]) -> bool
+    # sys.executable can be empty or point to an embedding application (e.g. uWSGI) rather than to an interpreter.
+    return bool(executable) and os.path.basename(executable).startswith(("python", "pypy"))  # type: ignore[union-attr]
+
+
+@attr.s
+class PprofProcessExporter(exporter.Exporter):
+    """Export profiles from a helper subprocess.
+
+    The events are aggregated in the profiled process and the aggregate is sent to a helper process that builds and
+    uploads the profile. If the helper process cannot be used, the profile is exported in-process.
+    """
+
+    exporter = attr.ib(type=http.PprofHTTPExporter)
+    _process = attr.ib(init=False, default=None, repr=False)
+    _disabled = attr.ib(init=False, default=False, repr=False, type=bool)
+
+    def __attrs_post_init__(self):
+        # Make sure the helper process knows the name of the profiled application
+        if self.exporter.program_name is None:
+            self.exporter.program_name = get_application_name()
+        forksafe.register(self._after_fork)
+
+    def _after_fork(self):
+        # type: () -> None
+        # The helper process belongs to the parent: the child starts its own when it needs one.
+        process, self._process = self._process, None
+        if process is None or process.stdin is None:
+            return
+        # Release the write end of the pipe inherited from the parent, otherwise the helper never sees the end of its
+        # input while the child is running. The descriptor is pointed at /dev/null rather than closed: the file object
+        # may hold data buffered by a thread of the parent, which must not reach the pipe when it is flushed.
+        try:
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            try:
+                os.dup2(devnull, process.stdin.fileno())
+            finally:
+                os.close(devnull)
+        except (OSError, ValueError):
+            LOG.debug("Unable to release the profile exporter process pipe", exc_info=True)
+
+    def _exporter_config(self):
+        # type: () -> typing.Dict[str, typing.Any]
+        exp = self.exporter
+        return dict(
+            service=exp.service,
+            env=exp.env,
+            version=exp.version,
+            tags=exp.tags,
+            api_key=exp.api_key,
+            endpoint=exp.endpoint,
+            endpoint_path=exp.endpoint_path,
+            timeout=exp.timeout,
+            max_retry_delay=exp.max_retry_delay,
+            enable_code_provenance=exp.enable_code_provenance,
+            program_name=exp.program_name,
+        )
+
+    def _start_process(self):
+        # type: () -> typing.Optional[subprocess.Popen]
+        if not _is_python_executable(sys.executable):
+            LOG.debug("Cannot find a Python interpreter to start the profile exporter process, exporting in-process")
+            self._disabled = True
+            return None
+
+        try:
+            process = subprocess.Popen(  # nosec
+                [sys.executable, "-m", "ddtrace.profiling.exporter.process"],
+                stdin=subprocess.PIPE,
+                env=_worker_env(),
+                close_fds=True,
+            )
+            _write_frame(process.stdin, self._exporter_config())
+        except (OSError, ValueError):
+            LOG.warning("Unable to start the profile exporter process, exporting in-process", exc_info=True)
+            self._disabled = True
+            return None
+
+        self._process = process
+        return process
+
+    def _send(self, job):
+        # type: (typing.Tuple[typing.Any, ...]) -> bool
+        # Restart the helper process once if it died since the last export.
+        for _ in range(2):
+            process = self._process
+            if process is None or process.poll() is not None:
+                process = self._start_process()
+                if process is None:
+                    return False
+            try:
+                _write_frame(process.stdin, job)
+            except (OSError, ValueError):
+                LOG.debug("Profile exporter process %d is gone", process.pid, exc_info=True)
+                self._process = None
+            else:
+                return True
+        return False
+
+    def export(
+        self,
+        events,  # type: typing.Union[recorder.EventsType, pprof.PprofAggregator]
+        start_time_ns,  # type: int
+        end_time_ns,  # type: int
+    ):
+        # type: (...) -> None
+        """Send events to the helper process for export.
+
+        :param events: The event dictionary from a `ddtrace.profiling.recorder.Recorder`, or the `PprofAggregator`
+            from a `ddtrace.profiling.recorder.AggregatingRecorder`.
+        :param start_time_ns: The start time of recording.
+        :param end_time_ns: The end time of recording.
+        """
+        if self._disabled:
+            self.exporter.export(events, start_time_ns, end_time_ns)
+            return
+
+        if isinstance(events, pprof.PprofAggregator):
+            aggregator = events
+        else:
+            aggregator = pprof.PprofAggregator.from_events(events)
+
+        processor = self.exporter.endpoint_call_counter_span_processor
+        endpoint_counts = processor.reset() if processor is not None else None
+
+        job = (aggregator, start_time_ns, end_time_ns, endpoint_counts, runtime.get_runtime_id())
+        if not self._send(job):
+            if processor is not None and endpoint_counts is not None:
+                processor.endpoint_counts = endpoint_counts
+            self.exporter.export(aggregator, start_time_ns, end_time_ns)
+
+    def stop(self, join=True):
+        # type: (bool) -> None
+        """Stop the helper process.
+
+        :param join: Wait for the helper process to export the pending profiles.
+        """
+        forksafe.unregister(self._after_fork)
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except (OSError, ValueError):
+            pass
+        if not join:
+            return
+        try:
+            process.wait(timeout=self.exporter.timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    # type: () -> None
+    stdin = sys.stdin.buffer
+
+    try:
+        config = _read_frame(stdin)
+    except EOFError:
+        return
+
+    processor = EndpointCallCounterProcessor()
+    exp = http.PprofHTTPExporter(endpoint_call_counter_span_processor=processor, **config)
+
+    while True:
+        try:
+            aggregator, start_time_ns, end_time_ns, endpoint_counts, runtime_id = _read_frame(stdin)
+        except EOFError:
+            return
+
+        # Report the profile as coming from the profiled process
+        runtime._RUNTIME_ID = runtime_id
+        if endpoint_counts is not None:
+            processor.endpoint_counts = endpoint_counts
+        try:
+            exp.export(aggregator, start_time_ns, end_time_ns)
+        except exporter.ExportError as e:
+            LOG.warning("Unable to export profile: %s. Ignoring.", e)
+        except Exception:
+            LOG.exception("Unexpected error while exporting events. Please report this bug to Datadog.")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ import os
 import typing
 from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Type
 from typing import Union
 
@@ -22,6 +23,7 @@ from ddtrace.profiling import collector
 from ddtrace.profiling import exporter
 from ddtrace.profiling import recorder
 from ddtrace.profiling import scheduler
+from ddtrace.profiling.collector import _traceback
 from ddtrace.profiling.collector import asyncio
 from ddtrace.profiling.collector import memalloc
 from ddtrace.profiling.collector import stack
@@ -129,6 +131,8 @@ class _ProfilerInstance(service.Service):
     )
     _export_libdd_enabled = attr.ib(type=bool, default=config.export.libdd_enabled)
     _export_py_enabled = attr.ib(type=bool, default=config.export.py_enabled)
+    _aggregate_events = attr.ib(type=bool, default=config.aggregate_events)
+    _export_out_of_process = attr.ib(type=bool, default=config.export.out_of_process)
 
     ENDPOINT_TEMPLATE = "https://intake.profile.{}"
 
@@ -193,38 +197,60 @@ class _ProfilerInstance(service.Service):
             # unnecessarily
             from ddtrace.profiling.exporter import http
 
-            return [
-                http.PprofHTTPExporter(
-                    service=self.service,
-                    env=self.env,
-                    tags=self.tags,
-                    version=self.version,
-                    api_key=self.api_key,
-                    endpoint=endpoint,
-                    endpoint_path=endpoint_path,
-                    enable_code_provenance=self.enable_code_provenance,
-                    endpoint_call_counter_span_processor=endpoint_call_counter_span_processor,
-                )
-            ]
+            http_exporter = http.PprofHTTPExporter(
+                service=self.service,
+                env=self.env,
+                tags=self.tags,
+                version=self.version,
+                api_key=self.api_key,
+                endpoint=endpoint,
+                endpoint_path=endpoint_path,
+                enable_code_provenance=self.enable_code_provenance,
+                endpoint_call_counter_span_processor=endpoint_call_counter_span_processor,
+            )
+
+            if self._export_out_of_process:
+                from ddtrace.profiling.exporter import process
+
+                return [process.PprofProcessExporter(exporter=http_exporter)]
+
+            return [http_exporter]
         return []
 
     def __attrs_post_init__(self):
         # type: (...) -> None
-        # Allow to store up to 10 threads for 60 seconds at 50 Hz
-        max_stack_events = 10 * 60 * 50
-        r = self._recorder = recorder.Recorder(
-            max_events={
-                stack_event.StackSampleEvent: max_stack_events,
-                stack_event.StackExceptionSampleEvent: int(max_stack_events / 2),
-                # (default buffer size / interval) * export interval
-                memalloc.MemoryAllocSampleEvent: int(
-                    (memalloc.MemoryCollector._DEFAULT_MAX_EVENTS / memalloc.MemoryCollector._DEFAULT_INTERVAL) * 60
-                ),
-                # Do not limit the heap sample size as the number of events is relative to allocated memory anyway
-                memalloc.MemoryHeapSampleEvent: None,
-            },
-            default_max_events=config.max_events,
-        )
+        exporters = self._build_default_exporters()
+
+        if self._aggregate_events and exporters:
+            # DEV: The exporters have already imported the pprof module
+            from ddtrace.profiling.exporter import pprof
+
+            aggregating_exporters = (pprof.PprofExporter,)  # type: Tuple[Type[exporter.Exporter], ...]
+            if self._export_out_of_process:
+                from ddtrace.profiling.exporter import process
+
+                aggregating_exporters += (process.PprofProcessExporter,)
+
+            if all(isinstance(e, aggregating_exporters) for e in exporters):
+                self._recorder = recorder.AggregatingRecorder(aggregator_factory=pprof.PprofAggregator)
+
+        if self._recorder is None:
+            # Allow to store up to 10 threads for 60 seconds at 50 Hz
+            max_stack_events = 10 * 60 * 50
+            self._recorder = recorder.Recorder(
+                max_events={
+                    stack_event.StackSampleEvent: max_stack_events,
+                    stack_event.StackExceptionSampleEvent: int(max_stack_events / 2),
+                    # (default buffer size / interval) * export interval
+                    memalloc.MemoryAllocSampleEvent: int(
+                        (memalloc.MemoryCollector._DEFAULT_MAX_EVENTS / memalloc.MemoryCollector._DEFAULT_INTERVAL) * 60
+                    ),
+                    # Do not limit the heap sample size as the number of events is relative to allocated memory anyway
+                    memalloc.MemoryHeapSampleEvent: None,
+                },
+                default_max_events=config.max_events,
+            )
+        r = self._recorder
 
         self._collectors = []
 
@@ -263,8 +289,6 @@ class _ProfilerInstance(service.Service):
         if self._memory_collector_enabled:
             self._collectors.append(memalloc.MemoryCollector(r))
 
-        exporters = self._build_default_exporters()
-
         if exporters or self._export_libdd_enabled:
             scheduler_class = (
                 scheduler.ServerlessScheduler if self._lambda_function_name else scheduler.Scheduler
@@ -342,5 +366,15 @@ class _ProfilerInstance(service.Service):
             for col in reversed(self._collectors):
                 col.join()
 
+        # Release the code objects referenced by the frames interned while profiling
+        _traceback.clear_frame_table()
+
+        if self._export_out_of_process and self._scheduler is not None:
+            from ddtrace.profiling.exporter import process
+
+            for exp in self._scheduler.exporters:
+                if isinstance(exp, process.PprofProcessExporter):
+                    exp.stop(join=join)
+
     def visible_events(self):
         return self._export_py_enabled
@@ -93,3 +93,32 @@ class Recorder(object):
             events = self.events
             self._reset_events()
         return events
+
+
+@attr.s
+class AggregatingRecorder(Recorder):
+    """A recorder that folds events into an aggregate as they are pushed, instead of storing them.
+
+    The aggregator must provide ``group_events(events)`` and ``add_grouped_events(grouped_events)`` methods. Events are
+    grouped before taking the recorder lock so that only the folding itself is done under the lock. The memory used by
+    the recorder is then bounded by the size of the aggregate rather than by the number of events.
+    """
+
+    aggregator_factory = attr.ib(kw_only=True, type=typing.Callable[[], typing.Any])
+    """A callable returning a new, empty aggregator."""
+
+    def push_events(self, events):
+        """Push multiple events in the recorder.
+
+        All the events MUST be of the same type.
+
+        :param events: The event list to push.
+        """
+        if events:
+            grouped_events = self.events.group_events(events)
+            if grouped_events is not None:
+                with self._events_lock:
+                    self.events.add_grouped_events(grouped_events)
+
+    def _reset_events(self):
+        self.events = self.aggregator_factory()
@@ -1,10 +1,14 @@
 import re
+from typing import Any
 from typing import Dict
 from typing import FrozenSet
+from typing import Iterable
 from typing import List
+from typing import Mapping
 from typing import Optional
 from typing import Text
 from typing import Tuple
+from typing import Union
 from typing import cast
 
 from ddtrace import config
@@ -68,14 +72,6 @@ POSSIBLE_HTTP_HEADER_TRACE_IDS = _possible_header(HTTP_HEADER_TRACE_ID)
 POSSIBLE_HTTP_HEADER_PARENT_IDS = _possible_header(HTTP_HEADER_PARENT_ID)
 POSSIBLE_HTTP_HEADER_SAMPLING_PRIORITIES = _possible_header(HTTP_HEADER_SAMPLING_PRIORITY)
 POSSIBLE_HTTP_HEADER_ORIGIN = _possible_header(HTTP_HEADER_ORIGIN)
-_POSSIBLE_HTTP_HEADER_TAGS = frozenset([_HTTP_HEADER_TAGS, get_wsgi_header(_HTTP_HEADER_TAGS).lower()])
-_POSSIBLE_HTTP_HEADER_B3_SINGLE_HEADER = _possible_header(_HTTP_HEADER_B3_SINGLE)
-_POSSIBLE_HTTP_HEADER_B3_TRACE_IDS = _possible_header(_HTTP_HEADER_B3_TRACE_ID)
-_POSSIBLE_HTTP_HEADER_B3_SPAN_IDS = _possible_header(_HTTP_HEADER_B3_SPAN_ID)
-_POSSIBLE_HTTP_HEADER_B3_SAMPLEDS = _possible_header(_HTTP_HEADER_B3_SAMPLED)
-_POSSIBLE_HTTP_HEADER_B3_FLAGS = _possible_header(_HTTP_HEADER_B3_FLAGS)
-_POSSIBLE_HTTP_HEADER_TRACEPARENT = _possible_header(_HTTP_HEADER_TRACEPARENT)
-_POSSIBLE_HTTP_HEADER_TRACESTATE = _possible_header(_HTTP_HEADER_TRACESTATE)
 
 
 # https://www.w3.org/TR/trace-context/#traceparent-header-field-values
@@ -93,15 +89,59 @@ _TRACEPARENT_HEX_REGEX = re.compile(
      """,
     re.VERBOSE,
 )
+# The tracestate value MUST contain only ASCII characters in the range of 0x20 to 0x7E
+_TRACESTATE_INVALID_CHARS_REGEX = re.compile(r"[^\x20-\x7E]")
+
+
+# The lowercase names under which each propagation header can be received,
+# including the WSGI names and the byte string names used by ASGI.
+_PROPAGATION_HEADER_NAMES = {}  # type: Dict[Union[str, bytes], str]
+for _header in (
+    HTTP_HEADER_TRACE_ID,
+    HTTP_HEADER_PARENT_ID,
+    HTTP_HEADER_SAMPLING_PRIORITY,
+    HTTP_HEADER_ORIGIN,
+    _HTTP_HEADER_TAGS,
+    _HTTP_HEADER_B3_SINGLE,
+    _HTTP_HEADER_B3_TRACE_ID,
+    _HTTP_HEADER_B3_SPAN_ID,
+    _HTTP_HEADER_B3_SAMPLED,
+    _HTTP_HEADER_B3_FLAGS,
+    _HTTP_HEADER_TRACEPARENT,
+    _HTTP_HEADER_TRACESTATE,
+):
+    for _name in _possible_header(_header):
+        _PROPAGATION_HEADER_NAMES[_name] = _header
+        _PROPAGATION_HEADER_NAMES[_name.encode("ascii")] = _header
+del _header, _name
+
+
+def _extract_propagation_headers(headers):
+    # type: (Union[Mapping[str, Any], Iterable[Tuple[Union[str, bytes], Any]]]) -> Dict[str, Any]
+    """Collect the propagation headers in a single pass over the headers.
+
+    The headers can be a mapping, like a header dictionary or a WSGI environ,
+    or a sequence of name and value pairs, like the headers of an ASGI scope.
+    The propagation headers are returned by their lowercase name.
+    """
+    items = headers if isinstance(headers, (list, tuple)) else headers.items()  # type: ignore[union-attr]
+
+    propagation_headers = {}  # type: Dict[str, Any]
+    for name, value in items:
+        header = _PROPAGATION_HEADER_NAMES.get(name.lower())
+        if header is not None:
+            propagation_headers[header] = value
+
+    return propagation_headers
 
 
-def _extract_header_value(possible_header_names, headers, default=None):
-    # type: (FrozenSet[str], Dict[str, str], Optional[str]) -> Optional[str]
-    for header in possible_header_names:
-        if header in headers:
-            return ensure_str(headers[header], errors="backslashreplace")
+def _extract_header_value(header, headers, default=None):
+    # type: (str, Dict[str, Any], Optional[str]) -> Optional[str]
+    value = headers.get(header)
+    if value is None:
+        return default
 
-    return default
+    return ensure_str(value, errors="backslashreplace")
 
 
 def _hex_id_to_dd_id(hex_id):
@@ -184,6 +224,28 @@ class _DatadogMultiHeader:
         if "_dd.propagation_error" in span_context._meta:
             return
 
+        try:
+            # The encoded tags are the same for all the spans of the trace, until
+            # the trace tags change
+            tags_value = span_context._get_propagation_value(
+                _HTTP_HEADER_TAGS,
+                (frozenset(span_context._meta.items()), config._x_datadog_tags_max_length),
+                _DatadogMultiHeader._encode_tags,
+            )
+            if tags_value:
+                headers[_HTTP_HEADER_TAGS] = tags_value
+        except TagsetMaxSizeEncodeError:
+            # We hit the max size allowed, add a tag to the context to indicate this happened
+            span_context._meta["_dd.propagation_error"] = "inject_max_size"
+            log.warning("failed to encode x-datadog-tags", exc_info=True)
+        except TagsetEncodeError:
+            # We hit an encoding error, add a tag to the context to indicate this happened
+            span_context._meta["_dd.propagation_error"] = "encoding_error"
+            log.warning("failed to encode x-datadog-tags", exc_info=True)
+
+    @staticmethod
+    def _encode_tags(span_context):
+        # type: (Context) -> Optional[str]
         # Only propagate trace tags which means ignoring the _dd.origin
         tags_to_encode = {
             # DEV: Context._meta is a _MetaDictType but we need Dict[str, str]
@@ -192,24 +254,15 @@ class _DatadogMultiHeader:
             if _DatadogMultiHeader._is_valid_datadog_trace_tag_key(k)
         }  # type: Dict[Text, Text]
 
-        if tags_to_encode:
-            try:
-                headers[_HTTP_HEADER_TAGS] = encode_tagset_values(
-                    tags_to_encode, max_size=config._x_datadog_tags_max_length
-                )
-            except TagsetMaxSizeEncodeError:
-                # We hit the max size allowed, add a tag to the context to indicate this happened
-                span_context._meta["_dd.propagation_error"] = "inject_max_size"
-                log.warning("failed to encode x-datadog-tags", exc_info=True)
-            except TagsetEncodeError:
-                # We hit an encoding error, add a tag to the context to indicate this happened
-                span_context._meta["_dd.propagation_error"] = "encoding_error"
-                log.warning("failed to encode x-datadog-tags", exc_info=True)
+        if not tags_to_encode:
+            return None
+
+        return encode_tagset_values(tags_to_encode, max_size=config._x_datadog_tags_max_length)
 
     @staticmethod
     def _extract(headers):
         # type: (Dict[str, str]) -> Optional[Context]
-        trace_id_str = _extract_header_value(POSSIBLE_HTTP_HEADER_TRACE_IDS, headers)
+        trace_id_str = _extract_header_value(HTTP_HEADER_TRACE_ID, headers)
         if trace_id_str is None:
             return None
         try:
@@ -224,22 +277,22 @@ class _DatadogMultiHeader:
             return None
 
         parent_span_id = _extract_header_value(
-            POSSIBLE_HTTP_HEADER_PARENT_IDS,
+            HTTP_HEADER_PARENT_ID,
             headers,
             default="0",
         )
         sampling_priority = _extract_header_value(
-            POSSIBLE_HTTP_HEADER_SAMPLING_PRIORITIES,
+            HTTP_HEADER_SAMPLING_PRIORITY,
             headers,
         )
         origin = _extract_header_value(
-            POSSIBLE_HTTP_HEADER_ORIGIN,
+            HTTP_HEADER_ORIGIN,
             headers,
         )
 
         meta = None
         tags_value = _extract_header_value(
-            _POSSIBLE_HTTP_HEADER_TAGS,
+            _HTTP_HEADER_TAGS,
             headers,
             default="",
         )
@@ -378,22 +431,22 @@ class _B3MultiHeader:
     def _extract(headers):
         # type: (Dict[str, str]) -> Optional[Context]
         trace_id_val = _extract_header_value(
-            _POSSIBLE_HTTP_HEADER_B3_TRACE_IDS,
+            _HTTP_HEADER_B3_TRACE_ID,
             headers,
         )
         if trace_id_val is None:
             return None
 
         span_id_val = _extract_header_value(
-            _POSSIBLE_HTTP_HEADER_B3_SPAN_IDS,
+            _HTTP_HEADER_B3_SPAN_ID,
             headers,
         )
         sampled = _extract_header_value(
-            _POSSIBLE_HTTP_HEADER_B3_SAMPLEDS,
+            _HTTP_HEADER_B3_SAMPLED,
             headers,
         )
         flags = _extract_header_value(
-            _POSSIBLE_HTTP_HEADER_B3_FLAGS,
+            _HTTP_HEADER_B3_FLAGS,
             headers,
         )
 
@@ -493,7 +546,7 @@ class _B3SingleHeader:
     @staticmethod
     def _extract(headers):
         # type: (Dict[str, str]) -> Optional[Context]
-        single_header = _extract_header_value(_POSSIBLE_HTTP_HEADER_B3_SINGLE_HEADER, headers)
+        single_header = _extract_header_value(_HTTP_HEADER_B3_SINGLE, headers)
         if not single_header:
             return None
 
@@ -711,7 +764,7 @@ class _TraceContext:
         # type: (Dict[str, str]) -> Optional[Context]
 
         try:
-            tp = _extract_header_value(_POSSIBLE_HTTP_HEADER_TRACEPARENT, headers)
+            tp = _extract_header_value(_HTTP_HEADER_TRACEPARENT, headers)
             if tp is None:
                 log.debug("no traceparent header")
                 return None
@@ -722,7 +775,7 @@ class _TraceContext:
         origin = None
         meta = {W3C_TRACEPARENT_KEY: tp}  # type: _MetaDictType
 
-        ts = _extract_header_value(_POSSIBLE_HTTP_HEADER_TRACESTATE, headers)
+        ts = _extract_header_value(_HTTP_HEADER_TRACESTATE, headers)
 
         if ts:
             # whitespace is allowed, but whitespace to start or end values should be trimmed
@@ -731,7 +784,7 @@ class _TraceContext:
             ts = ",".join(ts_l)
             # the value MUST contain only ASCII characters in the
             # range of 0x20 to 0x7E
-            if re.search(r"[^\x20-\x7E]+", ts):
+            if _TRACESTATE_INVALID_CHARS_REGEX.search(ts):
                 log.debug("received invalid tracestate header: %r", ts)
             else:
                 # store tracestate so we keep other vendor data for injection, even if dd ends up being invalid
@@ -833,7 +886,7 @@ class HTTPPropagator(object):
 
     @staticmethod
     def extract(headers):
-        # type: (Dict[str,str]) -> Context
+        # type: (Union[Mapping[str, Any], Iterable[Tuple[Union[str, bytes], Any]]]) -> Context
         """Extract a Context from HTTP headers into a new Context.
 
         Here is an example from a web endpoint::
@@ -848,19 +901,22 @@ class HTTPPropagator(object):
                 with tracer.trace('my_controller') as span:
                     span.set_tag('http.url', url)
 
-        :param dict headers: HTTP headers to extract tracing attributes.
+        :param headers: HTTP headers to extract tracing attributes, as a dictionary, a WSGI environ
+            or a list of ``(name, value)`` pairs (e.g. the headers of an ASGI scope).
         :return: New `Context` with propagated attributes.
         """
         if not headers:
             return Context()
 
         try:
-            normalized_headers = {name.lower(): v for name, v in headers.items()}
+            propagation_headers = _extract_propagation_headers(headers)
+            if not propagation_headers:
+                return Context()
 
             # loop through the extract propagation styles specified in order
             for prop_style in config._propagation_style_extract:
                 propagator = _PROP_STYLES[prop_style]
-                context = propagator._extract(normalized_headers)  # type: ignore
+                context = propagator._extract(propagation_headers)  # type: ignore
                 if context is not None:
                     return context
 
@@ -6,6 +6,7 @@ import abc
 import json
 from typing import TYPE_CHECKING
 from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Optional
 from typing import Tuple
@@ -20,8 +21,8 @@ from .internal.constants import DEFAULT_SAMPLING_RATE_LIMIT
 from .internal.constants import MAX_UINT_64BITS as _MAX_UINT_64BITS
 from .internal.logger import get_logger
 from .internal.rate_limiter import RateLimiter
+from .internal.sampling import SamplingRulesMatcher
 from .internal.sampling import _apply_rate_limit
-from .internal.sampling import _get_highest_precedence_rule_matching
 from .internal.sampling import _set_sampling_tags
 from .sampling_rule import SamplingRule
 from .settings import _config as ddconfig
@@ -209,7 +210,7 @@ class DatadogSampler(RateByServiceSampler):
     per second.
     """
 
-    __slots__ = ("limiter", "rules")
+    __slots__ = ("limiter", "_rules", "_rules_matcher")
 
     NO_RATE_LIMIT = -1
     # deprecate and remove the DEFAULT_RATE_LIMIT field from DatadogSampler
@@ -247,24 +248,42 @@ class DatadogSampler(RateByServiceSampler):
                 rules = self._parse_rules_from_env_variable(env_sampling_rules)
             else:
                 rules = []
-            self.rules = rules
         else:
-            self.rules = []
+            sampling_rules = []
             # Validate that rules is a list of SampleRules
             for rule in rules:
                 if not isinstance(rule, SamplingRule):
                     raise TypeError("Rule {!r} must be a sub-class of type ddtrace.sampler.SamplingRules".format(rule))
-                self.rules.append(rule)
+                sampling_rules.append(rule)
+            rules = sampling_rules
 
         # DEV: Default sampling rule must come last
         if default_sample_rate is not None:
-            self.rules.append(SamplingRule(sample_rate=default_sample_rate))
+            rules.append(SamplingRule(sample_rate=default_sample_rate))
+
+        self.rules = rules
 
         # Configure rate limiter
         self.limiter = RateLimiter(rate_limit)
 
         log.debug("initialized %r", self)
 
+    @property
+    def rules(self):
+        # type: () -> Tuple[SamplingRule, ...]
+        """The sampling rules, in the order they are evaluated.
+
+        The rules are compiled into a matcher when they are set, so they are
+        held in an immutable tuple. Set the rules again to change them.
+        """
+        return self._rules
+
+    @rules.setter
+    def rules(self, rules):
+        # type: (Iterable[SamplingRule]) -> None
+        self._rules = tuple(rules)
+        self._rules_matcher = SamplingRulesMatcher(self._rules)
+
     def __str__(self):
         rates = {key: sampler.sample_rate for key, sampler in self._by_service_samplers.items()}
         return "{}(agent_rates={!r}, limiter={!r}, rules={!r})".format(
@@ -302,7 +321,7 @@ class DatadogSampler(RateByServiceSampler):
         """
         If allow_false is False, this function will return True regardless of the sampling decision
         """
-        matched_rule = _get_highest_precedence_rule_matching(span, self.rules)
+        matched_rule = self._rules_matcher.match(span)
 
         if matched_rule:
             sampled = matched_rule.sample(span)
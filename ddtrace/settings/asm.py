@@ -30,6 +30,9 @@ class ASMConfig(Env):
         help="Timeout in microseconds for WAF computations",
     )
 
+    _iast_code_cache_enabled = Env.var(bool, "DD_IAST_CODE_CACHE_ENABLED", default=True)
+    _iast_code_cache_dir = Env.var(str, "DD_IAST_CODE_CACHE_DIR", default="")
+
     _iast_redaction_enabled = Env.var(bool, "DD_IAST_REDACTION_ENABLED", default=True)
     _iast_redaction_name_pattern = Env.var(
         str,
@@ -19,6 +19,7 @@ from ddtrace.vendor.debtcollector import deprecate
 from ..internal import gitmetadata
 from ..internal.constants import _PROPAGATION_STYLE_DEFAULT
 from ..internal.constants import DEFAULT_BUFFER_SIZE
+from ..internal.constants import DEFAULT_MAX_IDLE_CONNECTIONS
 from ..internal.constants import DEFAULT_MAX_PAYLOAD_SIZE
 from ..internal.constants import DEFAULT_PROCESSING_INTERVAL
 from ..internal.constants import DEFAULT_REUSE_CONNECTIONS
@@ -344,7 +345,12 @@ class Config(object):
         self._trace_writer_connection_reuse = asbool(
             os.getenv("DD_TRACE_WRITER_REUSE_CONNECTIONS", DEFAULT_REUSE_CONNECTIONS)
         )
+        self._trace_compact_finished_spans = asbool(os.getenv("DD_TRACE_COMPACT_FINISHED_SPANS", default=False))
         self._trace_writer_log_err_payload = asbool(os.environ.get("_DD_TRACE_WRITER_LOG_ERROR_PAYLOADS", False))
+        self._trace_writer_processing_queue_size = int(os.getenv("DD_TRACE_WRITER_PROCESSING_QUEUE_SIZE", default=0))
+        self._trace_writer_early_flush_ratio = float(os.getenv("DD_TRACE_WRITER_EARLY_FLUSH_RATIO", default=0.5))
+        self._trace_writer_compression = os.getenv("DD_TRACE_WRITER_COMPRESSION", default="").lower() or None
+        self._trace_writer_compression_level = int(os.getenv("DD_TRACE_WRITER_COMPRESSION_LEVEL", default=1))
 
         self._trace_agent_hostname = os.environ.get("DD_AGENT_HOST", os.environ.get("DD_TRACE_AGENT_HOSTNAME"))
         self._trace_agent_port = os.environ.get("DD_AGENT_PORT", os.environ.get("DD_TRACE_AGENT_PORT"))
@@ -354,6 +360,10 @@ class Config(object):
         self._stats_agent_port = os.getenv("DD_DOGSTATSD_PORT")
         self._stats_agent_url = os.getenv("DD_DOGSTATSD_URL")
         self._agent_timeout_seconds = float(os.getenv("DD_TRACE_AGENT_TIMEOUT_SECONDS", DEFAULT_TIMEOUT))
+        self._shared_scheduler_enabled = asbool(os.getenv("DD_TRACE_SHARED_SCHEDULER_ENABLED", default=False))
+        self._agent_connection_pool_size = int(
+            os.getenv("DD_TRACE_AGENT_CONNECTION_POOL_SIZE", default=DEFAULT_MAX_IDLE_CONNECTIONS)
+        )
 
         # Master switch for turning on and off trace search by default
         # this weird invocation of getenv is meant to read the DD_ANALYTICS_ENABLED
@@ -473,6 +483,7 @@ class Config(object):
         self._ddtrace_bootstrapped = False
         self._subscriptions = []  # type: List[Tuple[List[str], Callable[[Config, List[str]], None]]]
         self._span_aggregator_rlock = asbool(os.getenv("DD_TRACE_SPAN_AGGREGATOR_RLOCK", True))
+        self._span_aggregator_shards = int(os.getenv("DD_TRACE_SPAN_AGGREGATOR_SHARDS", default=1))
 
         self.trace_methods = os.getenv("DD_TRACE_METHODS")
 
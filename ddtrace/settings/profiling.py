@@ -94,6 +94,16 @@ class ProfilingConfig(En):
         help="",
     )
 
+    aggregate_events = En.v(
+        bool,
+        "aggregate_events",
+        default=False,
+        help_type="Boolean",
+        help="Whether to aggregate profiling events into profile samples as they are recorded, instead of keeping "
+        "them in memory until the next upload. This bounds memory usage by the number of distinct stacks "
+        "and makes uploads cheaper. Only applies when profiles are exported by the Python exporter.",
+    )
+
     upload_interval = En.v(
         float,
         "upload_interval",
@@ -237,5 +247,15 @@ class ProfilingConfig(En):
             help="Enables collection and export using the classic Python exporter",
         )
 
+        out_of_process = En.v(
+            bool,
+            "out_of_process",
+            default=False,
+            help_type="Boolean",
+            help="Whether to build and upload the profiles from a helper subprocess instead of the profiled "
+            "process. Only the aggregated samples are sent to the helper, so the application threads do not pay "
+            "for encoding and uploading the profiles. Requires the Python exporter.",
+        )
+
 
 config = ProfilingConfig()
@@ -56,7 +56,6 @@ _MetricDictType = Dict[_TagNameType, NumericType]
 
 log = get_logger(__name__)
 
-
 def _get_64_lowest_order_bits_as_int(large_int):
     # type: (int) -> int
     """Get the 64 lowest order bits from a 128bit integer"""
@@ -284,6 +283,27 @@ class Span(object):
         for cb in self._on_finish_callbacks:
             cb(self)
 
+    def _compact(self, share_resource):
+        # type: (Callable[[Text], Text]) -> None
+        """Release the state of the finished span that is only needed while it is open.
+
+        Finished spans can wait for the rest of their trace for a long time.
+        The containers that are no longer used are replaced with shared
+        immutable ones, which are not tracked by the garbage collector, and the
+        resource string is replaced with the equal one returned by
+        ``share_resource``.
+        """
+        # TODO: Store the finished spans in a columnar representation that the
+        # v0.5 encoder can encode directly. This requires the trace processors
+        # and the span stats to stop operating on Span objects.
+        self._on_finish_callbacks = ()
+        if not self._links:
+            self._links = ()
+
+        resource = self._resource[0]
+        if isinstance(resource, str):
+            self._resource[0] = share_resource(resource)
+
     def _override_sampling_decision(self, decision):
         self.context.sampling_priority = decision
         set_sampling_decision_maker(self.context, SamplingMechanism.MANUAL)
@@ -541,6 +561,10 @@ class Span(object):
         if attributes is None:
             attributes = dict()
 
+        if not isinstance(self._links, list):
+            # The span has been compacted
+            self._links = list(self._links)
+
         self._links.append(
             _span_link.SpanLink(
                 trace_id=trace_id,
@@ -607,6 +607,21 @@ setup(
                 sources=["ddtrace/internal/_tagset.pyx"],
                 language="c",
             ),
+            Cython.Distutils.Extension(
+                "ddtrace.internal._stats",
+                sources=["ddtrace/internal/_stats.pyx"],
+                language="c",
+            ),
+            Cython.Distutils.Extension(
+                "ddtrace.internal.datastreams._fnv",
+                sources=["ddtrace/internal/datastreams/_fnv.pyx"],
+                language="c",
+            ),
+            Cython.Distutils.Extension(
+                "ddtrace.appsec._ddwaf._ddwaf_object",
+                sources=["ddtrace/appsec/_ddwaf/_ddwaf_object.pyx"],
+                language="c",
+            ),
             Extension(
                 "ddtrace.internal._encoding",
                 ["ddtrace/internal/_encoding.pyx"],
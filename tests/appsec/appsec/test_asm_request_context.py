@@ -94,3 +94,34 @@ def test_asm_request_context_manager():
     assert _asm_request_context.get_headers() == {}
     assert _asm_request_context.get_value("callbacks", "block") is None
     assert not _asm_request_context.get_headers_case_sensitive()
+
+
+def test_waf_stats():
+    class _Result:
+        runtime = 10.0
+        total_runtime = 15.0
+
+    with override_global_config({"_asm_enabled": True}):
+        assert _asm_request_context.get_waf_stats() is None
+        _asm_request_context.record_waf_run(_Result())
+        with _asm_request_context.asm_request_context_manager():
+            _asm_request_context.record_waf_run(_Result())
+            _asm_request_context.record_waf_run(None)
+            _asm_request_context.record_waf_run(_Result())
+            stats = _asm_request_context.get_waf_stats()
+            assert stats.calls == 2
+            assert stats.skipped_calls == 1
+            assert stats.duration == 20.0
+            assert stats.duration_ext == 30.0
+        with _asm_request_context.asm_request_context_manager():
+            assert _asm_request_context.get_waf_stats().calls == 0
+
+
+def test_data_sent():
+    with override_global_config({"_asm_enabled": True}):
+        assert _asm_request_context.get_data_sent() == {}
+        with _asm_request_context.asm_request_context_manager():
+            _asm_request_context.get_data_sent()["REQUEST_QUERY"] = {"q": "1"}
+            assert _asm_request_context.get_data_sent() == {"REQUEST_QUERY": {"q": "1"}}
+        with _asm_request_context.asm_request_context_manager():
+            assert _asm_request_context.get_data_sent() == {}
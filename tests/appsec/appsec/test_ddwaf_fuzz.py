@@ -1,9 +1,12 @@
+import ctypes
+from enum import Enum
 import sys
 
 from hypothesis import given
 from hypothesis import strategies as st
 import pytest
 
+from ddtrace.appsec._ddwaf._ddwaf_object import DDWAF_OBJECT_SIZE
 from ddtrace.appsec._ddwaf.ddwaf_types import _observator
 from ddtrace.appsec._ddwaf.ddwaf_types import ddwaf_object
 
@@ -34,6 +37,23 @@ class _AnyObject:
         return self.cst
 
 
+class _StrSubclass(str):
+    pass
+
+
+class _BytesSubclass(bytes):
+    pass
+
+
+class _StrEnum(str, Enum):
+    VALUE = "enum value"
+
+
+class _FailingObject:
+    def __str__(self):
+        raise ValueError("cannot be converted")
+
+
 @pytest.mark.parametrize(
     "obj, res",
     [
@@ -50,6 +70,14 @@ class _AnyObject:
         ((1 << 64) - 1, -1),  # integers are now on 64 signed bits into the waf
         ((1 << 63) - 1, (1 << 63) - 1),
         (float("inf"), float("inf")),
+        ("te\x00st", "te"),  # the WAF reads strings up to the first null byte
+        ((1, 2), "(1, 2)"),
+        ({"a": {"b": [None, False]}, 3: "c"}, {"a": {"b": [None, False]}}),
+        (_StrSubclass("test"), "test"),
+        (_BytesSubclass(b"test"), "test"),
+        (_StrEnum.VALUE, "enum value"),
+        ({_StrSubclass("key"): _StrSubclass("value")}, {"key": "value"}),
+        ({_BytesSubclass(b"key"): [_StrEnum.VALUE]}, {"key": ["enum value"]}),
     ],
 )
 def test_small_objects(obj, res):
@@ -70,6 +98,7 @@ def test_small_objects(obj, res):
         (None, None, 0),
         (_AnyObject(), _AnyObject.cst[:2], 1),
         ([[[1, 2], 3], 4], [[]], 6),
+        ({1: "a", "b": "c"}, {}, 2),  # non string keys are discarded but count towards the container size
     ],
 )
 def test_limits(obj, res, trunc):
@@ -80,6 +109,27 @@ def test_limits(obj, res, trunc):
     assert obs.truncation == trunc
 
 
+def test_conversion_error():
+    # The objects already built are released and the error is raised
+    with pytest.raises(ValueError):
+        ddwaf_object({"a": ["x" * 100, {"b": 1}], "c": _FailingObject()})
+
+
+def test_ddwaf_object_layout():
+    # The native builder writes in the memory of the ctypes structure
+    assert ctypes.sizeof(ddwaf_object) == DDWAF_OBJECT_SIZE
+
+
+def test_large_object():
+    obs = _observator()
+    obj = {"items": [{"id": i, "name": "x" * 5000, "tags": list(range(300))} for i in range(300)]}
+    dd_obj = ddwaf_object(obj, observator=obs)
+    struct = dd_obj.struct
+    assert len(struct["items"]) == 256
+    assert struct["items"][0] == {"id": 0, "name": "x" * 4095, "tags": list(range(256))}
+    assert obs.truncation == 3
+
+
 if __name__ == "__main__":
     import atheris
 
@@ -10,7 +10,9 @@ from ddtrace.appsec import _asm_request_context
 from ddtrace.appsec._constants import APPSEC
 from ddtrace.appsec._constants import DEFAULT
 from ddtrace.appsec._ddwaf import DDWaf
+from ddtrace.appsec._processor import _NOT_SENT
 from ddtrace.appsec._processor import AppSecSpanProcessor
+from ddtrace.appsec._processor import _already_sent
 from ddtrace.appsec._processor import _transform_headers
 from ddtrace.constants import USER_KEEP
 from ddtrace.contrib.trace_utils import set_http_meta
@@ -76,6 +78,39 @@ def test_transform_headers():
     assert set(transformed["foo"]) == {"bar1", "bar2", "bar3"}
 
 
+def test_already_sent():
+    query = {"q": "1"}
+    assert not _already_sent(_NOT_SENT, "GET")
+    assert _already_sent("GET", "GET")
+    assert not _already_sent("GET", "POST")
+    assert _already_sent(200, 200)
+    assert _already_sent(query, query)
+    # containers are only compared by identity
+    assert not _already_sent(query, {"q": "1"})
+
+
+def test_waf_incremental_evaluation(tracer_appsec):
+    tracer = tracer_appsec
+
+    with _asm_request_context.asm_request_context_manager(), tracer.trace("test", span_type=SpanTypes.WEB) as span:
+        set_http_meta(span, Config(), method="GET", request_headers={"User-Agent": "Arachni/v1"})
+        _asm_request_context.call_waf_callback()
+        stats = _asm_request_context.get_waf_stats()
+        assert stats.calls == 1
+        assert stats.duration > 0.0
+        # nothing new to evaluate: the WAF is not run again
+        _asm_request_context.call_waf_callback()
+        assert stats.calls == 1
+        assert stats.skipped_calls == 1
+        # only the new address is sent
+        set_http_meta(span, Config(), status_code="200")
+        _asm_request_context.call_waf_callback()
+        assert stats.calls == 2
+        assert set(_asm_request_context.get_data_sent()) >= {"REQUEST_METHOD", "RESPONSE_STATUS"}
+
+    assert "triggers" in json.loads(span.get_tag(APPSEC.JSON))
+
+
 def test_enable(tracer_appsec):
     tracer = tracer_appsec
 
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+import importlib.util
+import os
+import stat
+import sys
+from types import CodeType
+
+import mock
+import pytest
+
+from ddtrace.appsec._iast._ast import code_cache
+from ddtrace.appsec._iast._utils import _is_python_version_supported as python_supported_by_iast
+from tests.utils import override_global_config
+
+
+pytestmark = pytest.mark.skipif(not python_supported_by_iast(), reason="Python version not supported by IAST")
+
+PATCHED_SOURCE = """
+def add(a, b):
+    return a + b
+"""
+
+UNPATCHED_SOURCE = """
+def mul(a, b):
+    return a * b
+"""
+
+
+def _module(path, source):
+    with open(path, "w") as f:
+        f.write(source)
+    name = os.path.splitext(os.path.basename(path))[0]
+    return importlib.util.module_from_spec(importlib.util.spec_from_file_location(name, path))
+
+
+@pytest.fixture(autouse=True)
+def write_bytecode(monkeypatch):
+    monkeypatch.setattr(sys, "dont_write_bytecode", False)
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    cache_dir = tmp_path / "cache"
+    with override_global_config(dict(_iast_code_cache_enabled=True, _iast_code_cache_dir=str(cache_dir))):
+        yield cache_dir
+
+
+def _get_patched_code(module):
+    with mock.patch.object(code_cache, "_visit_ast", wraps=code_cache._visit_ast) as visit_ast:
+        code = code_cache.get_patched_code(module)
+    return code, visit_ast.call_count
+
+
+def test_code_cache_hit(tmp_path, cache_dir):
+    module = _module(str(tmp_path / "patched_module.py"), PATCHED_SOURCE)
+
+    code, visits = _get_patched_code(module)
+    assert isinstance(code, CodeType)
+    assert visits == 1
+    (entry,) = os.listdir(str(cache_dir))
+    assert entry.startswith("patched_module.")
+
+    cached_code, visits = _get_patched_code(module)
+    assert visits == 0
+    assert cached_code == code
+    assert cached_code.co_filename == str(tmp_path / "patched_module.py")
+
+
+def test_code_cache_unpatched_module(tmp_path, cache_dir):
+    module = _module(str(tmp_path / "unpatched_module.py"), UNPATCHED_SOURCE)
+
+    assert _get_patched_code(module) == (None, 1)
+    # The module is not visited again to find out that it does not need to be patched
+    assert _get_patched_code(module) == (None, 0)
+
+
+def test_code_cache_source_changed(tmp_path, cache_dir):
+    path = str(tmp_path / "changed_module.py")
+    code, _ = _get_patched_code(_module(path, PATCHED_SOURCE))
+
+    new_code, visits = _get_patched_code(_module(path, PATCHED_SOURCE + "\nVALUE = 'a' + 'b'\n"))
+    assert visits == 1
+    assert new_code != code
+    assert len(os.listdir(str(cache_dir))) == 1
+
+
+def test_code_cache_key():
+    key = code_cache._cache_key("/app/module.py", "module", PATCHED_SOURCE)
+    assert key == code_cache._cache_key("/app/module.py", "module", PATCHED_SOURCE)
+    assert key != code_cache._cache_key("/app/module.py", "module", UNPATCHED_SOURCE)
+    assert key != code_cache._cache_key("/app/other.py", "module", PATCHED_SOURCE)
+    assert key != code_cache._cache_key("/app/module.py", "other", PATCHED_SOURCE)
+    with mock.patch.object(code_cache, "get_version", return_value="0.0.0"):
+        assert key != code_cache._cache_key("/app/module.py", "module", PATCHED_SOURCE)
+    with mock.patch.object(code_cache, "_aspects_fingerprint", b"other aspects"):
+        assert key != code_cache._cache_key("/app/module.py", "module", PATCHED_SOURCE)
+
+
+def test_code_cache_invalid_entry(tmp_path, cache_dir):
+    module = _module(str(tmp_path / "invalid_module.py"), PATCHED_SOURCE)
+    code, _ = _get_patched_code(module)
+
+    (entry,) = os.listdir(str(cache_dir))
+    entry_path = str(cache_dir / entry)
+    with open(entry_path, "r+b") as f:
+        f.truncate(code_cache._HEADER.size + 4)
+
+    new_code, visits = _get_patched_code(module)
+    assert visits == 1
+    assert new_code == code
+    # The entry was written again
+    assert _get_patched_code(module) == (code, 0)
+
+
+@pytest.mark.parametrize("source_mode", [0o644, 0o600, 0o664, 0o444])
+def test_code_cache_entry_mode(tmp_path, cache_dir, source_mode):
+    path = str(tmp_path / "mode_module.py")
+    module = _module(path, PATCHED_SOURCE)
+    os.chmod(path, source_mode)
+    code_cache.get_patched_code(module)
+
+    # Same permissions as the source, like the regular bytecode cache
+    (entry,) = os.listdir(str(cache_dir))
+    assert stat.S_IMODE(os.stat(str(cache_dir / entry)).st_mode) == source_mode | 0o200
+
+
+def test_code_cache_pycache(tmp_path):
+    path = str(tmp_path / "pycache_module.py")
+    with override_global_config(dict(_iast_code_cache_enabled=True, _iast_code_cache_dir="")):
+        code_cache.get_patched_code(_module(path, PATCHED_SOURCE))
+
+    assert os.path.isfile(importlib.util.cache_from_source(path, optimization="iast"))
+    assert os.listdir(str(tmp_path / "__pycache__")) == [os.path.basename(code_cache._cache_path(path))]
+
+
+def test_code_cache_disabled(tmp_path):
+    module = _module(str(tmp_path / "disabled_module.py"), PATCHED_SOURCE)
+    with override_global_config(dict(_iast_code_cache_enabled=False, _iast_code_cache_dir=str(tmp_path / "cache"))):
+        assert _get_patched_code(module)[1] == 1
+        assert _get_patched_code(module)[1] == 1
+    assert not os.path.exists(str(tmp_path / "cache"))
+
+
+def test_code_cache_dont_write_bytecode(tmp_path, cache_dir, monkeypatch):
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    module = _module(str(tmp_path / "no_bytecode_module.py"), PATCHED_SOURCE)
+    assert isinstance(code_cache.get_patched_code(module), CodeType)
+    assert not os.path.exists(str(cache_dir))
+
+
+def test_code_cache_hit_reports_instrumentation(tmp_path, cache_dir):
+    module = _module(str(tmp_path / "metrics_module.py"), PATCHED_SOURCE)
+    code_cache.get_patched_code(module)
+
+    with mock.patch.object(code_cache, "_set_metric_iast_instrumented_propagation") as set_metric:
+        code_cache.get_patched_code(module)
+    assert set_metric.call_count == 1
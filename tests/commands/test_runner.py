@@ -513,6 +513,33 @@ def test_ddtrace_auto_imports():
         assert module not in sys.modules, module
 
 
+@pytest.mark.subprocess(
+    ddtrace_run=True,
+    env=dict(
+        DD_PROFILING_ENABLED="0",
+        DD_DYNAMIC_INSTRUMENTATION_ENABLED="0",
+        DD_EXCEPTION_DEBUGGING_ENABLED="0",
+        DD_RUNTIME_METRICS_ENABLED="0",
+        DD_APPSEC_ENABLED="0",
+        DD_IAST_ENABLED="0",
+    ),
+    err=None,
+)
+def test_ddtrace_run_disabled_features_not_imported():
+    import sys
+
+    # Features that are disabled must not be imported by ddtrace-run
+    for module in (
+        "ddtrace.debugging",
+        "ddtrace.profiling",
+        "ddtrace.internal.runtime.runtime_metrics",
+        "ddtrace.internal.tracemethods",
+        "ddtrace.appsec._iast",
+        "ddtrace.appsec._processor",
+    ):
+        assert module not in sys.modules, module
+
+
 @pytest.mark.subprocess(ddtrace_run=True, env=dict(DD_UNLOAD_MODULES_FROM_SITECUSTOMIZE="1"))
 def test_ddtrace_re_module():
     import re
@@ -410,6 +410,52 @@ def test_data_streams_kafka(dsm_processor, consumer, producer, kafka_topic):
     )
 
 
+def test_consume_batch(dummy_tracer, producer, consumer, kafka_topic):
+    Pin.override(consumer, tracer=dummy_tracer)
+    for i in range(3):
+        producer.produce(kafka_topic, PAYLOAD, key="%s_%d" % (KEY, i))
+    producer.flush()
+
+    messages = []
+    while len(messages) < 3:
+        messages.extend(consumer.consume(num_messages=3, timeout=1.0))
+
+    spans = [span for trace in dummy_tracer.pop_traces() for span in trace if span.name == "kafka.consume"]
+    batch_spans = [span for span in spans if span.get_tag("kafka.received_message") == "True"]
+    assert sum(span.get_metric("kafka.batch_size") for span in batch_spans) == len(messages)
+    for span in batch_spans:
+        assert span.get_tag("kafka.topic") == kafka_topic
+        assert span.get_tag("kafka.group_id") == GROUP_ID
+        assert span.get_tag("span.kind") == "consumer"
+
+
+def test_data_streams_kafka_consume_batch(dsm_processor, consumer, producer, kafka_topic):
+    try:
+        del dsm_processor._current_context.value
+    except AttributeError:
+        pass
+    for i in range(3):
+        producer.produce(kafka_topic, PAYLOAD, key="%s_%d" % (KEY, i))
+    producer.flush()
+
+    messages = []
+    while len(messages) < 3:
+        messages.extend(consumer.consume(num_messages=3, timeout=1.0))
+
+    pathway_stats = {}
+    commit_offsets = {}
+    for bucket in dsm_processor._buckets.values():
+        pathway_stats.update(bucket.pathway_stats)
+        commit_offsets.update(bucket.latest_commit_offsets)
+    consume_stats = [
+        stats
+        for (edge_tags, _, _), stats in pathway_stats.items()
+        if edge_tags == "direction:in,group:{},topic:{},type:kafka".format(GROUP_ID, kafka_topic)
+    ]
+    assert sum(stats.full_pathway_latency.count for stats in consume_stats) == len(messages)
+    assert commit_offsets[ConsumerPartitionKey(GROUP_ID, kafka_topic, 0)] == messages[-1].offset()
+
+
 def _generate_in_subprocess(random_topic):
     import six
 
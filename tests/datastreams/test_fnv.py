@@ -0,0 +1,35 @@
+import struct
+
+import pytest
+
+from ddtrace.internal.datastreams import fnv
+from ddtrace.internal.datastreams._fnv import fnv1_64
+from ddtrace.internal.datastreams._fnv import fnv1_64_pair
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"a",
+        b"foobar",
+        b"unnamed-python-servicenonedirection:outtopic:topicAtype:kafka",
+        bytes(range(256)),
+        "ünïcödé".encode("utf-8"),
+    ],
+)
+def test_fnv1_64(data):
+    assert fnv1_64(data) == fnv.fnv1_64(data)
+
+
+@pytest.mark.parametrize(
+    "first,second",
+    [
+        (0, 0),
+        (1, 2),
+        (0xCBF29CE484222325, 0x100000001B3),
+        (2 ** 64 - 1, 2 ** 64 - 1),
+    ],
+)
+def test_fnv1_64_pair(first, second):
+    assert fnv1_64_pair(first, second) == fnv.fnv1_64(struct.pack("<QQ", first, second))
@@ -1,9 +1,13 @@
 import os
+import struct
 import time
 
+from ddtrace.internal.datastreams import fnv
+from ddtrace.internal.datastreams.processor import PATHWAY_NODE_CACHE_SIZE
 from ddtrace.internal.datastreams.processor import ConsumerPartitionKey
 from ddtrace.internal.datastreams.processor import DataStreamsProcessor
 from ddtrace.internal.datastreams.processor import PartitionKey
+from ddtrace.internal.datastreams.processor import _get_pathway_node
 
 
 def test_data_streams_processor():
@@ -123,3 +127,80 @@ t.join()
     env["DD_DATA_STREAMS_ENABLED"] = "True"
     out, err, status, _ = ddtrace_run_python_code_in_subprocess(code, env=env, timeout=5)
     assert err.decode().strip() == ""
+
+
+def test_data_streams_checkpoint_hash():
+    processor = DataStreamsProcessor("http://localhost:8126")
+    ctx = processor.new_pathway()
+    tags = ["type:kafka", "topic:topicA", "direction:out"]
+
+    node = ctx._get_node(tags)
+    assert node.edge_tags == ("direction:out", "topic:topicA", "type:kafka")
+    assert node.edge_tags_key == "direction:out,topic:topicA,type:kafka"
+    assert node.direction == "direction:out"
+    # The node is computed once for every distinct set of tags
+    assert ctx._get_node(list(tags)) is node
+    # The node hash does not depend on the order of the tags
+    assert ctx._get_node(sorted(tags)).hash == node.hash
+
+    payload = (ctx.service + ctx.env + "".join(sorted(tags))).encode("utf-8")
+    node_hash = fnv.fnv1_64(payload)
+    expected = fnv.fnv1_64(struct.pack("<Q", node_hash) + struct.pack("<Q", 42))
+    assert ctx._compute_hash(tags, 42) == expected
+
+    ctx.set_checkpoint(tags, now_sec=time.time())
+    assert ctx.hash == ctx._compute_hash(tags, 0)
+    (bucket,) = processor._buckets.values()
+    assert list(bucket.pathway_stats) == [("direction:out,topic:topicA,type:kafka", ctx.hash, 0)]
+
+
+def test_data_streams_pathway_node_cache():
+    processor = DataStreamsProcessor("http://localhost:8126")
+    ctx = processor.new_pathway()
+
+    first = ctx._get_node(["topic:first"])
+    second = ctx._get_node(["topic:second"])
+    for i in range(PATHWAY_NODE_CACHE_SIZE - 1):
+        # Keep the first node recently used
+        assert ctx._get_node(["topic:first"]) is first
+        ctx._get_node(["topic:%d" % i])
+
+    # The cache is bounded and evicts the least recently used nodes
+    assert _get_pathway_node.cache_info().currsize == PATHWAY_NODE_CACHE_SIZE
+    assert ctx._get_node(["topic:first"]) is first
+    assert ctx._get_node(["topic:second"]) is not second
+
+
+def test_data_streams_batch_checkpoints():
+    processor = DataStreamsProcessor("http://localhost:8126")
+    now = time.time()
+    tags = ["direction:in", "group:group1", "topic:topicA", "type:kafka"]
+
+    checkpoints = []
+    for _ in range(3):
+        ctx = processor.new_pathway(now_sec=now - 1)
+        _, checkpoint = ctx._checkpoint(tags, now_sec=now, payload_size=10)
+        checkpoints.append(checkpoint)
+    # Computing a checkpoint does not record it
+    assert not processor._buckets
+
+    processor.on_checkpoints_creation(checkpoints)
+    (bucket,) = processor._buckets.values()
+    aggr_key = (",".join(tags), checkpoints[0].hash_value, 0)
+    assert list(bucket.pathway_stats) == [aggr_key]
+    stats = bucket.pathway_stats[aggr_key]
+    assert stats.full_pathway_latency.count == 3
+    assert stats.payload_size.sum == 30
+
+
+def test_data_streams_track_kafka_commits():
+    processor = DataStreamsProcessor("http://localhost:8126")
+    now = time.time()
+    processor.track_kafka_commits("group1", [("topicA", 0, 10), ("topicA", 1, 3), ("topicB", 0, 5)], now)
+    processor.track_kafka_commits("group1", [("topicA", 0, 8)], now)
+    (bucket,) = processor._buckets.values()
+    assert bucket.latest_commit_offsets == {
+        ConsumerPartitionKey("group1", "topicA", 0): 10,
+        ConsumerPartitionKey("group1", "topicA", 1): 3,
+        ConsumerPartitionKey("group1", "topicB", 0): 5,
+    }
@@ -62,10 +62,8 @@ def test_civisibility_intake_payloads():
     with override_env(dict(DD_API_KEY="foobar.baz")):
         t = Tracer()
         t.configure(writer=CIVisibilityWriter(reuse_connections=True, coverage_enabled=bool(compat.PY3)))
-        t._writer._conn = mock.MagicMock()
-        with mock.patch("ddtrace.internal.writer.Response.from_http_response") as from_http_response:
-            from_http_response.return_value.__class__ = Response
-            from_http_response.return_value.status = 200
+        with mock.patch("ddtrace.internal.writer.writer.connection_pool") as pool:
+            pool.request.return_value = (mock.Mock(status=200, reason="OK", msg=None), b"")
             s = t.trace("operation", service="svc-no-cov")
             s.finish()
             span = t.trace("operation2", service="my-svc2")
@@ -75,15 +73,14 @@ def test_civisibility_intake_payloads():
                 + '{"filename": "test_module.py", "segments": [[2, 0, 2, 0, -1]]}]}',
             )
             span.finish()
-            conn = t._writer._conn
             t.shutdown()
-        assert conn.request.call_count == 2 if compat.PY3 else 1
-        assert conn.request.call_args_list[0].args[1] == "api/v2/citestcycle"
+        assert pool.request.call_count == 2 if compat.PY3 else 1
+        assert pool.request.call_args_list[0].args[2] == "api/v2/citestcycle"
         assert (
-            b"svc-no-cov" in conn.request.call_args_list[0].args[2]
+            b"svc-no-cov" in pool.request.call_args_list[0].args[3]
         ), "requests to the cycle endpoint should include non-coverage spans"
         if compat.PY3:
-            assert conn.request.call_args_list[1].args[1] == "api/v2/citestcov"
+            assert pool.request.call_args_list[1].args[2] == "api/v2/citestcov"
             assert (
-                b"svc-no-cov" not in conn.request.call_args_list[1].args[2]
+                b"svc-no-cov" not in pool.request.call_args_list[1].args[3]
             ), "requests to the coverage endpoint should not include non-coverage spans"
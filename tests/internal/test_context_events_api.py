@@ -6,6 +6,7 @@ import mock
 import pytest
 
 from ddtrace.internal import core
+from tests.utils import override_global_config
 
 
 class TestContextEventsApi(unittest.TestCase):
@@ -93,6 +94,40 @@ class TestContextEventsApi(unittest.TestCase):
             pass
         assert handler.called
 
+    def test_core_dispatch_no_listeners(self):
+        assert core.dispatch("my.cool.event", [42]) == ([], [])
+
+    def test_core_fire(self):
+        event_name = "my.cool.event"
+        handler = mock.Mock(return_value="result")
+        core.on(event_name, handler)
+        core.on(event_name, mock.Mock(side_effect=ValueError))
+        with override_global_config(dict(_raise=False)):
+            assert core.fire(event_name, 42, "foo") is None
+        handler.assert_called_once_with(42, "foo")
+
+    def test_core_fire_raise(self):
+        event_name = "my.cool.event"
+        core.on(event_name, mock.Mock(side_effect=ValueError))
+        with override_global_config(dict(_raise=True)):
+            with pytest.raises(ValueError):
+                core.fire(event_name, [])
+
+    def test_core_on_while_dispatching(self):
+        event_name = "my.cool.event"
+        late_listener = mock.Mock()
+
+        def listener():
+            core.on(event_name, late_listener)
+            return "first"
+
+        core.on(event_name, listener)
+        # Listeners added while an event is dispatched only receive the next events
+        assert core.dispatch(event_name, []) == (["first"], [None])
+        assert not late_listener.called
+        core.dispatch(event_name, [])
+        late_listener.assert_called_once_with()
+
     def test_core_root_context(self):
         root_context = core._CURRENT_CONTEXT.get()
         assert isinstance(root_context, core.ExecutionContext)
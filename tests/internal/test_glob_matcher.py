@@ -18,6 +18,9 @@ from ddtrace.internal.glob_matching import GlobMatcher
         ("test?_string", "test_string", False),  # Test empty string for ?
         ("test_s*ring", "test_string", True),  # Test empty string for *
         ("*", "test_string", True),
+        ("***", "", True),
+        ("", "", True),
+        ("", "test_string", False),
         ("a*", "a**", True),
         ("foo.*", "foo.you", True),
         ("foo.*", "snafoo", False),
@@ -368,6 +368,106 @@ def test_module_watchdog_propagation():
     Alice.uninstall()
 
 
+@pytest.mark.subprocess
+def test_module_watchdog_origin_map_incremental():
+    # Test that the origin map is updated with the newly imported modules
+    # without resolving their origin on import.
+    from pathlib import Path
+
+    from ddtrace.internal.module import ModuleWatchdog
+    from ddtrace.internal.module import origin
+
+    class Watchdog(ModuleWatchdog):
+        pass
+
+    Watchdog.install()
+    instance = Watchdog._instance
+
+    # Build the origin map
+    assert instance._origin_map
+
+    import tests.submod.stuff  # noqa
+
+    assert instance._om_pending
+    assert Watchdog.get_by_origin(Path(tests.submod.stuff.__file__)) is tests.submod.stuff
+    assert not instance._om_pending
+    assert instance._origin_map[str(origin(tests.submod.stuff))] is tests.submod.stuff
+
+    Watchdog.uninstall()
+
+
+@pytest.mark.subprocess
+def test_module_watchdog_origin_map_import_while_resolving():
+    # Test that the modules imported while the pending modules are resolved
+    # are not lost.
+    from ddtrace.internal import module
+    from ddtrace.internal.module import ModuleWatchdog
+    from ddtrace.internal.module import origin
+
+    class Watchdog(ModuleWatchdog):
+        pass
+
+    Watchdog.install()
+    instance = Watchdog._instance
+
+    # Build the origin map
+    assert instance._origin_map
+
+    import tests.submod.stuff  # noqa
+
+    _origin_path = module._origin_path
+
+    def _importing_origin_path(m):
+        import tests.submod.absstuff  # noqa
+
+        return _origin_path(m)
+
+    module._origin_path = _importing_origin_path
+    try:
+        assert instance._origin_map[str(origin(tests.submod.stuff))] is tests.submod.stuff
+    finally:
+        module._origin_path = _origin_path
+
+    import tests.submod.absstuff  # noqa
+
+    assert instance._origin_map[str(origin(tests.submod.absstuff))] is tests.submod.absstuff
+    assert not instance._om_pending
+
+    Watchdog.uninstall()
+
+
+@pytest.mark.subprocess
+def test_module_watchdog_pre_exec_module_hooks():
+    # Test that the first registered pre-exec hook whose condition matches the
+    # module name is the one that is called.
+    from ddtrace.internal.module import ModuleWatchdog
+
+    called = []
+
+    def hook(name):
+        def _(loader, module):
+            called.append((name, module.__name__))
+            loader.loader.exec_module(module)
+
+        return _
+
+    class Watchdog(ModuleWatchdog):
+        pass
+
+    Watchdog.install()
+    Watchdog.register_pre_exec_module_hook("tests.submod.other", hook("other"))
+    Watchdog.register_pre_exec_module_hook(lambda name: name.endswith(".stuff"), hook("cond"))
+    Watchdog.register_pre_exec_module_hook("tests.submod.stuff", hook("name"))
+    Watchdog.register_pre_exec_module_hook("tests.submod", hook("package"))
+    Watchdog.register_pre_exec_module_hook(lambda name: name == "tests.submod", hook("late"))
+
+    import tests.submod.stuff  # noqa
+
+    assert called == [("package", "tests.submod"), ("cond", "tests.submod.stuff")], called
+
+    Watchdog.uninstall()
+
+
 @pytest.mark.skipif(sys.version_info < (3, 5), reason="LazyLoader was introduced in Python 3.5")
 @pytest.mark.subprocess(out="ddtrace imported\naccessing lazy module\nlazy loaded\n")
 def test_module_watchdog_no_lazy_force_load():
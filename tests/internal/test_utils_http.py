@@ -1,6 +1,16 @@
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+from http.server import ThreadingHTTPServer
+import socket
+from socketserver import ThreadingMixIn
+from socketserver import UnixStreamServer
+import threading
+
 import httpretty
+import mock
 import pytest
 
+from ddtrace.internal.utils.http import ConnectionPool
 from ddtrace.internal.utils.http import connector
 
 
@@ -15,3 +25,176 @@ def test_connector(scheme):
             response = conn.getresponse()
             assert response.status == 200
             assert response.read() == b'{"hello": "world"}'
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = ("%s:%s" % self.client_address).encode() if isinstance(self.client_address, tuple) else b"uds"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _UDSHTTPServer(ThreadingMixIn, UnixStreamServer, HTTPServer):
+    def server_bind(self):
+        UnixStreamServer.server_bind(self)
+        self.server_name, self.server_port = "localhost", 0
+
+
+@pytest.fixture
+def keep_alive_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        yield "http://127.0.0.1:%d" % server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _get(conn):
+    conn.request("GET", "/")
+    return conn.getresponse().read()
+
+
+def test_connection_pool_reuses_connections(keep_alive_url):
+    pool = ConnectionPool()
+
+    with pool.connection(keep_alive_url) as conn:
+        first_peer = _get(conn)
+    with pool.connection(keep_alive_url) as other:
+        assert other is conn
+        # The same TCP connection is used for both requests
+        assert _get(other) == first_peer
+
+    pool.clear()
+    assert conn.sock is None
+
+
+def test_connection_pool_unread_response(keep_alive_url):
+    pool = ConnectionPool()
+
+    with pool.connection(keep_alive_url) as conn:
+        conn.request("GET", "/")
+        conn.getresponse()
+
+    # A connection with a pending response cannot be reused
+    assert conn.sock is None
+    assert pool.take(keep_alive_url) is None
+
+
+def test_connection_pool_error(keep_alive_url):
+    pool = ConnectionPool()
+
+    with pytest.raises(ValueError):
+        with pool.connection(keep_alive_url) as conn:
+            _get(conn)
+            raise ValueError()
+
+    assert conn.sock is None
+    assert pool.take(keep_alive_url) is None
+
+
+def test_connection_pool_dropped_connection(keep_alive_url):
+    pool = ConnectionPool()
+
+    with pool.connection(keep_alive_url) as conn:
+        _get(conn)
+
+    # Simulate the idle connection being torn down
+    conn.sock.shutdown(socket.SHUT_RDWR)
+
+    assert pool.take(keep_alive_url) is None
+    assert conn.sock is None
+
+
+def test_connection_pool_max_idle(keep_alive_url):
+    pool = ConnectionPool(max_idle=1)
+
+    with pool.connection(keep_alive_url) as a, pool.connection(keep_alive_url) as b:
+        _get(a)
+        _get(b)
+
+    assert pool.take(keep_alive_url) in (a, b)
+    assert pool.take(keep_alive_url) is None
+
+    pool = ConnectionPool(max_idle=0)
+    with pool.connection(keep_alive_url) as conn:
+        _get(conn)
+    assert conn.sock is None
+
+
+def test_connection_pool_uds(tmpdir):
+    path = str(tmpdir.join("apm.socket"))
+    server = _UDSHTTPServer(path, _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        pool = ConnectionPool()
+        url = "unix://%s" % path
+
+        with pool.connection(url) as conn:
+            assert _get(conn) == b"uds"
+        with pool.connection(url) as other:
+            assert other is conn
+            assert _get(other) == b"uds"
+    finally:
+        pool.clear()
+        server.shutdown()
+        server.server_close()
+
+
+def test_connection_pool_request(keep_alive_url):
+    pool = ConnectionPool()
+
+    resp, body = pool.request(keep_alive_url, "GET", "/")
+    assert resp.status == 200
+    (conn,) = pool._idle[keep_alive_url]
+
+    _, other_body = pool.request(keep_alive_url, "GET", "/")
+    assert other_body == body
+    assert pool._idle[keep_alive_url] == [conn]
+    pool.clear()
+
+
+def test_connection_pool_request_stale_connection(keep_alive_url):
+    pool = ConnectionPool()
+
+    _, body = pool.request(keep_alive_url, "GET", "/")
+    (conn,) = pool._idle[keep_alive_url]
+    # The connection goes stale after it has been checked as alive
+    conn.sock.shutdown(socket.SHUT_RDWR)
+
+    with mock.patch("ddtrace.internal.utils.http._is_connection_dropped", return_value=False):
+        resp, other_body = pool.request(keep_alive_url, "GET", "/")
+
+    # The request is sent again over a new connection
+    assert resp.status == 200
+    assert other_body != body
+    assert conn.sock is None
+    (other,) = pool._idle[keep_alive_url]
+    assert other is not conn
+    pool.clear()
+
+
+def test_connection_pool_after_fork(keep_alive_url):
+    pool = ConnectionPool()
+
+    with pool.connection(keep_alive_url) as conn:
+        _get(conn)
+
+    # Another thread of the parent process was holding the lock when the process forked
+    pool._lock.acquire()
+    pool._after_fork()
+
+    assert conn.sock is None
+    assert pool.take(keep_alive_url) is None
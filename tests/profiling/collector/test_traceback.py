@@ -20,3 +20,79 @@ def test_check_traceback_to_frames():
         (this_file, 7, "_x", ""),
         (this_file, 15, "test_check_traceback_to_frames", ""),
     ]
+
+
+class _Foo(object):
+    def frame(self):
+        return sys._getframe()
+
+    @classmethod
+    def class_frame(cls):
+        return sys._getframe()
+
+
+def _frame():
+    return _Foo().frame()
+
+
+def test_pyframe_to_frames_interned():
+    first, nframes = _traceback.pyframe_to_frames(_frame(), 2)
+    assert nframes > 2
+
+    this_file = __file__.replace(".pyc", ".py")
+    assert first == [
+        (this_file, 27, "frame", "_Foo"),
+        (this_file, 35, "_frame", ""),
+    ]
+
+    # Walking the same code again returns the same frame objects
+    second, _ = _traceback.pyframe_to_frames(_frame(), 2)
+    assert all(a is b for a, b in zip(first, second))
+
+    class _Bar(_Foo):
+        pass
+
+    # The class name is part of the frame identity
+    (frame,), _ = _traceback.pyframe_to_frames(_Bar().frame(), 1)
+    assert frame == (this_file, 27, "frame", "_Bar")
+    (frame,), _ = _traceback.pyframe_to_frames(_Foo.class_frame(), 1)
+    assert frame == (this_file, 31, "class_frame", "_Foo")
+
+
+def test_frame_table_max_size(monkeypatch):
+    _traceback.clear_frame_table()
+    monkeypatch.setattr(_traceback, "FRAME_TABLE_MAX_SIZE", 0)
+    first, _ = _traceback.pyframe_to_frames(_frame(), 1)
+    second, _ = _traceback.pyframe_to_frames(_frame(), 1)
+    # The frames are not interned anymore once the table is full
+    assert first == second
+    assert first[0] is not second[0]
+
+
+def test_frame_table_cleared_after_fork():
+    import os
+
+    first, _ = _traceback.pyframe_to_frames(_frame(), 1)
+
+    pid = os.fork()
+    if pid == 0:
+        # The frames interned by the parent process are dropped
+        second, _ = _traceback.pyframe_to_frames(_frame(), 1)
+        os._exit(0 if first == second and first[0] is not second[0] else 1)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+
+
+def test_frame_table_cleared_on_profiler_stop():
+    from ddtrace.profiling import profiler
+
+    first, _ = _traceback.pyframe_to_frames(_frame(), 1)
+
+    p = profiler.Profiler()
+    p.start()
+    p.stop(flush=False)
+
+    second, _ = _traceback.pyframe_to_frames(_frame(), 1)
+    assert first == second
+    assert first[0] is not second[0]
@@ -1,4 +1,5 @@
 import os
+import pickle
 import platform
 
 import mock
@@ -796,3 +797,91 @@ def test_pprof_exporter_empty():
     export, libs = exp.export({}, 0, 1)
     assert len(libs) > 0
     assert len(export.sample) == 0
+
+
+def _samples(profile):
+    strings = profile.string_table
+    locations = {location.id: location for location in profile.location}
+    functions = {function.id: function for function in profile.function}
+    return sorted(
+        (
+            tuple(
+                (strings[functions[line.function_id].name], line.line)
+                for location_id in sample.location_id
+                for line in locations[location_id].line
+            ),
+            tuple(sorted((strings[label.key], strings[label.str]) for label in sample.label)),
+            tuple(sample.value),
+        )
+        for sample in profile.sample
+    )
+
+
+@mock.patch("ddtrace.internal.utils.config.get_application_name")
+def test_pprof_aggregator(gan):
+    gan.return_value = "bonjour"
+    exp = pprof.PprofExporter()
+    expected, expected_libs = exp.export(TEST_EVENTS, 1, 7)
+
+    # Fold the events one at a time, as an aggregating recorder would
+    aggregator = pprof.PprofAggregator()
+    for event_type, events in TEST_EVENTS.items():
+        for e in events:
+            aggregator.push_events([e])
+    exports, libs = exp.export(aggregator, 1, 7)
+
+    assert exports.period == expected.period == 1000000
+    assert len(exports.location) == len(expected.location)
+    assert libs == expected_libs
+    # Only the lock sample values can differ, as they are scaled with the sampling ratio of each pushed batch
+    lock_types = [i for i, t in enumerate(exports.sample_type) if exports.string_table[t.type].startswith("lock-")]
+    assert [s[:2] for s in _samples(exports)] == [s[:2] for s in _samples(expected)]
+    assert [tuple(v for i, v in enumerate(s[2]) if i not in lock_types) for s in _samples(exports)] == [
+        tuple(v for i, v in enumerate(s[2]) if i not in lock_types) for s in _samples(expected)
+    ]
+
+
+def test_pprof_aggregator_interns_stacks():
+    aggregator = pprof.PprofAggregator()
+    frames = [("foobar.py", 23, "func1", ""), ("foobar.py", 44, "func2", "")]
+    for _ in range(100):
+        aggregator.push_events(
+            [
+                stack_event.StackSampleEvent(
+                    thread_id=1,
+                    thread_name="MainThread",
+                    frames=frames,
+                    nframes=2,
+                    wall_time_ns=10,
+                    cpu_time_ns=5,
+                    sampling_period=1000,
+                )
+            ]
+        )
+
+    converter = aggregator._converter
+    assert len(converter._stacks) == 1
+    assert len(converter._locations) == 2
+    ((_, values),) = converter._location_values.items()
+    assert values["cpu-samples"] == 100
+    assert values["wall-time"] == 1000
+    assert values["cpu-time"] == 500
+    assert aggregator.period == 1000
+
+
+@mock.patch("ddtrace.internal.utils.config.get_application_name")
+def test_pprof_aggregator_pickle(gan):
+    gan.return_value = "bonjour"
+    exp = pprof.PprofExporter()
+    aggregator = pprof.PprofAggregator.from_events(TEST_EVENTS)
+    expected, expected_libs = exp.export(aggregator, 1, 7)
+
+    restored = pickle.loads(pickle.dumps(pprof.PprofAggregator.from_events(TEST_EVENTS)))
+    assert restored.period == aggregator.period
+    exports, libs = exp.export(restored, 1, 7)
+    assert exports == expected
+    assert libs == expected_libs
+
+    # The restored aggregator keeps folding events on the same functions and locations
+    restored.push_events(TEST_EVENTS[stack_event.StackSampleEvent])
+    assert len(restored._converter._locations) == len(aggregator._converter._locations)
@@ -0,0 +1,122 @@
+# -*- encoding: utf-8 -*-
+import json
+import os
+import signal
+import sys
+import time
+
+import pytest
+
+from ddtrace.internal import runtime
+from ddtrace.profiling.exporter import http
+from ddtrace.profiling.exporter import pprof
+from ddtrace.profiling.exporter import process
+
+from . import test_http
+from . import test_pprof
+
+
+if sys.platform == "win32":
+    pytestmark = pytest.mark.skip
+
+
+_PORT = test_http._PORT + 5
+_ENDPOINT = "http://localhost:%d" % _PORT
+
+
+class _RecordingAPIEndpointRequestHandlerTest(test_http._APIEndpointRequestHandlerTest):
+    requests = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.requests.append(body)
+        self.send_error(200, "OK")
+
+
+@pytest.fixture
+def endpoint_test_server():
+    server, thread = test_http._make_server(_PORT, _RecordingAPIEndpointRequestHandlerTest)
+    try:
+        yield _RecordingAPIEndpointRequestHandlerTest.requests
+    finally:
+        server.shutdown()
+        thread.join()
+        del _RecordingAPIEndpointRequestHandlerTest.requests[:]
+
+
+def _get_exporter():
+    return process.PprofProcessExporter(
+        exporter=http.PprofHTTPExporter(
+            endpoint=_ENDPOINT,
+            api_key=test_http._API_KEY,
+            endpoint_call_counter_span_processor=test_http._get_span_processor(),
+        )
+    )
+
+
+def test_export(endpoint_test_server):
+    exp = _get_exporter()
+    exp.export(pprof.PprofAggregator.from_events(test_pprof.TEST_EVENTS), 0, 1)
+    worker = exp._process
+    assert worker is not None
+    # The endpoint counts are handed over to the helper process
+    assert exp.exporter.endpoint_call_counter_span_processor.endpoint_counts == {}
+
+    exp.stop()
+    assert worker.returncode == 0
+    assert exp._process is None
+
+    (body,) = endpoint_test_server
+    assert b"auto.pprof" in body
+    assert ("runtime-id:%s" % runtime.get_runtime_id()).encode() in body
+    assert json.dumps(test_http._ENDPOINT_COUNTS).encode() in body
+
+
+def test_export_restart(endpoint_test_server):
+    exp = _get_exporter()
+    exp.export(test_pprof.TEST_EVENTS, 0, 1)
+    first = exp._process
+    # Wait for the first profile to be uploaded before killing the helper process
+    for _ in range(100):
+        if endpoint_test_server:
+            break
+        time.sleep(0.1)
+    first.kill()
+    first.wait()
+
+    exp.export(test_pprof.TEST_EVENTS, 1, 2)
+    assert exp._process is not None
+    assert exp._process is not first
+    exp.stop()
+
+    assert len(endpoint_test_server) == 2
+
+
+def test_export_fork(endpoint_test_server):
+    exp = _get_exporter()
+    exp.export(test_pprof.TEST_EVENTS, 0, 1)
+    worker = exp._process
+
+    pid = os.fork()
+    if pid == 0:
+        # Outlive the parent's stop: the helper process must not wait for the child
+        time.sleep(60)
+        os._exit(0)
+
+    try:
+        exp.stop()
+        assert worker.returncode == 0
+    finally:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+
+
+def test_export_in_process_fallback(endpoint_test_server, monkeypatch):
+    monkeypatch.setattr(sys, "executable", "/usr/bin/uwsgi")
+    exp = _get_exporter()
+    exp.export(test_pprof.TEST_EVENTS, 0, 1)
+    assert exp._process is None
+    assert exp._disabled
+    exp.stop()
+
+    assert len(endpoint_test_server) == 1
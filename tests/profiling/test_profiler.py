@@ -347,6 +347,42 @@ def test_snapshot(monkeypatch):
     assert len(all_events["EVENTS"][event.Event]) == 1
 
 
+def test_aggregate_events():
+    from ddtrace.profiling import recorder
+    from ddtrace.profiling.exporter import pprof
+
+    p = profiler._ProfilerInstance(aggregate_events=True)
+    assert isinstance(p._recorder, recorder.AggregatingRecorder)
+    assert isinstance(p._recorder.events, pprof.PprofAggregator)
+
+    # Aggregation requires every exporter to export pprof profiles
+    class TestProfiler(profiler._ProfilerInstance):
+        def _build_default_exporters(self, *args, **kargs):
+            return [exporter.NullExporter()]
+
+    p = TestProfiler(aggregate_events=True)
+    assert type(p._recorder) is recorder.Recorder
+
+    p = profiler._ProfilerInstance()
+    assert type(p._recorder) is recorder.Recorder
+
+
+def test_export_out_of_process():
+    from ddtrace.profiling import recorder
+    from ddtrace.profiling.exporter import http
+    from ddtrace.profiling.exporter import process
+
+    p = profiler._ProfilerInstance(export_out_of_process=True, aggregate_events=True)
+    (exp,) = p._scheduler.exporters
+    assert isinstance(exp, process.PprofProcessExporter)
+    assert isinstance(exp.exporter, http.PprofHTTPExporter)
+    assert isinstance(p._recorder, recorder.AggregatingRecorder)
+
+    p = profiler._ProfilerInstance()
+    (exp,) = p._scheduler.exporters
+    assert isinstance(exp, http.PprofHTTPExporter)
+
+
 def test_failed_start_collector(caplog, monkeypatch):
     class ErrCollect(collector.Collector):
         def _start_service(self):
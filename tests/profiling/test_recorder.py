@@ -55,6 +55,33 @@ def test_limit():
     assert r.events[stack_event.StackSampleEvent].maxlen == 24
 
 
+class _CountingAggregator(object):
+    def __init__(self):
+        self.counts = {}
+
+    @staticmethod
+    def group_events(events):
+        if events[0].__class__ is event.Event:
+            return len(events)
+        return None
+
+    def add_grouped_events(self, grouped_events):
+        self.counts[event.Event] = self.counts.get(event.Event, 0) + grouped_events
+
+
+def test_aggregating_recorder():
+    r = recorder.AggregatingRecorder(aggregator_factory=_CountingAggregator)
+    r.push_events([])
+    r.push_event(event.Event())
+    r.push_events([event.Event(), event.Event()])
+    # Unsupported events are dropped
+    r.push_event(stack_event.StackSampleEvent())
+    aggregate = r.reset()
+    assert isinstance(aggregate, _CountingAggregator)
+    assert aggregate.counts == {event.Event: 3}
+    assert r.reset().counts == {}
+
+
 @pytest.mark.skipif(sys.platform == "win32", reason="fork only available on Unix")
 def test_fork():
     stdout, stderr, exitcode, pid = call_program("python", os.path.join(os.path.dirname(__file__), "recorder_fork.py"))
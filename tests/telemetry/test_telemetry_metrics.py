@@ -1,4 +1,5 @@
 import sys
+import threading
 from time import sleep
 
 from mock.mock import ANY
@@ -9,6 +10,11 @@ from ddtrace.internal.telemetry.constants import TELEMETRY_NAMESPACE_TAG_TRACER
 from ddtrace.internal.telemetry.constants import TELEMETRY_TYPE_DISTRIBUTION
 from ddtrace.internal.telemetry.constants import TELEMETRY_TYPE_GENERATE_METRICS
 from ddtrace.internal.telemetry.constants import TELEMETRY_TYPE_LOGS
+from ddtrace.internal.telemetry.metrics import DISTRIBUTION_MAX_POINTS
+from ddtrace.internal.telemetry.metrics import CountMetric
+from ddtrace.internal.telemetry.metrics import DistributionMetric
+from ddtrace.internal.telemetry.metrics_namespaces import DISTRIBUTION_POINTS_DROPPED
+from ddtrace.internal.telemetry.metrics_namespaces import MetricNamespace
 from tests.telemetry.test_writer import _get_request_body
 
 
@@ -462,3 +468,209 @@ def test_send_multiple_log_metric_no_duplicates_for_each_interval_check_time(tel
         telemetry_writer.add_log("WARNING", "test error 1")
 
     _assert_logs(test_agent_session, expected_payload, seq_id=2)
+
+
+def test_distribution_metric_is_bounded():
+    metric = DistributionMetric(TELEMETRY_NAMESPACE_TAG_APPSEC, "test-metric", tuple(), True)
+    for value in range(10 * DISTRIBUTION_MAX_POINTS):
+        metric.add_point(float(value))
+
+    # The first values are reported as they are and the others are counted as dropped
+    assert metric.to_dict()["points"] == [float(v) for v in range(DISTRIBUTION_MAX_POINTS)]
+    assert metric._dropped == 9 * DISTRIBUTION_MAX_POINTS
+
+
+def test_distribution_metric_dropped_points_are_reported():
+    namespace = MetricNamespace()
+    for value in range(DISTRIBUTION_MAX_POINTS + 500):
+        namespace.add_metric(DistributionMetric, TELEMETRY_NAMESPACE_TAG_APPSEC, "test-metric", value)
+
+    metrics = namespace.flush()
+    (dist,) = metrics[TELEMETRY_TYPE_DISTRIBUTION][TELEMETRY_NAMESPACE_TAG_APPSEC].values()
+    assert len(dist.to_dict()["points"]) == DISTRIBUTION_MAX_POINTS
+    (dropped,) = metrics[TELEMETRY_TYPE_GENERATE_METRICS][TELEMETRY_NAMESPACE_TAG_APPSEC].values()
+    assert dropped.to_dict()["metric"] == DISTRIBUTION_POINTS_DROPPED
+    assert dropped.to_dict()["tags"] == ["metric:test-metric"]
+    assert dropped.to_dict()["points"][0][1] == 500
+
+    # Nothing is dropped below the limit
+    namespace.add_metric(DistributionMetric, TELEMETRY_NAMESPACE_TAG_APPSEC, "test-metric", 1)
+    assert namespace.flush()[TELEMETRY_TYPE_GENERATE_METRICS] == {}
+
+
+def test_metric_handle():
+    namespace = MetricNamespace()
+    handle = namespace.get_metric_handle(CountMetric, TELEMETRY_NAMESPACE_TAG_TRACER, "test-metric", (("a", "b"),))
+    handle.add_point()
+    handle.add_point(2)
+    namespace.add_metric(CountMetric, TELEMETRY_NAMESPACE_TAG_TRACER, "test-metric", 3, (("a", "b"),))
+
+    distribution = namespace.get_metric_handle(DistributionMetric, TELEMETRY_NAMESPACE_TAG_APPSEC, "test-metric")
+    distribution.add_point(4)
+    distribution.add_point(5)
+
+    metrics = namespace.flush()
+    (count,) = metrics[TELEMETRY_TYPE_GENERATE_METRICS][TELEMETRY_NAMESPACE_TAG_TRACER].values()
+    assert count.to_dict()["points"][0][1] == 6
+    (dist,) = metrics[TELEMETRY_TYPE_DISTRIBUTION][TELEMETRY_NAMESPACE_TAG_APPSEC].values()
+    assert dist.to_dict()["points"] == [4, 5]
+
+    # Handles outlive flushes
+    handle.add_point()
+    (count,) = namespace.flush()[TELEMETRY_TYPE_GENERATE_METRICS][TELEMETRY_NAMESPACE_TAG_TRACER].values()
+    assert count.to_dict()["points"][0][1] == 1
+
+
+def test_count_metric_handle_threads():
+    namespace = MetricNamespace()
+    handle = namespace.get_count_metric_handle(TELEMETRY_NAMESPACE_TAG_TRACER, "test-metric", (("a", "b"),))
+    assert namespace.get_count_metric_handle(TELEMETRY_NAMESPACE_TAG_TRACER, "test-metric", (("a", "b"),)) is handle
+
+    def target():
+        for _ in range(10000):
+            handle.add_point()
+
+    threads = [threading.Thread(target=target) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    (count,) = namespace.flush()[TELEMETRY_TYPE_GENERATE_METRICS][TELEMETRY_NAMESPACE_TAG_TRACER].values()
+    assert count.name == "test-metric"
+    assert count.to_dict()["points"][0][1] == 40000
+
+    # The totals of the threads that have exited are dropped once reported
+    assert handle._counts.totals == {}
+
+    # Only the new counts are reported at the next flush
+    assert namespace.flush()[TELEMETRY_TYPE_GENERATE_METRICS] == {}
+    handle.add_point(2)
+    (count,) = namespace.flush()[TELEMETRY_TYPE_GENERATE_METRICS][TELEMETRY_NAMESPACE_TAG_TRACER].values()
+    assert count.to_dict()["points"][0][1] == 2
+    assert list(handle._counts.totals) == [threading.current_thread()]
+
+
+def test_count_metric_handle_concurrent_flushes():
+    namespace = MetricNamespace()
+    handle = namespace.get_count_metric_handle(TELEMETRY_NAMESPACE_TAG_TRACER, "test-metric")
+    flushed = []
+
+    def _add_points():
+        for _ in range(10000):
+            handle.add_point()
+
+    def _flush():
+        for _ in range(100):
+            flushed.append(namespace.flush())
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=_add_points) for _ in range(2)]
+        threads += [threading.Thread(target=_flush) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    flushed.append(namespace.flush())
+
+    # Every count is reported exactly once, even when the namespace is flushed from several threads
+    total = sum(
+        metric.to_dict()["points"][0][1]
+        for metrics in flushed
+        for metric in metrics[TELEMETRY_TYPE_GENERATE_METRICS][TELEMETRY_NAMESPACE_TAG_TRACER].values()
+    )
+    assert total == 20000
+
+
+def test_gauge_metric_handle():
+    namespace = MetricNamespace()
+    handle = namespace.get_gauge_metric_handle(TELEMETRY_NAMESPACE_TAG_TRACER, "test-metric", interval=10)
+    handle.add_point(1)
+    handle.add_point(5)
+
+    (gauge,) = namespace.flush()[TELEMETRY_TYPE_GENERATE_METRICS][TELEMETRY_NAMESPACE_TAG_TRACER].values()
+    assert gauge.to_dict()["type"] == "gauge"
+    assert gauge.to_dict()["interval"] == 10
+    assert gauge.to_dict()["points"][0][1] == 5
+
+    assert namespace.flush()[TELEMETRY_TYPE_GENERATE_METRICS] == {}
+
+
+def test_distribution_metric_handle_threads():
+    namespace = MetricNamespace()
+    handle = namespace.get_distribution_metric_handle(TELEMETRY_NAMESPACE_TAG_APPSEC, "test-metric")
+    assert namespace.get_metric_handle(DistributionMetric, TELEMETRY_NAMESPACE_TAG_APPSEC, "test-metric") is handle
+
+    def target(value):
+        for _ in range(100):
+            handle.add_point(value)
+
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    metrics = namespace.flush()
+    (dist,) = metrics[TELEMETRY_TYPE_DISTRIBUTION][TELEMETRY_NAMESPACE_TAG_APPSEC].values()
+    assert sorted(dist.to_dict()["points"]) == sorted(i for i in range(4) for _ in range(100))
+    assert metrics[TELEMETRY_TYPE_GENERATE_METRICS] == {}
+    # The queues of the threads that have exited are dropped once drained
+    assert handle._values == {}
+    assert namespace.flush()[TELEMETRY_TYPE_DISTRIBUTION] == {}
+
+
+def test_distribution_metric_handle_dropped_points():
+    namespace = MetricNamespace()
+    handle = namespace.get_distribution_metric_handle(TELEMETRY_NAMESPACE_TAG_APPSEC, "test-metric")
+    for value in range(3 * DISTRIBUTION_MAX_POINTS):
+        handle.add_point(value)
+
+    metrics = namespace.flush()
+    (dist,) = metrics[TELEMETRY_TYPE_DISTRIBUTION][TELEMETRY_NAMESPACE_TAG_APPSEC].values()
+    assert dist.to_dict()["points"] == list(range(DISTRIBUTION_MAX_POINTS))
+    (dropped,) = metrics[TELEMETRY_TYPE_GENERATE_METRICS][TELEMETRY_NAMESPACE_TAG_APPSEC].values()
+    assert dropped.to_dict()["points"][0][1] == 2 * DISTRIBUTION_MAX_POINTS
+
+    # The queue accepts values again after the flush
+    handle.add_point(1)
+    (dist,) = namespace.flush()[TELEMETRY_TYPE_DISTRIBUTION][TELEMETRY_NAMESPACE_TAG_APPSEC].values()
+    assert dist.to_dict()["points"] == [1]
+
+
+def test_metric_handle_concurrent_points():
+    namespace = MetricNamespace()
+    handle = namespace.get_metric_handle(CountMetric, TELEMETRY_NAMESPACE_TAG_TRACER, "test-metric")
+    flushed = []
+
+    def _add_points():
+        for _ in range(10000):
+            handle.add_point()
+
+    def _flush():
+        for _ in range(100):
+            flushed.append(namespace.flush())
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=_add_points) for _ in range(4)] + [threading.Thread(target=_flush)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    flushed.append(namespace.flush())
+
+    # No point is lost, even when added while the namespace is flushed
+    total = sum(
+        metric.to_dict()["points"][0][1]
+        for metrics in flushed
+        for metric in metrics[TELEMETRY_TYPE_GENERATE_METRICS][TELEMETRY_NAMESPACE_TAG_TRACER].values()
+    )
+    assert total == 40000
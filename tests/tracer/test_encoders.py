@@ -6,6 +6,7 @@ import random
 import string
 import threading
 from unittest import TestCase
+import weakref
 
 from hypothesis import given
 from hypothesis import settings
@@ -756,6 +757,58 @@ def test_custom_msgpack_encode_thread_safe(encoding):
     assert unpacked is not None
 
 
+@allencodings
+def test_custom_msgpack_encode_swaps_buffers(encoding):
+    encoder = MSGPACK_ENCODERS[encoding](1 << 20, 1 << 20)
+    refencoder = REF_MSGPACK_ENCODERS[encoding]()
+
+    # Every encode seals the active buffer and reuses the previously sealed
+    # one, so payloads must stay independent across several cycles.
+    for i in range(5):
+        trace = gen_trace(nspans=10, ntags=i + 1)
+        encoder.put(trace)
+        assert len(encoder) == 1
+        assert decode(refencoder.encode_traces([trace])) == decode(encoder.encode())
+        assert len(encoder) == 0
+        assert encoder.encode() is None
+
+
+@allencodings
+def test_custom_msgpack_encode_while_putting(encoding):
+    THREADS = 8
+    TRACES = 200
+    encoder = MSGPACK_ENCODERS[encoding](8 << 20, 8 << 20)
+    trace = [Span(name="span-%d" % _, service="threads", resource="TEST") for _ in range(3)]
+    done = threading.Event()
+    payloads = []
+
+    def produce():
+        for _ in range(TRACES):
+            encoder.put(trace)
+
+    def drain():
+        while not done.is_set():
+            payload = encoder.encode()
+            if payload is not None:
+                payloads.append(payload)
+
+    drainer = threading.Thread(target=drain)
+    drainer.start()
+    producers = [threading.Thread(target=produce) for _ in range(THREADS)]
+    for t in producers:
+        t.start()
+    for t in producers:
+        t.join()
+    done.set()
+    drainer.join()
+
+    payload = encoder.encode()
+    if payload is not None:
+        payloads.append(payload)
+
+    assert sum(len(decode(p)) for p in payloads) == THREADS * TRACES
+
+
 @pytest.mark.subprocess(parametrize={"encoder_cls": ["JSONEncoder", "JSONEncoderV2"]})
 def test_json_encoder_traces_bytes():
     """
@@ -799,16 +852,29 @@ def test_json_encoder_traces_bytes():
         assert u"\ufffdspan.b" == span_c["name"]
 
 
+def test_custom_msgpack_encode_v05_does_not_retain_spans():
+    encoder = MsgpackEncoderV05(1 << 20, 1 << 20)
+    trace = [Span("name", "service", "resource", "type") for _ in range(5)]
+    refs = [weakref.ref(span) for span in trace]
+
+    encoder.put(trace)
+    del trace
+
+    assert all(ref() is None for ref in refs)
+    assert encoder.encode()
+
+
 @pytest.mark.skipif(
     os.getenv("PYTHONOPTIMIZE", "").lower() in ("1", "t", "true"),
     reason="Python optimize removes assertions from cython code",
 )
 def test_verifying_v05_payloads():
     string_table_size = 4 * (1 << 12)
-    encoder = MsgpackEncoderV05(string_table_size, string_table_size)
 
     # Ensure EncodingValidationError is not raised when trace fields are encoded as expected
     with override_global_config({"_trace_writer_log_err_payload": True}):
+        # The setting is read when the encoder is created
+        encoder = MsgpackEncoderV05(string_table_size, string_table_size)
         traces = [[Span("name", "service", "resource", "type") for _ in range(5)] for _ in range(100)]
         for trace in traces:
             for s in trace:
@@ -6,6 +6,7 @@ import pytest
 
 from ddtrace.internal import periodic
 from ddtrace.internal import service
+from tests.utils import override_global_config
 
 
 def test_periodic():
@@ -130,3 +131,180 @@ def test_awakeable_periodic_service():
     awake_me.stop()
 
     assert queue == list(range(n + 2))
+
+
+def test_deferred_awakeable_periodic_thread():
+    queue = []
+    shutdown = []
+
+    def _run_periodic():
+        queue.append(len(queue))
+
+    t = periodic.DeferredAwakeablePeriodicThread(60, _run_periodic, on_shutdown=lambda: shutdown.append(True))
+    t.start()
+
+    # The target is not run before the first interval elapses
+    sleep(0.1)
+    assert queue == []
+
+    t.awake()
+    t.awake(wait=False)
+    sleep(0.1)
+    assert queue[:1] == [0]
+
+    # Stopping does not wait for the interval to elapse
+    t.stop()
+    t.join(1)
+    assert not t.is_alive()
+    assert shutdown == [True]
+
+
+def test_scheduled_task():
+    queue = []
+    shutdown = []
+
+    t = periodic.ScheduledTask(0.01, lambda: queue.append(len(queue)), on_shutdown=lambda: shutdown.append(True))
+    t.start()
+    with pytest.raises(RuntimeError):
+        t.start()
+    assert t.is_alive()
+
+    sleep(0.2)
+    t.stop()
+    t.join(1)
+    assert not t.is_alive()
+    assert len(queue) > 1
+    assert shutdown == [True]
+
+    # Awaking a stopped task does not run it again
+    n = len(queue)
+    t.awake()
+    t.awake(wait=False)
+    sleep(0.1)
+    assert len(queue) == n
+
+
+def test_scheduled_task_error():
+    shutdown = []
+    runs = []
+
+    def _run_periodic():
+        runs.append(True)
+        raise ValueError
+
+    t = periodic.ScheduledTask(0.001, _run_periodic, on_shutdown=lambda: shutdown.append(True))
+    t.start()
+    t.join(1)
+    assert not t.is_alive()
+    assert shutdown == []
+
+    # Awaking a dead task does not run it again
+    t.awake()
+    t.awake(wait=False)
+    sleep(0.1)
+    assert runs == [True]
+
+
+def test_shared_scheduler_awakeable_periodic_service():
+    queue = []
+
+    class AwakeMe(periodic.AwakeablePeriodicService):
+        def periodic(self):
+            queue.append(len(queue))
+
+    interval = 1
+
+    with override_global_config(dict(_shared_scheduler_enabled=True)):
+        awake_me = AwakeMe(interval)
+        other = periodic.PeriodicService(interval)
+        awake_me.start()
+        other.start()
+
+    assert isinstance(awake_me._worker, periodic.ScheduledTask)
+    assert isinstance(other._worker, periodic.ScheduledTask)
+
+    # Let the initial run happen, otherwise it serves the first request
+    sleep(0.1)
+
+    # Manually awake the service
+    n = 10
+    for _ in range(10):
+        awake_me.awake()
+
+    # Sleep long enough to also trigger the periodic function with the timeout
+    sleep(1.1 * interval)
+
+    scheduler = periodic.get_scheduler()
+    threads = [t for t in threading.enumerate() if isinstance(t, periodic._SchedulerThread)]
+    assert threads == [scheduler._thread]
+
+    awake_me.stop()
+    other.stop()
+    awake_me.join(1)
+    other.join(1)
+
+    assert queue == list(range(n + 2))
+
+
+def test_shared_scheduler_deferred_service_stop():
+    queue = []
+
+    class Deferred(periodic.AwakeablePeriodicService):
+        __thread_class__ = periodic.DeferredAwakeablePeriodicThread
+
+        def periodic(self):
+            queue.append(len(queue))
+
+    with override_global_config(dict(_shared_scheduler_enabled=True)):
+        service = Deferred(60)
+        service.start()
+
+    sleep(0.1)
+    assert queue == []
+
+    service.awake()
+    assert queue == [0]
+
+    # Stopping does not wait for the interval to elapse
+    service.stop()
+    service.join(1)
+    assert not service._worker.is_alive()
+
+
+@pytest.mark.subprocess(env=dict(DD_TRACE_SHARED_SCHEDULER_ENABLED="true"))
+def test_shared_scheduler_fork():
+    import os
+    import time
+
+    from ddtrace.internal import periodic
+
+    class Counter(periodic.PeriodicService):
+        count = 0
+
+        def periodic(self):
+            self.count += 1
+
+    service = Counter(0.01)
+    service.start()
+    parent_scheduler = periodic.get_scheduler()
+
+    pid = os.fork()
+    if pid == 0:
+        # The task died with the scheduler thread of the parent process
+        assert not service._worker.is_alive()
+        service.join()
+        assert periodic.get_scheduler() is not parent_scheduler
+
+        child = Counter(0.01)
+        child.start()
+        time.sleep(0.2)
+        child.stop()
+        child.join(1)
+        assert child.count > 0
+        os._exit(0)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+    assert service._worker.is_alive()
+    service.stop()
+    service.join(1)
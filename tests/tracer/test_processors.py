@@ -1,3 +1,4 @@
+import threading
 from typing import Any
 
 import attr
@@ -24,6 +25,7 @@ from ddtrace.internal.processor.trace import SpanProcessor
 from ddtrace.internal.processor.trace import SpanSamplingProcessor
 from ddtrace.internal.processor.trace import TraceProcessor
 from ddtrace.internal.processor.trace import TraceTagsProcessor
+from ddtrace.internal.processor.trace import _SharedResources
 from ddtrace.internal.processor.truncator import DEFAULT_SERVICE_NAME
 from ddtrace.internal.processor.truncator import DEFAULT_SPAN_NAME
 from ddtrace.internal.processor.truncator import MAX_META_KEY_LENGTH
@@ -35,6 +37,9 @@ from ddtrace.internal.processor.truncator import NormalizeSpanProcessor
 from ddtrace.internal.processor.truncator import TruncateSpanProcessor
 from ddtrace.internal.sampling import SamplingMechanism
 from ddtrace.internal.sampling import SpanSamplingRule
+from ddtrace.internal.telemetry.constants import TELEMETRY_NAMESPACE_TAG_TRACER
+from ddtrace.internal.telemetry.constants import TELEMETRY_TYPE_GENERATE_METRICS
+from ddtrace.internal.telemetry.writer import TelemetryWriter
 from tests.utils import DummyTracer
 from tests.utils import DummyWriter
 from tests.utils import override_global_config
@@ -374,39 +379,43 @@ def test_span_normalizator():
     assert span.span_type == "x" * MAX_TYPE_LENGTH
 
 
-def test_span_creation_metrics():
-    """Test that telemetry metrics are queued in batches of 100 and the remainder is sent on shutdown"""
+def test_span_creation_metrics(telemetry_writer):
+    """Test that telemetry metrics count every span created and finished"""
     writer = DummyWriter()
     aggr = SpanAggregator(partial_flush_enabled=False, partial_flush_min_spans=0, trace_processors=[], writer=writer)
 
-    with mock.patch("ddtrace.internal.telemetry.telemetry_writer.add_count_metric") as mock_tm:
-        for _ in range(300):
-            span = Span("span", on_finish=[aggr.on_span_finish])
-            aggr.on_span_start(span)
-            span.finish()
-
+    for _ in range(301):
         span = Span("span", on_finish=[aggr.on_span_finish])
         aggr.on_span_start(span)
         span.finish()
 
-        mock_tm.assert_has_calls(
-            [
-                mock.call("tracers", "spans_created", 100, tags=(("integration_name", "datadog"),)),
-                mock.call("tracers", "spans_finished", 100, tags=(("integration_name", "datadog"),)),
-                mock.call("tracers", "spans_created", 100, tags=(("integration_name", "datadog"),)),
-                mock.call("tracers", "spans_finished", 100, tags=(("integration_name", "datadog"),)),
-                mock.call("tracers", "spans_created", 100, tags=(("integration_name", "datadog"),)),
-                mock.call("tracers", "spans_finished", 100, tags=(("integration_name", "datadog"),)),
-            ]
-        )
-        mock_tm.reset_mock()
-        aggr.shutdown(None)
-        mock_tm.assert_has_calls(
-            [
-                mock.call("tracers", "spans_created", 1, tags=(("integration_name", "datadog"),)),
-                mock.call("tracers", "spans_finished", 1, tags=(("integration_name", "datadog"),)),
-            ]
-        )
+    metrics = telemetry_writer._namespace.flush()[TELEMETRY_TYPE_GENERATE_METRICS][TELEMETRY_NAMESPACE_TAG_TRACER]
+    assert sorted((m.name, m._tags, m._points[0][1]) for m in metrics.values()) == [
+        ("spans_created", (("integration_name", "datadog"),), 301),
+        ("spans_finished", (("integration_name", "datadog"),), 301),
+    ]
+
+    span = Span("span", on_finish=[aggr.on_span_finish])
+    aggr.on_span_start(span)
+
+    metrics = telemetry_writer._namespace.flush()[TELEMETRY_TYPE_GENERATE_METRICS][TELEMETRY_NAMESPACE_TAG_TRACER]
+    assert [(m.name, m._points[0][1]) for m in metrics.values()] == [("spans_created", 1)]
+
+
+def test_span_creation_metrics_telemetry_writer_replaced(telemetry_writer):
+    """Test that the spans are counted by the current telemetry writer"""
+    writer = DummyWriter()
+    aggr = SpanAggregator(partial_flush_enabled=False, partial_flush_min_spans=0, trace_processors=[], writer=writer)
+    aggr.on_span_start(Span("span"))
+
+    new_telemetry_writer = TelemetryWriter(is_periodic=False)
+    with mock.patch("ddtrace.internal.telemetry.telemetry_writer", new_telemetry_writer):
+        aggr.on_span_start(Span("span"))
+        aggr.on_span_start(Span("span"))
+
+    for w, count in ((telemetry_writer, 1), (new_telemetry_writer, 2)):
+        metrics = w._namespace.flush()[TELEMETRY_TYPE_GENERATE_METRICS][TELEMETRY_NAMESPACE_TAG_TRACER]
+        assert [(m.name, m._points[0][1]) for m in metrics.values()] == [("spans_created", count)]
 
 
 def test_single_span_sampling_processor():
@@ -684,3 +693,130 @@ def test_register_unregister_span_processor():
     with tracer.trace("test") as span:
         assert span.get_tag("on_start") is None
     assert span.get_tag("on_finish") is None
+
+
+def test_aggregator_sharded_concurrent_traces():
+    """Traces spread over multiple shards are flushed once all their spans finish"""
+    writer = DummyWriter()
+    aggr = SpanAggregator(
+        partial_flush_enabled=False, partial_flush_min_spans=0, trace_processors=[], writer=writer, num_shards=8
+    )
+    assert len(aggr._shards) == 8
+
+    def create_trace():
+        parent = Span("parent", on_finish=[aggr.on_span_finish])
+        aggr.on_span_start(parent)
+        for _ in range(5):
+            child = Span("child", on_finish=[aggr.on_span_finish])
+            child.trace_id = parent.trace_id
+            child.parent_id = parent.span_id
+            aggr.on_span_start(child)
+            child.finish()
+        parent.finish()
+
+    threads = [threading.Thread(target=create_trace) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    spans = writer.pop()
+    assert len(spans) == 16 * 6
+    assert len(set(s.trace_id for s in spans)) == 16
+    assert all(not shard.traces for shard in aggr._shards)
+
+
+def test_aggregator_sharded_partial_flush():
+    writer = DummyWriter()
+    aggr = SpanAggregator(
+        partial_flush_enabled=True, partial_flush_min_spans=1, trace_processors=[], writer=writer, num_shards=4
+    )
+
+    parent = Span("parent", on_finish=[aggr.on_span_finish])
+    aggr.on_span_start(parent)
+    child = Span("child", on_finish=[aggr.on_span_finish])
+    child.trace_id = parent.trace_id
+    child.parent_id = parent.span_id
+    aggr.on_span_start(child)
+
+    child.finish()
+    assert writer.pop() == [child]
+    assert child.get_metric("_dd.py.partial_flush") == 1
+    parent.finish()
+    assert writer.pop() == [parent]
+    assert not aggr._get_shard(parent.trace_id).traces
+
+
+def test_aggregator_compact_finished_spans():
+    writer = DummyWriter()
+    aggr = SpanAggregator(
+        partial_flush_enabled=False,
+        partial_flush_min_spans=0,
+        trace_processors=[],
+        writer=writer,
+        compact_finished_spans=True,
+    )
+
+    parent = Span("parent", resource="GET /users", on_finish=[aggr.on_span_finish])
+    aggr.on_span_start(parent)
+    children = []
+    for _ in range(2):
+        child = Span("child", resource="".join(["GET ", "/users"]), on_finish=[aggr.on_span_finish])
+        child.trace_id = parent.trace_id
+        child.parent_id = parent.span_id
+        aggr.on_span_start(child)
+        child.finish()
+        children.append(child)
+
+    # The finished spans wait for the parent with compacted state
+    assert writer.pop() == []
+    for child in children:
+        assert child._on_finish_callbacks == ()
+        assert child._links == ()
+    assert children[0].resource is children[1].resource
+
+    # Span links can still be added after compaction
+    children[0]._set_span_link(trace_id=1, span_id=2)
+    assert len(children[0]._links) == 1
+
+    parent.finish()
+    assert writer.pop() == [parent] + children
+
+
+def test_compact_resources_bounded():
+    resources = _SharedResources(max_size=10)
+
+    first = "".join(["GET ", "/a"])
+    assert resources.share(first) is first
+    assert resources.share("GET /a") is first
+    assert resources._size == 6
+
+    # Resources larger than the table are not kept
+    assert resources.share("GET /users/1") not in resources._resources
+
+    # The table starts over when it is full
+    assert resources.share("GET /b") == "GET /b"
+    assert resources._resources == {"GET /b": "GET /b"}
+    assert resources._size == 6
+
+
+def test_compact_resources_per_aggregator():
+    aggrs = [
+        SpanAggregator(
+            partial_flush_enabled=False,
+            partial_flush_min_spans=0,
+            trace_processors=[],
+            writer=DummyWriter(),
+            compact_finished_spans=True,
+        )
+        for _ in range(2)
+    ]
+    for aggr in aggrs:
+        span = Span("span", resource="GET /users", on_finish=[aggr.on_span_finish])
+        aggr.on_span_start(span)
+        span.finish()
+
+    # Each aggregator owns the table of the resources of its spans
+    assert aggrs[0]._shared_resources is not aggrs[1]._shared_resources
+    for aggr in aggrs:
+        assert aggr._shared_resources._resources == {"GET /users": "GET /users"}
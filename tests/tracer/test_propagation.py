@@ -245,6 +245,40 @@ def test_inject_tags_previous_error(tracer):
         assert _HTTP_HEADER_TAGS not in headers
 
 
+def test_inject_cached_trace_headers(tracer):
+    meta = {"_dd.p.test": "value"}
+    ctx = Context(trace_id=1234, sampling_priority=1, dd_origin="synthetics", meta=meta)
+    tracer.context_provider.activate(ctx)
+    with override_global_config(
+        dict(_propagation_style_inject=[PROPAGATION_STYLE_DATADOG, _PROPAGATION_STYLE_W3C_TRACECONTEXT])
+    ):
+        with tracer.trace("global_root_span") as root:
+            with tracer.trace("child_span") as child:
+                root_headers = {}
+                HTTPPropagator.inject(root.context, root_headers)
+                child_headers = {}
+                HTTPPropagator.inject(child.context, child_headers)
+
+                # The headers of all the spans of the trace are computed once
+                assert child.context._propagation_cache is root.context._propagation_cache
+                assert child_headers[_HTTP_HEADER_TAGS] is root_headers[_HTTP_HEADER_TAGS]
+                assert child_headers[_HTTP_HEADER_TRACESTATE] is root_headers[_HTTP_HEADER_TRACESTATE]
+                assert child_headers[HTTP_HEADER_PARENT_ID] == str(child.span_id)
+                assert child_headers[_HTTP_HEADER_TRACEPARENT] == "00-{:032x}-{:016x}-01".format(
+                    child.trace_id, child.span_id
+                )
+
+                # The headers are updated when the trace state changes
+                child.context.sampling_priority = 2
+                child.context._meta["_dd.p.test"] = "other"
+                headers = {}
+                HTTPPropagator.inject(root.context, headers)
+
+                assert headers[HTTP_HEADER_SAMPLING_PRIORITY] == "2"
+                assert headers[_HTTP_HEADER_TAGS] == "_dd.p.test=other"
+                assert headers[_HTTP_HEADER_TRACESTATE] == "dd=s:2;o:synthetics;t.test:other"
+
+
 def test_extract(tracer):
     headers = {
         "x-datadog-trace-id": "1234",
@@ -435,6 +469,55 @@ def test_extract_unicode(tracer):
             }
 
 
+@pytest.mark.parametrize(
+    "headers",
+    [
+        # ASGI scope headers
+        [
+            (b"host", b"localhost"),
+            (b"x-datadog-trace-id", b"1234"),
+            (b"x-datadog-parent-id", b"5678"),
+            (b"x-datadog-sampling-priority", b"1"),
+            (b"x-datadog-origin", b"synthetics"),
+        ],
+        # Mixed case header names
+        {
+            "Host": "localhost",
+            "X-Datadog-Trace-Id": "1234",
+            "X-DATADOG-PARENT-ID": "5678",
+            "x-DataDog-Sampling-Priority": "1",
+            "x-datadog-origin": "synthetics",
+        },
+        # WSGI environ
+        {
+            "HTTP_HOST": "localhost",
+            "HTTP_X_DATADOG_TRACE_ID": "1234",
+            "HTTP_X_DATADOG_PARENT_ID": "5678",
+            "http_x_datadog_sampling_priority": "1",
+            "HTTP_X_DATADOG_ORIGIN": "synthetics",
+        },
+    ],
+)
+def test_extract_header_formats(headers):
+    context = HTTPPropagator.extract(headers)
+
+    assert context.trace_id == 1234
+    assert context.span_id == 5678
+    assert context.sampling_priority == 1
+    assert context.dd_origin == "synthetics"
+
+
+def test_extract_no_propagation_headers():
+    headers = {"x-test-header-{}".format(i): str(i) for i in range(100)}
+    # Same length as x-datadog-trace-id
+    headers["x-datadog-trace-xx"] = "1234"
+
+    context = HTTPPropagator.extract(headers)
+
+    assert context.trace_id is None
+    assert context.span_id is None
+
+
 @pytest.mark.parametrize(
     "x_datadog_tags, expected_trace_tags",
     [
@@ -20,6 +20,7 @@ from ddtrace.internal.compat import iteritems
 from ddtrace.internal.rate_limiter import RateLimiter
 from ddtrace.internal.sampling import SAMPLING_DECISION_TRACE_TAG_KEY
 from ddtrace.internal.sampling import SamplingMechanism
+from ddtrace.internal.sampling import SamplingRulesMatcher
 from ddtrace.internal.sampling import set_sampling_decision_maker
 from ddtrace.sampler import DatadogSampler
 from ddtrace.sampler import RateByServiceSampler
@@ -670,7 +671,7 @@ def test_sampling_rule_sample_rate_0():
 
 def test_datadog_sampler_init():
     sampler = DatadogSampler()
-    assert sampler.rules == [], "DatadogSampler initialized with no arguments should hold no rules"
+    assert sampler.rules == (), "DatadogSampler initialized with no arguments should hold no rules"
     assert isinstance(
         sampler.limiter, RateLimiter
     ), "DatadogSampler initialized with no arguments should hold a RateLimiter"
@@ -680,7 +681,7 @@ def test_datadog_sampler_init():
 
     rule = SamplingRule(sample_rate=1)
     sampler = DatadogSampler(rules=[rule])
-    assert sampler.rules == [rule], "DatadogSampler initialized with a rule should hold that rule"
+    assert sampler.rules == (rule,), "DatadogSampler initialized with a rule should hold that rule"
     assert (
         sampler.limiter.rate_limit == DatadogSampler.DEFAULT_RATE_LIMIT
     ), "DatadogSampler initialized with a rule should hold the default rate limit"
@@ -692,27 +693,27 @@ def test_datadog_sampler_init():
     assert (
         sampler.limiter.rate_limit == DatadogSampler.DEFAULT_RATE_LIMIT
     ), "DatadogSampler initialized with default_sample_rate should hold the default rate limit"
-    assert sampler.rules == [
-        SamplingRule(sample_rate=0.5)
-    ], "DatadogSampler initialized with default_sample_rate should hold a SamplingRule with that rate"
+    assert sampler.rules == (
+        SamplingRule(sample_rate=0.5),
+    ), "DatadogSampler initialized with default_sample_rate should hold a SamplingRule with that rate"
 
     with override_global_config(dict(_trace_sample_rate=0.5, _trace_rate_limit=10)):
         sampler = DatadogSampler()
         assert (
             sampler.limiter.rate_limit == 10
         ), "DatadogSampler initialized with no arguments and envvars set should hold a rate_limit from the envvar"
-        assert sampler.rules == [
-            SamplingRule(sample_rate=0.5)
-        ], "DatadogSampler initialized with no arguments and envvars set should hold a sample_rate from the envvar"
+        assert sampler.rules == (
+            SamplingRule(sample_rate=0.5),
+        ), "DatadogSampler initialized with no arguments and envvars set should hold a sample_rate from the envvar"
 
     with override_global_config(dict(_trace_sample_rate=0)):
         sampler = DatadogSampler()
         assert (
             sampler.limiter.rate_limit == DatadogSampler.DEFAULT_RATE_LIMIT
         ), "DatadogSampler initialized with DD_TRACE_SAMPLE_RATE=0 envvar should hold the default rate limit"
-        assert sampler.rules == [
-            SamplingRule(sample_rate=0)
-        ], "DatadogSampler initialized with DD_TRACE_SAMPLE_RATE=0 envvar should hold sample_rate=0"
+        assert sampler.rules == (
+            SamplingRule(sample_rate=0),
+        ), "DatadogSampler initialized with DD_TRACE_SAMPLE_RATE=0 envvar should hold sample_rate=0"
 
     with override_global_config(dict(_trace_sample_rate="asdf")):
         with pytest.raises(ValueError):
@@ -731,14 +732,14 @@ def test_datadog_sampler_init():
     rule_2 = SamplingRule(sample_rate=0.5, service="test")
     rule_3 = SamplingRule(sample_rate=0.25, name="flask.request")
     sampler = DatadogSampler(rules=[rule_1, rule_2, rule_3])
-    assert sampler.rules == [
+    assert sampler.rules == (
         rule_1,
         rule_2,
         rule_3,
-    ], "DatadogSampler holds rules in the order they were given during initialization"
+    ), "DatadogSampler holds rules in the order they were given during initialization"
 
     sampler = DatadogSampler(rules=[rule_1, rule_2, rule_3], default_sample_rate=0.75)
-    assert sampler.rules == [rule_1, rule_2, rule_3, SamplingRule(sample_rate=0.75)], (
+    assert sampler.rules == (rule_1, rule_2, rule_3, SamplingRule(sample_rate=0.75)), (
         "When default_sample_rate is set, DatadogSampler holds a rule with the default rate at the end "
         "of its rule list"
     )
@@ -968,6 +969,70 @@ def test_datadog_sampler_tracer_start_span(dummy_tracer):
     )
 
 
+def test_sampling_rules_matcher():
+    rules = [
+        SamplingRule(sample_rate=0.1, service="svc", name="op"),
+        SamplingRule(sample_rate=0.2, service="svc", resource=re.compile("^GET")),
+        SamplingRule(sample_rate=0.3, name="op", tags={"env": "prod*"}),
+        SamplingRule(sample_rate=0.4, service=lambda service: service.startswith("db")),
+        SamplingRule(sample_rate=0.5),
+    ]
+    matcher = SamplingRulesMatcher(rules)
+
+    def match(**kwargs):
+        tags = kwargs.pop("tags", None)
+        span = Span(**kwargs)
+        if tags:
+            span.set_tags(tags)
+        return matcher.match(span)
+
+    for _ in range(2):
+        # The second time the decisions are cached
+        assert match(service="svc", name="op", resource="GET /") is rules[0]
+        assert match(service="svc", name="other", resource="GET /") is rules[1]
+        assert match(service="svc", name="other", resource="POST /") is rules[4]
+        assert match(service="other", name="op", tags={"env": "production"}) is rules[2]
+        assert match(service="other", name="op", tags={"env": "staging"}) is rules[4]
+        assert match(service="db-main", name="op") is rules[3]
+        assert match(service="other", name="other") is rules[4]
+
+
+def test_sampling_rules_matcher_no_rules():
+    assert SamplingRulesMatcher([]).match(Span("test")) is None
+
+
+def test_sampling_rules_matcher_subclass():
+    class AnyRule(SamplingRule):
+        def matches(self, span):
+            return True
+
+    rules = [SamplingRule(sample_rate=0.5, service="svc"), AnyRule(sample_rate=1.0, service="svc")]
+    matcher = SamplingRulesMatcher(rules)
+
+    assert matcher.match(Span("test", service="other")) is rules[1]
+
+
+def test_datadog_sampler_rules_changed():
+    sampler = DatadogSampler(rules=[SamplingRule(sample_rate=0, service="svc")])
+    span = Span("test", service="svc")
+    sampler.sample(span)
+    assert span.get_metric(SAMPLING_RULE_DECISION) == 0
+
+    # The rules cannot be changed in place, since the matcher would not see it
+    with pytest.raises(AttributeError):
+        sampler.rules.append(SamplingRule(sample_rate=1, service="svc"))
+
+    sampler.rules = [SamplingRule(sample_rate=1, service="svc")] + list(sampler.rules)
+    span = Span("test", service="svc")
+    sampler.sample(span)
+    assert span.get_metric(SAMPLING_RULE_DECISION) == 1
+
+    sampler.rules = []
+    span = Span("test", service="svc")
+    sampler.sample(span)
+    assert span.get_metric(SAMPLING_RULE_DECISION) is None
+
+
 @pytest.mark.parametrize("priority_sampler", [DatadogSampler(), RateByServiceSampler()])
 def test_update_rate_by_service_sample_rates(priority_sampler):
     cases = [
@@ -0,0 +1,92 @@
+import random
+
+from ddsketch import LogCollapsingLowestDenseDDSketch
+from ddsketch.pb.ddsketch_pb2 import DDSketch
+from ddsketch.pb.proto import DDSketchProto
+import pytest
+
+from ddtrace.internal._stats import SpanStatsAggregator
+from ddtrace.span import Span
+
+
+def _span(name="op", service="svc", resource="res", span_type="web", start_ns=1, duration_ns=1000, error=0, **tags):
+    span = Span(name, service=service, resource=resource, span_type=span_type)
+    span.start_ns = start_ns
+    span.duration_ns = duration_ns
+    span.error = error
+    for k, v in tags.items():
+        span.set_tag(k, v)
+    return span
+
+
+def _decode(summary):
+    pb = DDSketch()
+    pb.ParseFromString(summary)
+    return DDSketchProto.from_proto(pb)
+
+
+def test_aggregator_keys_and_counters():
+    aggr = SpanStatsAggregator(10000)
+
+    aggr.add(_span(), True)
+    aggr.add(_span(duration_ns=2000, error=1), False)
+    aggr.add(_span(service=None, resource=None, span_type=None, **{"http.status_code": "404"}), True)
+    # Next bucket
+    aggr.add(_span(start_ns=9500), True)
+    assert len(aggr) == 3
+
+    buckets = dict(aggr.flush())
+    assert len(aggr) == 0
+    assert aggr.flush() == []
+
+    assert sorted(buckets) == [0, 10000]
+    stats = {key: rest for key, *rest in buckets[0]}
+    hits, top_level_hits, errors, duration, _, _ = stats[("op", "svc", "res", "web", 0, False)]
+    assert (hits, top_level_hits, errors, duration) == (2, 1, 1, 3000)
+    hits, top_level_hits, errors, duration, _, _ = stats[("op", "", "op", "", 404, False)]
+    assert (hits, top_level_hits, errors, duration) == (1, 1, 0, 1000)
+    ((key, hits, _, _, _, _, _),) = buckets[10000]
+    assert key == ("op", "svc", "res", "web", 0, False)
+    assert hits == 1
+
+
+def test_aggregator_interned_keys():
+    aggr = SpanStatsAggregator(10000)
+
+    aggr.add(_span(), True)
+    aggr.add(_span(start_ns=20000), True)
+
+    (_, (first,)), (_, (second,)) = aggr.flush()
+    assert first[0] is second[0]
+
+
+def test_aggregator_invalid_status_code():
+    aggr = SpanStatsAggregator(10)
+
+    with pytest.raises(ValueError):
+        aggr.add(_span(**{"http.status_code": "abc"}), True)
+
+
+@pytest.mark.parametrize("bin_limit", [2048, 32])
+def test_aggregator_sketches(bin_limit):
+    aggr = SpanStatsAggregator(1 << 62, bin_limit=bin_limit)
+    ok = LogCollapsingLowestDenseDDSketch(0.00775, bin_limit=bin_limit)
+    err = LogCollapsingLowestDenseDDSketch(0.00775, bin_limit=bin_limit)
+
+    rand = random.Random(0)
+    for i in range(2000):
+        duration_ns = 0 if i % 50 == 0 else int(rand.lognormvariate(15, 3))
+        error = i % 3 == 0
+        aggr.add(_span(duration_ns=duration_ns, error=int(error)), True)
+        (err if error else ok).add(duration_ns)
+
+    ((_, ((_, hits, _, errors, _, ok_summary, err_summary),)),) = aggr.flush()
+    assert hits == 2000
+    assert errors == err.count
+
+    for expected, summary in ((ok, ok_summary), (err, err_summary)):
+        sketch = _decode(summary)
+        assert sketch.count == expected.count
+        assert sketch._zero_count == expected._zero_count
+        for q in (0, 0.1, 0.5, 0.75, 0.9, 0.99, 1):
+            assert sketch.get_quantile_value(q) == pytest.approx(expected.get_quantile_value(q))
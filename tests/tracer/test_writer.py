@@ -5,6 +5,7 @@ import sys
 import tempfile
 import threading
 import time
+import zlib
 
 import mock
 import msgpack
@@ -15,6 +16,7 @@ from six.moves import socketserver
 import ddtrace
 from ddtrace import config
 from ddtrace.constants import KEEP_SPANS_RATE_KEY
+from ddtrace.internal.agent import connection_pool
 from ddtrace.internal.ci_visibility.writer import CIVisibilityWriter
 from ddtrace.internal.compat import PY3
 from ddtrace.internal.compat import get_connection_response
@@ -239,7 +241,8 @@ class AgentWriterTests(BaseTestCase):
     def test_drop_reason_buffer_full(self):
         statsd = mock.Mock()
         writer_metrics_reset = mock.Mock()
-        with override_global_config(dict(health_metrics_enabled=False)):
+        # Disable early flushes so that the buffer can fill up
+        with override_global_config(dict(health_metrics_enabled=False, _trace_writer_early_flush_ratio=0)):
             writer = self.WRITER_CLASS("http://asdf:1234", buffer_size=5125, dogstatsd=statsd)
             writer._metrics_reset = writer_metrics_reset
             for i in range(10):
@@ -261,7 +264,7 @@ class AgentWriterTests(BaseTestCase):
         writer_encoder.__len__ = (lambda *args: n_traces).__get__(writer_encoder)
         writer_metrics_reset = mock.Mock()
         writer_encoder.encode.side_effect = Exception
-        with override_global_config(dict(health_metrics_enabled=False)):
+        with override_global_config(dict(health_metrics_enabled=False, _trace_writer_early_flush_ratio=0)):
             writer = self.WRITER_CLASS("http://asdf:1234", dogstatsd=statsd, sync_mode=False)
             for client in writer._clients:
                 client.encoder = writer_encoder
@@ -454,10 +457,24 @@ class _ResetAPIEndpointRequestHandlerTest(_BaseHTTPRequestHandler):
         return
 
 
+class _KeepAliveAPIEndpointRequestHandlerTest(_BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    client_ports = []
+
+    def do_PUT(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.client_ports.append(self.client_address[1])
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+
 _HOST = "0.0.0.0"
 _PORT = 8743
 _TIMEOUT_PORT = _PORT + 1
 _RESET_PORT = _TIMEOUT_PORT + 1
+_KEEP_ALIVE_PORT = _RESET_PORT + 1
 
 
 class UDSHTTPServer(socketserver.UnixStreamServer, BaseHTTPServer.HTTPServer):
@@ -645,6 +662,174 @@ def test_racing_start(writer_class):
     assert len(writer._encoder) == 100
 
 
+def test_write_deferred_processes_on_writer_thread():
+    writer = AgentWriter("http://dne:1234", processing_interval=60, processing_queue_size=10)
+    process_threads = []
+
+    def process_trace(spans):
+        process_threads.append(threading.current_thread())
+        return spans
+
+    writer.write_deferred([Span("name")], process_trace)
+
+    # The trace is queued untouched until the writer processes it
+    assert process_threads == []
+    assert len(writer._encoder) == 0
+
+    # Writing the trace started the writer, which processes it when awakened
+    with mock.patch.object(writer, "_send_payload_with_backoff") as send:
+        try:
+            writer.awake()
+        finally:
+            writer.stop()
+            writer.join()
+
+    # The trace is processed and encoded on the writer thread
+    assert process_threads == [writer._worker]
+    assert send.call_count == 1
+
+
+def test_write_deferred_drops_when_queue_full():
+    writer = AgentWriter("http://dne:1234", processing_queue_size=2, early_flush_ratio=0)
+
+    for i in range(3):
+        writer.write_deferred([Span(str(i))], lambda spans: spans)
+
+    assert len(writer._pending) == 2
+    assert writer._metrics["buffer.dropped.traces"][("reason:queue_full",)] == 1
+    writer.stop()
+
+
+def test_write_deferred_disabled_processes_inline():
+    writer = AgentWriter("http://dne:1234", processing_queue_size=0)
+    try:
+        writer.write_deferred([Span("dropped")], lambda spans: None)
+        writer.write_deferred([Span("kept")], lambda spans: spans)
+
+        assert writer._pending == []
+        assert len(writer._encoder) == 1
+    finally:
+        writer.stop()
+
+
+def test_write_deferred_early_flush():
+    writer = AgentWriter("http://dne:1234", processing_queue_size=4, early_flush_ratio=0.5)
+    try:
+        with mock.patch.object(writer, "awake") as awake:
+            writer.write_deferred([Span("first")], lambda spans: spans)
+            awake.assert_not_called()
+
+            writer.write_deferred([Span("second")], lambda spans: spans)
+            awake.assert_called_once_with(wait=False)
+            assert writer._metrics["writer.flush.early"][tuple()] == 1
+    finally:
+        writer.stop()
+
+
+def test_early_flush_above_threshold():
+    writer = AgentWriter("http://dne:1234", buffer_size=1 << 12, early_flush_ratio=0.5)
+    with mock.patch.object(writer, "awake") as awake:
+        writer.write([Span("small")])
+        awake.assert_not_called()
+
+        writer.write([Span("a" * (1 << 10))])
+        awake.assert_called_once_with(wait=False)
+        assert writer._metrics["writer.flush.early"][tuple()] == 1
+    writer.stop()
+
+
+def test_early_flush_disabled():
+    writer = AgentWriter("http://dne:1234", buffer_size=1 << 12, early_flush_ratio=0)
+    with mock.patch.object(writer, "awake") as awake:
+        writer.write([Span("a" * (1 << 10))])
+        awake.assert_not_called()
+    writer.stop()
+
+
+def test_early_flush_sends_payload_before_interval():
+    writer = AgentWriter("http://dne:1234", processing_interval=60, buffer_size=1 << 12, early_flush_ratio=0.5)
+    with mock.patch.object(writer, "_send_payload_with_backoff") as send:
+        writer.write([Span("a" * (1 << 10))])
+        for _ in range(100):
+            if send.called:
+                break
+            time.sleep(0.05)
+        assert send.call_count == 1
+        assert len(writer._encoder) == 0
+    writer.stop()
+
+
+@pytest.mark.parametrize(
+    "compression,decompress",
+    [("gzip", lambda data: zlib.decompress(data, 16 + zlib.MAX_WBITS)), ("deflate", zlib.decompress)],
+)
+def test_compression(compression, decompress):
+    writer = AgentWriter("http://dne:1234", api_version="v0.4", compression=compression)
+    writer.write([Span("name")])
+
+    with mock.patch.object(writer, "_put", side_effect=[OSError(), OSError(), Response(status=200)]) as put:
+        writer.flush_queue()
+
+    # The payload is compressed once and sent as is on every retry
+    assert put.call_count == 3
+    payloads = [call[0][0] for call in put.call_args_list]
+    assert all(payload is payloads[0] for payload in payloads)
+    payload, headers = put.call_args[0][:2]
+    assert headers["Content-Encoding"] == compression
+    assert len(msgpack.unpackb(decompress(payload))) == 1
+    writer.stop()
+
+
+@pytest.mark.parametrize("status", [400, 415])
+def test_compression_rejected_by_agent(status):
+    writer = AgentWriter("http://dne:1234", api_version="v0.4", compression="gzip")
+    writer.write([Span("name")])
+
+    with mock.patch.object(writer, "_put", side_effect=[Response(status=status), Response(status=200)]) as put:
+        writer.flush_queue()
+
+    # The payload is sent again uncompressed and compression is disabled
+    assert put.call_count == 2
+    payload, headers = put.call_args[0][:2]
+    assert "Content-Encoding" not in headers
+    assert len(msgpack.unpackb(payload)) == 1
+    assert writer._compression is None
+    writer.stop()
+
+
+def test_compression_bad_payload():
+    writer = AgentWriter("http://dne:1234", api_version="v0.4", compression="gzip")
+    writer.write([Span("name")])
+
+    with mock.patch.object(writer, "_put", side_effect=[Response(status=400), Response(status=400)]) as put:
+        writer.flush_queue()
+
+    # The payload is also rejected uncompressed, so compression stays enabled
+    assert put.call_count == 2
+    payload, headers = put.call_args[0][:2]
+    assert "Content-Encoding" not in headers
+    assert len(msgpack.unpackb(payload)) == 1
+    assert writer._compression == "gzip"
+
+    writer.write([Span("name")])
+    with mock.patch.object(writer, "_put", return_value=Response(status=200)) as put:
+        writer.flush_queue()
+
+    payload, headers = put.call_args[0][:2]
+    assert headers["Content-Encoding"] == "gzip"
+    writer.stop()
+
+
+def test_compression_disabled_for_v03():
+    writer = AgentWriter("http://dne:1234", api_version="v0.3", compression="gzip")
+    assert writer._content_encoding(writer._clients[0]) is None
+
+
+def test_compression_unsupported_encoding():
+    writer = AgentWriter("http://dne:1234", api_version="v0.4", compression="br")
+    assert writer._compression is None
+
+
 @pytest.mark.subprocess(
     env={"_DD_TRACE_WRITER_ADDITIONAL_HEADERS": "additional-header:additional-value,header2:value2"}
 )
@@ -786,28 +971,43 @@ def test_writer_reuse_connections_envvar(monkeypatch, writer_class):
 
 
 @pytest.mark.parametrize("writer_class", (AgentWriter, CIVisibilityWriter))
-def test_writer_reuse_connections(writer_class):
+@pytest.mark.parametrize("reuse_connections", (True, False))
+def test_writer_reuse_connections(writer_class, reuse_connections):
     with override_env(dict(DD_API_KEY="foobar.baz")):
-        # Ensure connection is not reused
-        writer = writer_class("http://localhost:9126", reuse_connections=True)
-        # Do an initial flush to get a connection
-        writer.flush_queue()
-        assert writer._conn is None
-        writer.flush_queue()
-        assert writer._conn is None
+        writer = writer_class("http://localhost:9126", reuse_connections=reuse_connections)
+        writer._encoder.put([Span("name")])
+        with mock.patch("ddtrace.internal.writer.writer.connection_pool") as pool:
+            pool.request.return_value = (mock.Mock(status=200, reason="OK", msg=None), b"{}")
+            writer.flush_queue(raise_exc=True)
 
+        # The payloads are sent through the agent connection pool
+        assert pool.request.call_count == 1
+        url, method, path, payload = pool.request.call_args.args[:4]
+        assert url == "http://localhost:9126"
+        assert path == writer._endpoint
+        assert pool.request.call_args.kwargs["reuse"] is reuse_connections
+        assert pool.request.call_args.kwargs["no_trace"] is True
 
-@pytest.mark.parametrize("writer_class", (AgentWriter, CIVisibilityWriter))
-def test_writer_reuse_connections_false(writer_class):
-    with override_env(dict(DD_API_KEY="foobar.baz")):
-        # Ensure connection is reused
-        writer = writer_class("http://localhost:9126", reuse_connections=False)
-        # Do an initial flush to get a connection
-        writer.flush_queue()
-        conn = writer._conn
-        # And another to potentially have it reset
-        writer.flush_queue()
-        assert writer._conn is conn
+
+@pytest.mark.parametrize("reuse_connections", (True, False))
+def test_writer_pooled_connection(reuse_connections):
+    handler = _KeepAliveAPIEndpointRequestHandlerTest
+    handler.client_ports = []
+    server, thread = _make_server(_KEEP_ALIVE_PORT, handler)
+    try:
+        writer = AgentWriter("http://localhost:%s" % _KEEP_ALIVE_PORT, reuse_connections=reuse_connections)
+        for _ in range(3):
+            writer._encoder.put([Span("name")])
+            writer.flush_queue(raise_exc=True)
+    finally:
+        # The server handles the requests of a keep-alive connection until it is closed
+        connection_pool.clear()
+        server.shutdown()
+        thread.join()
+
+    # The keep-alive connection is reused by the following flushes unless reuse is disabled
+    assert len(handler.client_ports) == 3
+    assert len(set(handler.client_ports)) == (1 if reuse_connections else 3)
 
 
 @pytest.mark.subprocess(env=dict(DD_TRACE_128_BIT_TRACEID_GENERATION_ENABLED="true"))
@@ -131,6 +131,10 @@ def override_global_config(values):
         "_trace_writer_interval_seconds",
         "_trace_writer_connection_reuse",
         "_trace_writer_log_err_payload",
+        "_trace_writer_processing_queue_size",
+        "_trace_writer_early_flush_ratio",
+        "_shared_scheduler_enabled",
+        "_trace_compact_finished_spans",
     ]
 
     asm_config_keys = [
@@ -139,6 +143,8 @@ def override_global_config(values):
         "_api_security_sample_rate",
         "_waf_timeout",
         "_iast_enabled",
+        "_iast_code_cache_enabled",
+        "_iast_code_cache_dir",
         "_automatic_login_events_mode",
         "_user_model_login_field",
         "_user_model_email_field",